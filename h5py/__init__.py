@@ -33,6 +33,7 @@ from .h5t import py_new_enum as new_enum
 from .h5t import py_get_enum as get_enum
 
 from . import version
+from . import index
 
 from .tests import run_tests
 
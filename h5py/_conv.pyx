@@ -258,71 +258,107 @@ cdef int conv_str2vlen(void* ipt, void* opt, void* bkg, void* priv) except -1:
 
 # =============================================================================
 # VLEN to fixed-width strings
+#
+# These don't go through generic_converter: each conversion is a single loop
+# over the whole buffer, with no per-element function calls.
 
-cdef herr_t init_vlen2fixed(hid_t src, hid_t dst, void** priv) except -1:
+cdef herr_t vlen2fixed(hid_t src_id, hid_t dst_id, H5T_cdata_t *cdata,
+                    size_t nl, size_t buf_stride, size_t bkg_stride, void *buf_i,
+                    void *bkg_i, hid_t dxpl) except -1:
 
-    cdef conv_size_t *sizes
+    cdef int command = cdata[0].command
+    cdef char* buf = <char*>buf_i
+    cdef size_t src_stride, dst_stride, dst_size, i, j, k
+    cdef char* src_str
+    cdef char* out
 
-    if not (H5Tis_variable_str(src) and (not H5Tis_variable_str(dst))):
-        return -2
+    if command == H5T_CONV_INIT:
 
-    sizes = <conv_size_t*>malloc(sizeof(conv_size_t))
-    priv[0] = sizes
-    sizes[0].src_size = H5Tget_size(src)
-    sizes[0].dst_size = H5Tget_size(dst)
+        cdata[0].need_bkg = H5T_BKG_NO
+        if not (H5Tis_variable_str(src_id) and (not H5Tis_variable_str(dst_id))):
+            return -2
 
-    return 0
+    elif command == H5T_CONV_FREE:
 
-cdef herr_t init_fixed2vlen(hid_t src, hid_t dst, void** priv) except -1:
+        pass
 
-    cdef conv_size_t *sizes
+    elif command == H5T_CONV_CONV:
 
-    if not (H5Tis_variable_str(dst) and (not H5Tis_variable_str(src))):
-        return -2
+        dst_size = H5Tget_size(dst_id)
+        if buf_stride == 0:
+            src_stride = H5Tget_size(src_id)
+            dst_stride = dst_size
+        else:
+            src_stride = dst_stride = buf_stride
+
+        # Conversion is in place; work backwards if the output elements are
+        # larger, so unconverted input isn't overwritten.
+        for j from 0<=j<nl:
+            i = j if src_stride >= dst_stride else nl-1-j
+            src_str = (<char**>(buf + i*src_stride))[0]
+            out = buf + i*dst_stride
+            if src_str == NULL:
+                memset(out, c'\0', dst_size)
+                continue
+            k = 0
+            while k < dst_size and src_str[k] != c'\0':
+                out[k] = src_str[k]
+                k += 1
+            if k < dst_size:
+                memset(out + k, c'\0', dst_size - k)
 
-    sizes = <conv_size_t*>malloc(sizeof(conv_size_t))
-    priv[0] = sizes
-    sizes[0].src_size = H5Tget_size(src)
-    sizes[0].dst_size = H5Tget_size(dst)
+    else:
+        return -2   # Unrecognized command.  Note this is NOT an exception.
 
     return 0
 
-cdef int conv_vlen2fixed(void* ipt, void* opt, void* bkg, void* priv) except -1:
+cdef herr_t fixed2vlen(hid_t src_id, hid_t dst_id, H5T_cdata_t *cdata,
+                    size_t nl, size_t buf_stride, size_t bkg_stride, void *buf_i,
+                    void *bkg_i, hid_t dxpl) except -1:
 
-    cdef char** buf_vlen = <char**>ipt
-    cdef char* buf_fixed = <char*>opt
-    cdef char* temp_string = NULL
-    cdef size_t temp_string_len = 0  # Without null term
-    cdef conv_size_t *sizes = <conv_size_t*>priv
+    cdef int command = cdata[0].command
+    cdef char* buf = <char*>buf_i
+    cdef size_t src_stride, dst_stride, src_size, i, j, k
+    cdef char* src
+    cdef char* temp_string
 
-    if buf_vlen[0] != NULL:
-        temp_string = buf_vlen[0]
-        temp_string_len = strlen(temp_string)
+    if command == H5T_CONV_INIT:
 
-        if temp_string_len <= sizes[0].dst_size:
-            # Pad with zeros
-            memcpy(buf_fixed, temp_string, temp_string_len)
-            memset(buf_fixed + temp_string_len, c'\0', sizes[0].dst_size - temp_string_len)
-        else:
-            # Simply truncate the string
-            memcpy(buf_fixed, temp_string, sizes[0].dst_size)
-    else:
-        memset(buf_fixed, c'\0', sizes[0].dst_size)
+        cdata[0].need_bkg = H5T_BKG_NO
+        if not (H5Tis_variable_str(dst_id) and (not H5Tis_variable_str(src_id))):
+            return -2
 
-    return 0
+    elif command == H5T_CONV_FREE:
 
-cdef int conv_fixed2vlen(void* ipt, void* opt, void* bkg, void* priv) except -1:
+        pass
 
-    cdef char** buf_vlen = <char**>opt
-    cdef char* buf_fixed = <char*>ipt
-    cdef char* temp_string = NULL
-    cdef conv_size_t *sizes = <conv_size_t*>priv
+    elif command == H5T_CONV_CONV:
 
-    temp_string = <char*>malloc(sizes[0].src_size+1)
-    memcpy(temp_string, buf_fixed, sizes[0].src_size)
-    temp_string[sizes[0].src_size] = c'\0'
+        src_size = H5Tget_size(src_id)
+        if buf_stride == 0:
+            src_stride = src_size
+            dst_stride = H5Tget_size(dst_id)
+        else:
+            src_stride = dst_stride = buf_stride
+
+        for j from 0<=j<nl:
+            i = j if src_stride >= dst_stride else nl-1-j
+            src = buf + i*src_stride
+            k = 0
+            while k < src_size and src[k] != c'\0':
+                k += 1
+            # Each string is a separate allocation, as whoever reclaims the
+            # vlen data frees them one at a time.  Only the characters up to
+            # the first NUL are kept.
+            temp_string = <char*>malloc(k+1)
+            if temp_string == NULL:
+                raise MemoryError("Can't allocate vlen string")
+            memcpy(temp_string, src, k)
+            temp_string[k] = c'\0'
+            (<char**>(buf + i*dst_stride))[0] = temp_string
 
-    buf_vlen[0] = temp_string
+    else:
+        return -2   # Unrecognized command.  Note this is NOT an exception.
 
     return 0
 
@@ -424,18 +460,6 @@ cdef herr_t str2vlen(hid_t src_id, hid_t dst_id, H5T_cdata_t *cdata,
     return generic_converter(src_id, dst_id, cdata, nl, buf_stride, bkg_stride,
              buf_i, bkg_i, dxpl, conv_str2vlen, init_generic, H5T_BKG_NO)
 
-cdef herr_t vlen2fixed(hid_t src_id, hid_t dst_id, H5T_cdata_t *cdata,
-                    size_t nl, size_t buf_stride, size_t bkg_stride, void *buf_i,
-                    void *bkg_i, hid_t dxpl) except -1:
-    return generic_converter(src_id, dst_id, cdata, nl, buf_stride, bkg_stride,
-             buf_i, bkg_i, dxpl, conv_vlen2fixed, init_vlen2fixed, H5T_BKG_NO)
-
-cdef herr_t fixed2vlen(hid_t src_id, hid_t dst_id, H5T_cdata_t *cdata,
-                    size_t nl, size_t buf_stride, size_t bkg_stride, void *buf_i,
-                    void *bkg_i, hid_t dxpl) except -1:
-    return generic_converter(src_id, dst_id, cdata, nl, buf_stride, bkg_stride,
-             buf_i, bkg_i, dxpl, conv_fixed2vlen, init_fixed2vlen, H5T_BKG_NO)
-
 cdef herr_t objref2pyref(hid_t src_id, hid_t dst_id, H5T_cdata_t *cdata,
                     size_t nl, size_t buf_stride, size_t bkg_stride, void *buf_i,
                     void *bkg_i, hid_t dxpl) except -1:
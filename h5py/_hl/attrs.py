@@ -12,13 +12,17 @@ from __future__ import absolute_import
 import numpy
 import collections
 
-from .. import h5s, h5t, h5a
+from .. import h5, h5s, h5t, h5a, h5p
 from . import base
 from .base import phil, with_phil
 from .dataset import readtime_dtype
 from .datatype import Datatype
 
 
+# Attributes whose contents are cached by Dataset.dims (see dims.py)
+_dimscale_attrs = (b'DIMENSION_LIST', b'NAME')
+
+
 class AttributeManager(base.DictCompat, base.CommonStateObject):
 
     """
@@ -76,6 +80,17 @@ class AttributeManager(base.DictCompat, base.CommonStateObject):
             return arr[()]
         return arr
 
+    @with_phil
+    def read_all(self):
+        """ Read all attributes at once, returning a dict of name: value.
+
+        Much faster than dict(attrs) for objects with many attributes, as
+        the names and values are read in a single pass.  Empty attributes
+        (with a null dataspace) are left out.
+        """
+        out = h5a.read_all(self._id)
+        return dict((self._d(k), v) for k, v in out.items())
+
     @with_phil
     def __setitem__(self, name, value):
         """ Set a new attribute, overwriting any existing attribute.
@@ -90,6 +105,7 @@ class AttributeManager(base.DictCompat, base.CommonStateObject):
     def __delitem__(self, name):
         """ Delete an attribute (which must already exist). """
         h5a.delete(self._id, self._e(name))
+        self._changed(name)
 
     def create(self, name, data, shape=None, dtype=None):
         """ Create a new attribute, overwriting any existing attribute.
@@ -104,6 +120,9 @@ class AttributeManager(base.DictCompat, base.CommonStateObject):
         dtype
             Data type of the attribute.  Overrides data.dtype if both
             are given.
+
+        An existing attribute with the same type and shape is written to
+        in place; otherwise it's replaced.
         """
 
         import uuid
@@ -166,6 +185,19 @@ class AttributeManager(base.DictCompat, base.CommonStateObject):
                 htype = use_htype
                 htype2 = None
                 
+            # If an attribute with the same type and shape already exists,
+            # write over it in place.  This avoids header churn when an
+            # attribute is updated repeatedly.
+            if use_htype is None and h5a.exists(self._id, self._e(name)):
+                attr = h5a.open(self._id, self._e(name))
+                oldspace = attr.get_space()
+                oldtype = attr.get_type()
+                if oldspace.get_simple_extent_type() != h5s.NULL and \
+                   oldspace.get_simple_extent_dims() == tuple(shape) and \
+                   not oldtype.committed() and oldtype == htype:
+                    attr.write(data, mtype=htype2)
+                    return
+
             space = h5s.create_simple(shape)
 
             # This mess exists because you can't overwrite attributes in HDF5.
@@ -194,6 +226,7 @@ class AttributeManager(base.DictCompat, base.CommonStateObject):
                         attr._close()
                         h5a.delete(self._id, self._e(tempname))
                         raise
+                    self._changed(name)
                         
     def modify(self, name, value):
         """ Change the value of an attribute while preserving its type.
@@ -220,6 +253,13 @@ class AttributeManager(base.DictCompat, base.CommonStateObject):
                    (numpy.product(value.shape) == 1 and numpy.product(attr.shape) == 1):
                     raise TypeError("Shape of data is incompatible with existing attribute")
                 attr.write(value)
+                self._changed(name)
+
+    def _changed(self, name):
+        """ Called after attribute *name* was written or deleted """
+        if self._e(name) in _dimscale_attrs:
+            from .dims import invalidate_scales
+            invalidate_scales(self._id)
 
     @with_phil
     def __len__(self):
@@ -228,17 +268,33 @@ class AttributeManager(base.DictCompat, base.CommonStateObject):
         return h5a.get_num_attrs(self._id)
 
     def __iter__(self):
-        """ Iterate over the names of attributes. """
+        """ Iterate over the names of attributes.  If the object tracks
+        attribute creation order, they come in that order. """
         with phil:
             attrlist = []
-
             def iter_cb(name, *args):
                 attrlist.append(self._d(name))
-            h5a.iterate(self._id, iter_cb)
+            if self._track_order():
+                h5a.iterate(self._id, iter_cb, index_type=h5.INDEX_CRT_ORDER,
+                            order=h5.ITER_INC)
+            else:
+                h5a.iterate(self._id, iter_cb)
 
         for name in attrlist:
             yield name
 
+    def _track_order(self):
+        """ True if the object tracks attribute creation order """
+        # Named datatypes have no creation property list here, and the
+        # file creation property list doesn't expose the setting
+        get_plist = getattr(self._id, 'get_create_plist', None)
+        if get_plist is None:
+            return False
+        plist = get_plist()
+        if not isinstance(plist, h5p.PropOCID):
+            return False
+        return bool(plist.get_attr_creation_order() & h5p.CRT_ORDER_TRACKED)
+
     @with_phil
     def __contains__(self, name):
         """ Determine if an attribute exists, by name. """
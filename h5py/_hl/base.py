@@ -11,12 +11,13 @@ from __future__ import absolute_import
 
 import posixpath
 import warnings
+import weakref
 import os
 import sys
 
 import six
 
-from .. import h5d, h5i, h5r, h5p, h5f, h5t
+from .. import h5d, h5i, h5r, h5p, h5f, h5t, h5o
 
 # The high-level interface is serialized; every public API function & method
 # is wrapped in a lock.  We re-use the low-level lock because (1) it's fast, 
@@ -72,6 +73,92 @@ def default_lcpl():
     lcpl.set_create_intermediate_group(True)
     return lcpl
 
+def set_attr_options(ocpl, attr_storage=None, track_attr_order=None):
+    """ Apply the attr_storage and track_attr_order options of create_group
+    and create_dataset to an object creation property list.
+
+    attr_storage is None (HDF5 default), 'dense' (always B-tree indexed) or
+    a (max_compact, min_dense) tuple of phase-change thresholds.
+    """
+    if attr_storage == 'dense':
+        ocpl.set_attr_phase_change(0, 0)
+    elif isinstance(attr_storage, tuple) and len(attr_storage) == 2:
+        ocpl.set_attr_phase_change(*attr_storage)
+    elif attr_storage is not None:
+        raise ValueError("attr_storage must be 'dense' or a (max_compact, min_dense) tuple")
+
+    if track_attr_order is True:
+        ocpl.set_attr_creation_order(h5p.CRT_ORDER_TRACKED | h5p.CRT_ORDER_INDEXED)
+    elif track_attr_order not in (None, False):
+        raise TypeError("track_attr_order must be either True or False")
+
+
+# Caches of information derived from a file's contents, e.g. the names of
+# referenced objects.  They're shared by every h5py object in a file, and
+# keyed by the HDF5 file identifier.  Each entry holds a weak reference to
+# the FileID of the File object which first opened that identifier, and
+# the caches go away with it, or when it's closed; HDF5 may reuse file
+# numbers once a file is closed.  Removing or moving links through h5py
+# empties the caches of the file concerned; changes made by other
+# processes or through the low-level API aren't noticed.
+_file_caches = {}
+
+
+def _cache_entry(hid):
+    """ The (ref, fileno, caches) entry for file identifier *hid*, or None.
+    Entries whose FileID has gone away or been closed are removed. """
+    entry = _file_caches.get(hid)
+    if entry is not None:
+        owner = entry[0]()
+        if owner is None or not owner.valid:
+            del _file_caches[hid]
+            return None
+    return entry
+
+
+def attach_file_caches(fid):
+    """ Tie the caches for the file *fid* to that FileID, unless another
+    live FileID for the same identifier already holds them """
+    with phil:
+        for hid in list(_file_caches):
+            _cache_entry(hid)
+        if fid.id not in _file_caches:
+            _file_caches[fid.id] = (weakref.ref(fid), h5o.get_info(fid).fileno, {})
+
+
+def file_cache(oid, kind):
+    """ Dict for caching *kind* information about the file containing the
+    low-level object *oid*.  If no File object is keeping the caches for
+    that file, a new, unshared dict. """
+    with phil:
+        entry = _cache_entry(h5i.get_file_id(oid).id)
+        if entry is None:
+            return {}
+        caches = entry[2]
+        cache = caches.get(kind)
+        if cache is None:
+            cache = caches[kind] = {}
+        return cache
+
+
+def clear_file_caches(oid):
+    """ Discard everything cached by file_cache() about the file containing
+    *oid*, under any of the identifiers it's open with """
+    with phil:
+        fileno = h5o.get_info(oid).fileno
+        for hid in list(_file_caches):
+            entry = _cache_entry(hid)
+            if entry is not None and entry[1] == fileno:
+                entry[2].clear()
+
+
+def detach_file_caches(fid):
+    """ Discard the caches for the file identifier of *fid*, which is about
+    to be closed """
+    with phil:
+        _file_caches.pop(fid.id, None)
+
+
 dlapl = default_lapl()
 dlcpl = default_lcpl()
 
@@ -0,0 +1,307 @@
+# This file is part of h5py, a Python interface to the HDF5 library.
+#
+# http://www.h5py.org
+#
+# Copyright 2008-2013 Andrew Collette and contributors
+#
+# License:  Standard 3-clause BSD; see "license.txt" for full license terms
+#           and contributor agreement.
+
+"""
+    Sidecar catalogs of the links in a file, for answering membership and
+    listing queries without reading HDF5 metadata.
+"""
+
+from __future__ import absolute_import
+
+import os
+import bisect
+
+import numpy
+
+from .. import h5l, h5o, h5p
+from .base import phil
+
+# Bump when the on-disk layout changes.  Version 1 catalogs lack the
+# link creation order flags, and can't list group members.
+VERSION = 2
+
+# Sentinel for "the catalog can't tell; ask HDF5"
+UNKNOWN = object()
+
+
+def default_path(filename):
+    """ Sidecar name used when none is given """
+    return filename + '.idx'
+
+
+def _file_state(fid, filename):
+    """ (size, mtime, root object address) identifying a file's contents """
+    st = os.stat(filename)
+    return st.st_size, st.st_mtime, h5o.get_info(fid).addr
+
+
+def _track_order(gid):
+    """ True if the group *gid* lists its members in creation order """
+    flags = gid.get_create_plist().get_link_creation_order()
+    return bool(flags & h5p.CRT_ORDER_TRACKED)
+
+
+def build(f, path=None):
+    """ Write a sidecar catalog for File *f* and return its name.
+
+    Every link in the file is recorded with its type and, for hard links,
+    the object type, object header address and dataset shape and dtype,
+    and for groups whether they track link creation order.
+    The default name is the file name plus ".idx".  The catalog is only
+    valid as long as the file is unchanged, so *f* must be open read-only.
+    """
+    with phil:
+        if f.mode != 'r':
+            raise ValueError("Catalogs can only be built from read-only files")
+        filename = f.filename
+        if path is None:
+            path = default_path(filename)
+
+        objects = h5o.index(f.id)
+        obj_row = dict((addr, i) for i, addr in enumerate(objects['addr']))
+
+        links = []
+        seen_groups = set()
+
+        def visitor(name, info):
+            alias = False
+            addr = 0
+            if info.type == h5l.TYPE_HARD:
+                addr = info.u
+                i = obj_row.get(addr)
+                if i is not None and objects['type'][i] == h5o.TYPE_GROUP:
+                    # HDF5 descends into each group once, through the first
+                    # link it finds; members of other links to the same
+                    # group aren't visited.
+                    alias = addr in seen_groups
+                    seen_groups.add(addr)
+            links.append((name, info.type, addr, alias))
+
+        f.id.links.visit(visitor, info=True)
+        root_state = _file_state(f.id, filename)
+        root_ordered = _track_order(h5o.open(f.id, b'/'))
+
+        # Members of groups which track creation order are listed in that
+        # order, which the catalog doesn't record
+        links.sort()
+        ordered = numpy.zeros((len(links),), dtype='?')
+        for i, (name, lt, addr, alias) in enumerate(links):
+            row = obj_row.get(addr) if lt == h5l.TYPE_HARD else None
+            if row is not None and not alias and objects['type'][row] == h5o.TYPE_GROUP:
+                ordered[i] = _track_order(h5o.open(f.id, name))
+
+    n = len(links)
+    paths = [x[0] for x in links]
+    offsets = numpy.zeros((n+1,), dtype='u8')
+    offsets[1:] = numpy.cumsum([len(x) for x in paths])
+    depth = numpy.array([x.count(b'/') + 1 for x in paths], dtype='u2')
+    ltype = numpy.array([x[1] for x in links], dtype='i1')
+    addrs = numpy.array([x[2] for x in links], dtype='u8')
+    alias = numpy.array([x[3] for x in links], dtype='?')
+
+    otype = numpy.empty((n,), dtype='i1')
+    otype[...] = -1
+    ndim = numpy.empty((n,), dtype='i1')
+    ndim[...] = -1
+    dtype_idx = numpy.empty((n,), dtype='i4')
+    dtype_idx[...] = -1
+    dims = []
+    dtypes = []
+    dtype_codes = {}
+    for i, (name, lt, addr, _) in enumerate(links):
+        if lt != h5l.TYPE_HARD or addr not in obj_row:
+            continue
+        row = objects[obj_row[addr]]
+        otype[i] = row['type']
+        if row['type'] == h5o.TYPE_DATASET:
+            if row['ndim'] >= 0:
+                ndim[i] = row['ndim']
+                dims.extend(row['shape'][:row['ndim']])
+            # Same encoding as the index; see h5o.index_dtype
+            code = row['dtype'].decode('utf-8')
+            if code not in dtype_codes:
+                dtype_codes[code] = len(dtypes)
+                dtypes.append(code)
+            dtype_idx[i] = dtype_codes[code]
+
+    size, mtime, root_addr = root_state
+    with open(path, 'wb') as fobj:
+        numpy.savez(fobj,
+            state=numpy.array([VERSION, size, root_addr], dtype='u8'),
+            mtime=numpy.array([mtime], dtype='f8'),
+            paths=numpy.frombuffer(b''.join(paths), dtype='u1') if n else numpy.zeros((0,), dtype='u1'),
+            offsets=offsets, depth=depth, ltype=ltype, addrs=addrs,
+            alias=alias, otype=otype, ndim=ndim, ordered=ordered,
+            root_ordered=numpy.array([root_ordered], dtype='?'),
+            dims=numpy.array(dims, dtype='u8'),
+            dtype_idx=dtype_idx,
+            dtypes=numpy.frombuffer('\n'.join(dtypes).encode('utf-8'), dtype='u1') if dtypes else numpy.zeros((0,), dtype='u1'))
+    return path
+
+
+class _Paths(object):
+
+    """ Sequence view of the sorted path table, for bisect """
+
+    def __init__(self, blob, offsets):
+        self.blob = blob
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return self.blob[int(self.offsets[i]):int(self.offsets[i+1])]
+
+
+class Catalog(object):
+
+    """
+        Sidecar catalog of the links in a file, loaded with load().
+
+        Paths are byte strings relative to the root group, without a
+        leading slash.
+    """
+
+    def __init__(self, path):
+        data = numpy.load(path)
+        try:
+            arrays = dict((k, data[k]) for k in data.files)
+        finally:
+            data.close()
+        state = arrays['state']
+        if state[0] not in (1, VERSION):
+            raise ValueError("Unsupported catalog version %d" % state[0])
+        self.path = path
+        self._size = int(state[1])
+        self._root_addr = int(state[2])
+        self._mtime = float(arrays['mtime'][0])
+
+        self._paths = _Paths(bytes(arrays['paths'].data), arrays['offsets'])
+        self._depth = arrays['depth']
+        self._ltype = arrays['ltype']
+        self._addrs = arrays['addrs']
+        self._alias = arrays['alias']
+        # None for version 1, where it's unknown
+        self._ordered = arrays.get('ordered')
+        self._root_ordered = bool(arrays['root_ordered'][0]) if 'root_ordered' in arrays else None
+        self._otype = arrays['otype']
+        self._ndim = arrays['ndim']
+        self._dims = arrays['dims']
+        self._dims_start = numpy.zeros((len(self._ndim)+1,), dtype='u8')
+        self._dims_start[1:] = numpy.cumsum(numpy.maximum(self._ndim, 0))
+        self._dtype_idx = arrays['dtype_idx']
+        codes = bytes(arrays['dtypes'].data).decode('utf-8')
+        self._dtypes = [h5o.index_dtype(x.encode('utf-8'))
+                        for x in codes.split('\n')] if codes else []
+
+    def __len__(self):
+        """ Number of links in the file """
+        return len(self._paths)
+
+    def matches(self, fid, filename):
+        """ Determine if the catalog describes the file *filename*, open
+        with the low-level FileID *fid*, in its current state. """
+        try:
+            size, mtime, root_addr = _file_state(fid, filename)
+        except OSError:
+            return False
+        return (size, mtime, root_addr) == (self._size, self._mtime, self._root_addr)
+
+    def _find(self, path):
+        i = bisect.bisect_left(self._paths, path)
+        if i < len(self._paths) and self._paths[i] == path:
+            return i
+        return -1
+
+    def lookup(self, path):
+        """ Row number for *path*, -1 if it doesn't exist, or UNKNOWN if the
+        path leads through a soft or external link, or a second hard link
+        to a group, which the catalog doesn't follow. """
+        path = path.strip(b'/')
+        if path == b'':
+            return UNKNOWN
+        parts = path.split(b'/')
+        if b'' in parts or b'.' in parts or b'..' in parts:
+            return UNKNOWN
+        for n in range(1, len(parts)):
+            i = self._find(b'/'.join(parts[:n]))
+            if i < 0:
+                return -1
+            if self._ltype[i] != h5l.TYPE_HARD or self._alias[i]:
+                return UNKNOWN
+            if self._otype[i] != h5o.TYPE_GROUP:
+                return -1
+        return self._find(path)
+
+    def __contains__(self, path):
+        """ True if an object exists at *path*.  Raises KeyError if the
+        catalog can't tell, including for soft and external links, which
+        may dangle. """
+        i = self.lookup(path)
+        if i is UNKNOWN or (i >= 0 and self._ltype[i] != h5l.TYPE_HARD):
+            raise KeyError(path)
+        return i >= 0
+
+    def info(self, path):
+        """ Dict describing the link at *path*: "link" (h5l.TYPE_*), and
+        for hard links "type" (h5o.TYPE_*) and "addr", plus "shape" and
+        "dtype" for datasets.  Returns None if there's no such link, and
+        raises KeyError if the catalog can't tell.
+        """
+        i = self.lookup(path)
+        if i is UNKNOWN:
+            raise KeyError(path)
+        if i < 0:
+            return None
+        out = {'link': int(self._ltype[i])}
+        if self._otype[i] >= 0:
+            out['type'] = int(self._otype[i])
+            out['addr'] = int(self._addrs[i])
+        if self._otype[i] == h5o.TYPE_DATASET:
+            shape = None
+            if self._ndim[i] >= 0:
+                start = int(self._dims_start[i])
+                stop = start + int(self._ndim[i])
+                shape = tuple(int(x) for x in self._dims[start:stop])
+            out['shape'] = shape
+            out['dtype'] = self._dtypes[self._dtype_idx[i]]
+        return out
+
+    def children(self, path):
+        """ Names of the links in group *path*, in name order.  Returns
+        UNKNOWN if the catalog can't tell, including for groups which list
+        their members in creation order, and None if there's no such
+        group. """
+        path = path.strip(b'/')
+        if self._ordered is None:
+            return UNKNOWN
+        if path == b'':
+            if self._root_ordered:
+                return UNKNOWN
+            lo, hi, depth = 0, len(self._paths), 1
+        else:
+            i = self.lookup(path)
+            if i is UNKNOWN:
+                return UNKNOWN
+            if i < 0 or self._otype[i] != h5o.TYPE_GROUP:
+                return None
+            if self._ltype[i] != h5l.TYPE_HARD or self._alias[i] or self._ordered[i]:
+                return UNKNOWN
+            # Descendants sort between "path/" and "path0" ('0' follows '/')
+            lo = bisect.bisect_left(self._paths, path + b'/')
+            hi = bisect.bisect_left(self._paths, path + b'0')
+            depth = int(self._depth[i]) + 1
+        idx = lo + numpy.nonzero(self._depth[lo:hi] == depth)[0]
+        return [self._paths[x].rsplit(b'/', 1)[-1] for x in idx]
+
+
+def load(path):
+    """ Load a sidecar catalog written by build() """
+    return Catalog(path)
@@ -0,0 +1,290 @@
+# This file is part of h5py, a Python interface to the HDF5 library.
+#
+# http://www.h5py.org
+#
+# Copyright 2008-2013 Andrew Collette and contributors
+#
+# License:  Standard 3-clause BSD; see "license.txt" for full license terms
+#           and contributor agreement.
+
+"""
+    Memory-mapped, read-only access to the chunks of a chunked dataset.
+"""
+
+from __future__ import absolute_import
+
+import mmap
+import itertools
+
+from six.moves import xrange
+
+import numpy
+
+from .. import h5d
+from .base import phil
+from .dataset import _check_raw_layout
+
+
+def _normalize_args(args, shape):
+    """ Turn simple slicing arguments into a list of (start, count, step)
+    triples, one per axis, plus a list of axes to drop from the result.
+
+    Returns None if the arguments use anything other than integers, slices
+    and a single Ellipsis.
+    """
+    if not isinstance(args, tuple):
+        args = (args,)
+
+    ellipses = [i for i, a in enumerate(args) if a is Ellipsis]
+    if len(ellipses) > 1:
+        return None
+    if ellipses:
+        idx = ellipses[0]
+        fill = (slice(None),)*(len(shape) - len(args) + 1)
+        args = args[:idx] + fill + args[idx+1:]
+    if len(args) > len(shape):
+        raise ValueError("Too many indices for dataset of rank %d" % len(shape))
+    args = args + (slice(None),)*(len(shape) - len(args))
+
+    sel = []
+    drop = []
+    for axis, (arg, length) in enumerate(zip(args, shape)):
+        if isinstance(arg, slice):
+            start, stop, step = arg.indices(length)
+            if step < 1:
+                return None
+            count = max(0, (stop - start + step - 1) // step)
+            sel.append((start, count, step))
+        else:
+            if numpy.ndim(arg) != 0:
+                return None
+            try:
+                index = int(arg)
+            except (TypeError, ValueError):
+                return None
+            if index < 0:
+                index += length
+            if not 0 <= index < length:
+                raise ValueError("Index (%s) out of range (0-%d)" % (arg, length-1))
+            sel.append((index, 1, 1))
+            drop.append(axis)
+
+    return sel, drop
+
+
+class ChunkMap(object):
+
+    """
+        Lazy, read-only array-like view of a chunked dataset.
+
+        Unfiltered chunks are read straight out of a memory map of the file,
+        without going through HDF5 or its chunk cache.  Chunks stored through
+        a filter pipeline are read with normal HDF5 calls, and chunks which
+        have not been allocated are filled with the dataset's fill value.
+
+        Chunk locations are looked up on first use and then remembered, so
+        the map reflects the file at that point; create a new one after
+        resizing or rewriting the dataset.  Call close() (or use it as a
+        context manager) to release the memory map.
+    """
+
+    def __init__(self, dset):
+        """ Create a map over Dataset "dset" """
+        with phil:
+            if not hasattr(dset.id, 'get_chunk_info_by_coord'):
+                raise NotImplementedError("Chunk mapping requires HDF5 1.10.5 or later")
+            dcpl = dset.id.get_create_plist()
+            if dcpl.get_layout() != h5d.CHUNKED:
+                raise TypeError("Only chunked datasets can be chunk-mapped")
+            driver = dset.file.driver
+            if driver not in ('sec2', 'stdio'):
+                raise TypeError("Memory mapping requires the sec2 or stdio driver (not %s)" % driver)
+
+            dt = dset.dtype
+            _check_raw_layout(dset.id.get_type(), dt)
+
+            if dset.file.mode == 'r+':
+                dset.file.flush()
+
+            self._dset = dset
+            self._shape = dset.shape
+            self._dtype = dt
+            self._chunks = dcpl.get_chunk()
+            self._nfilters = dcpl.get_nfilters()
+            self._fillvalue = dset.fillvalue
+            self._chunk_nbytes = int(numpy.product(self._chunks))*dt.itemsize
+            self._index = {}
+            self._userblock = dset.file.userblock_size
+            # Added to chunk addresses; see _find_base
+            self._base = 0 if self._userblock == 0 else None
+
+            self._fobj = open(dset.file.filename, 'rb')
+            try:
+                self._mmap = mmap.mmap(self._fobj.fileno(), 0, access=mmap.ACCESS_READ)
+            except Exception:
+                self._fobj.close()
+                raise
+
+    @property
+    def shape(self):
+        """ Shape of the mapped dataset """
+        return self._shape
+
+    @property
+    def dtype(self):
+        """ On-disk NumPy dtype of the mapped dataset """
+        return self._dtype
+
+    @property
+    def chunks(self):
+        """ Chunk shape of the mapped dataset """
+        return self._chunks
+
+    @property
+    def ndim(self):
+        return len(self._shape)
+
+    @property
+    def size(self):
+        return int(numpy.product(self._shape))
+
+    def __len__(self):
+        if len(self._shape) == 0:
+            raise TypeError("Attempt to take len() of scalar dataset")
+        return self._shape[0]
+
+    def close(self):
+        """ Release the memory map and the underlying file handle.
+
+        Arrays already returned from the map remain valid.
+        """
+        if self._mmap is not None:
+            self._mmap.close()
+            self._fobj.close()
+            self._mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _chunk_location(self, coord):
+        """ Return the file address of chunk "coord" (in chunk units) if it
+        can be mapped, False if it's unallocated, or None if it has to be
+        read through HDF5.
+        """
+        try:
+            return self._index[coord]
+        except KeyError:
+            pass
+
+        offset = tuple(c*n for c, n in zip(coord, self._chunks))
+        with phil:
+            _, mask, addr, size = self._dset.id.get_chunk_info_by_coord(offset)
+
+        if addr is None:
+            loc = False
+        elif size == self._chunk_nbytes and \
+             (self._nfilters == 0 or mask == (1 << self._nfilters) - 1):
+            if self._base is None:
+                self._base = self._find_base(coord, addr)
+                if self._base is None:
+                    return None     # Try again with the next chunk
+            loc = addr + self._base
+        else:
+            loc = None
+        self._index[coord] = loc
+        return loc
+
+    def _find_base(self, coord, addr):
+        """ Determine whether chunk addresses need the user block size
+        adding to them.  Some HDF5 1.10 releases report addresses relative
+        to the end of the user block (the base address) rather than as file
+        offsets.  Chunk "coord", at HDF5 address "addr", is read through
+        HDF5 and compared with the file at both candidate offsets; returns
+        the one to add, or None if the chunk matches both or neither.
+        """
+        region = tuple(slice(c*n, min((c+1)*n, length))
+                       for c, n, length in zip(coord, self._chunks, self._shape))
+        expected = self._dset[region].tostring()
+        src = tuple(slice(0, r.stop - r.start) for r in region)
+
+        matches = []
+        for base in (0, self._userblock):
+            if addr + base + self._chunk_nbytes > len(self._mmap):
+                continue
+            view = numpy.frombuffer(self._mmap, dtype=self._dtype,
+                                    count=int(numpy.product(self._chunks)),
+                                    offset=addr + base).reshape(self._chunks)
+            if view[src].tostring() == expected:
+                matches.append(base)
+        return matches[0] if len(matches) == 1 else None
+
+    def __getitem__(self, args):
+        """ Read a slice.  Integers, positive-step slices and Ellipsis are
+        assembled from chunk views; anything else is passed to the dataset.
+        """
+        if self._mmap is None:
+            raise ValueError("Chunk map is closed")
+
+        result = _normalize_args(args, self._shape)
+        if result is None:
+            return self._dset[args]
+        sel, drop = result
+
+        out = numpy.empty(tuple(count for start, count, step in sel), dtype=self._dtype)
+        if out.size == 0:
+            return out.reshape(tuple(n for axis, n in enumerate(out.shape) if axis not in drop))
+
+        # For each axis, the chunk indices touched by the selection
+        ranges = []
+        for (start, count, step), csize in zip(sel, self._chunks):
+            last = start + (count-1)*step
+            ranges.append(xrange(start // csize, last // csize + 1))
+
+        for coord in itertools.product(*ranges):
+            src = []
+            dst = []
+            absolute = []
+            for (start, count, step), csize, c in zip(sel, self._chunks, coord):
+                lo = c*csize
+                hi = lo + csize
+                kmin = max(0, -(-(lo - start) // step))
+                kmax = min(count, -(-(hi - start) // step))
+                if kmin >= kmax:
+                    break
+                first = start + kmin*step
+                stop = start + (kmax-1)*step + 1
+                src.append(slice(first - lo, stop - lo, step))
+                absolute.append(slice(first, stop, step))
+                dst.append(slice(kmin, kmax))
+            else:
+                dst = tuple(dst)
+                loc = self._chunk_location(coord)
+                if loc is False:
+                    out[dst] = self._fillvalue
+                elif loc is None:
+                    out[dst] = self._dset[tuple(absolute)]
+                else:
+                    view = numpy.frombuffer(self._mmap, dtype=self._dtype,
+                                            count=int(numpy.product(self._chunks)),
+                                            offset=loc).reshape(self._chunks)
+                    out[dst] = view[tuple(src)]
+
+        if drop:
+            out = out.reshape(tuple(n for axis, n in enumerate(out.shape) if axis not in drop))
+            if out.ndim == 0:
+                return out[()]
+        return out
+
+    def __array__(self, dtype=None):
+        arr = self[...]
+        if dtype is not None:
+            arr = arr.astype(dtype)
+        return arr
+
+    def __repr__(self):
+        if self._mmap is None:
+            return '<Closed chunk map>'
+        return '<Chunk map of %r: shape %s, chunks %s>' % (self._dset, self._shape, self._chunks)
@@ -11,6 +11,7 @@ from __future__ import absolute_import
 
 import posixpath as pp
 import sys
+from threading import local
 
 import six
 from six.moves import xrange
@@ -18,7 +19,7 @@ from six.moves import xrange
 import numpy
 
 from .. import h5s, h5t, h5r, h5d
-from .base import HLObject, phil, with_phil
+from .base import HLObject, phil, with_phil, set_attr_options, file_cache
 from . import filters
 from . import selections as sel
 from . import selections2 as sel2
@@ -41,10 +42,27 @@ def readtime_dtype(basetype, names):
 
     return numpy.dtype([(name, basetype.fields[name][0]) for name in names])
 
+def _check_raw_layout(tid, dt):
+    """ Verify that NumPy dtype "dt" describes the in-file layout of "tid".
+
+    Raises TypeError if the bytes stored on disk can't be reinterpreted
+    directly as "dt" (e.g. padded compound types).
+    """
+    if dt.hasobject:
+        raise TypeError("Can't map datasets with object or variable-length types")
+    if tid.get_size() != dt.itemsize:
+        raise TypeError("In-file type size (%d) differs from dtype %s" % (tid.get_size(), dt))
+    if isinstance(tid, h5t.TypeCompoundID) and dt.names is not None:
+        for idx in xrange(tid.get_nmembers()):
+            name = tid.get_member_name(idx).decode('utf8')
+            if name not in dt.fields or dt.fields[name][1] != tid.get_member_offset(idx):
+                raise TypeError("Compound layout on disk differs from dtype %s" % dt)
+
 def make_new_dset(parent, shape=None, dtype=None, data=None,
                  chunks=None, compression=None, shuffle=None,
                     fletcher32=None, maxshape=None, compression_opts=None,
-                  fillvalue=None, scaleoffset=None, track_times=None):
+                  fillvalue=None, scaleoffset=None, track_times=None,
+                  attr_storage=None, track_attr_order=None):
     """ Return a new low-level dataset identifier
 
     Only creates anonymous datasets.
@@ -115,6 +133,8 @@ def make_new_dset(parent, shape=None, dtype=None, data=None,
     elif track_times is not None:
         raise TypeError("track_times must be either True or False")
 
+    set_attr_options(dcpl, attr_storage, track_attr_order)
+
     if maxshape is not None:
         maxshape = tuple(m if m is not None else h5s.UNLIMITED for m in maxshape)
     sid = h5s.create_simple(shape, maxshape)
@@ -128,6 +148,10 @@ def make_new_dset(parent, shape=None, dtype=None, data=None,
     return dset_id
 
 
+# Marks attributes not yet read from the file, where None is a valid value
+_unset = object()
+
+
 class AstypeContext(object):
 
     def __init__(self, dset, dtype):
@@ -166,6 +190,7 @@ class Dataset(HLObject):
     @with_phil
     def shape(self):
         """Numpy-style shape tuple giving dataset dimensions"""
+        # Not cached, as the extent can be changed through other handles
         return self.id.shape
     @shape.setter
     @with_phil
@@ -182,7 +207,9 @@ class Dataset(HLObject):
     @with_phil
     def dtype(self):
         """Numpy dtype representing the datatype"""
-        return self.id.dtype
+        if self._dtype is None:
+            self._dtype = self.id.dtype
+        return self._dtype
 
     @property
     @with_phil
@@ -196,10 +223,13 @@ class Dataset(HLObject):
     @with_phil
     def chunks(self):
         """Dataset chunks (or None)"""
-        dcpl = self._dcpl
-        if dcpl.get_layout() == h5d.CHUNKED:
-            return dcpl.get_chunk()
-        return None
+        if self._chunks is _unset:
+            dcpl = self._dcpl
+            if dcpl.get_layout() == h5d.CHUNKED:
+                self._chunks = dcpl.get_chunk()
+            else:
+                self._chunks = None
+        return self._chunks
 
     @property
     @with_phil
@@ -245,9 +275,11 @@ class Dataset(HLObject):
     def maxshape(self):
         """Shape up to which this dataset can be resized.  Axes with value
         None have no resize limit. """
-        space = self.id.get_space()
-        dims = space.get_simple_extent_dims(True)
-        return tuple(x if x != h5s.UNLIMITED else None for x in dims)
+        if self._maxshape is None:
+            space = self.id.get_space()
+            dims = space.get_simple_extent_dims(True)
+            self._maxshape = tuple(x if x != h5s.UNLIMITED else None for x in dims)
+        return self._maxshape
 
     @property
     @with_phil
@@ -257,20 +289,46 @@ class Dataset(HLObject):
         dcpl = self._dcpl.get_fill_value(arr)
         return arr[0]
 
+    # Metadata which can't change after creation is read from the file on
+    # first use and kept.
+    _dcpl_obj = None
+    _filters_dict = None
+    _dtype = None
+    _chunks = _unset
+    _maxshape = None
+
+    @property
+    @with_phil
+    def _dcpl(self):
+        """ Dataset creation property list """
+        if self._dcpl_obj is None:
+            self._dcpl_obj = self.id.get_create_plist()
+        return self._dcpl_obj
+
+    @property
+    @with_phil
+    def _filters(self):
+        """ Filter settings, as returned by filters.get_filters """
+        if self._filters_dict is None:
+            self._filters_dict = filters.get_filters(self._dcpl)
+        return self._filters_dict
+
     @with_phil
-    def __init__(self, bind):
+    def __init__(self, bind, lazy_meta=True):
         """ Create a new Dataset object by binding to a low-level DatasetID.
-        """
-        from threading import local
 
+        If lazy_meta is False, the creation property list and filter
+        settings are read from the file right away, rather than when first
+        needed.
+        """
         if not isinstance(bind, h5d.DatasetID):
             raise ValueError("%s is not a DatasetID" % bind)
         HLObject.__init__(self, bind)
 
-        self._dcpl = self.id.get_create_plist()
-        self._filters = filters.get_filters(self._dcpl)
+        if not lazy_meta:
+            self._dcpl_obj = self.id.get_create_plist()
+            self._filters_dict = filters.get_filters(self._dcpl_obj)
         self._local = local()
-        self._local.astype = None
 
     def resize(self, size, axis=None):
         """ Resize the dataset, or the specified axis.
@@ -448,7 +506,13 @@ class Dataset(HLObject):
         # Perfom the actual read
         mspace = h5s.create_simple(mshape)
         fspace = selection._id
-        self.id.read(mspace, fspace, arr, mtype)
+        if new_dtype.kind == 'S' and \
+          h5t.check_dtype(vlen=self.dtype) in (six.binary_type, six.text_type):
+            # Variable-length to fixed-width strings, without an
+            # intermediate Python object per element
+            self.id.read_vlen_str(fspace, arr)
+        else:
+            self.id.read(mspace, fspace, arr, mtype)
 
         # Patch up the output for NumPy
         if len(names) == 1:
@@ -479,6 +543,23 @@ class Dataset(HLObject):
         # Generally we try to avoid converting the arrays on the Python
         # side.  However, for compound literals this is unavoidable.
         vlen = h5t.check_dtype(vlen=self.dtype)
+
+        # Fixed-width strings into a vlen string dataset are written
+        # directly, rather than through an object array
+        if vlen in (bytes, six.text_type) and len(names) == 0 and \
+          isinstance(val, numpy.ndarray) and val.dtype.kind in ('S', 'U'):
+            selection = sel.select(self.shape, args, dsid=self.id)
+            if selection.nselect == 0:
+                return
+            val = numpy.ascontiguousarray(val)
+            if val.shape == () and selection.mshape != ():
+                val2 = numpy.empty(selection.mshape[-1], dtype=val.dtype)
+                val2[...] = val
+                val = val2
+            for fspace in selection.broadcast(val.shape):
+                self.id.write_vlen_str(fspace, val)
+            return
+
         if vlen not in (bytes, six.text_type, None):
             try:
                 val = numpy.asarray(val, dtype=vlen)
@@ -631,6 +712,175 @@ class Dataset(HLObject):
             for fspace in dest_sel.broadcast(source_sel.mshape):
                 self.id.write(mspace, fspace, source)
 
+    def read_vlen_columnar(self, source_sel=None):
+        """ Read variable-length data as (offsets, values) arrays.
+
+        Element i of the selection, in C order, is
+        values[offsets[i]:offsets[i+1]].  Offsets are int64.  Values has
+        the base type of a numeric vlen dataset, or is a uint8 array of
+        the encoded bytes for strings.  The selection must be the output
+        of numpy.s_[<args>]; the default is the whole dataset.
+        """
+        with phil:
+            if source_sel is None:
+                source_sel = sel.SimpleSelection(self.shape)
+            else:
+                source_sel = sel.select(self.shape, source_sel, self.id)
+            return self.id.read_vlen_columnar(source_sel._id)
+
+    def write_vlen_columnar(self, offsets, values, dest_sel=None):
+        """ Write variable-length data from (offsets, values) arrays.
+
+        The layout is the one returned by read_vlen_columnar, with one
+        more offset than there are points in the selection.  For string
+        datasets, values may also be a bytes object.
+        """
+        with phil:
+            if dest_sel is None:
+                dest_sel = sel.SimpleSelection(self.shape)
+            else:
+                dest_sel = sel.select(self.shape, dest_sel, self.id)
+            if isinstance(values, bytes):
+                values = numpy.frombuffer(values, dtype='u1')
+            self.id.write_vlen_columnar(dest_sel._id, numpy.asarray(offsets),
+                                        numpy.asarray(values))
+
+    def read_refs_as_paths(self, source_sel=None):
+        """ Read object references as the paths of their targets.
+
+        Returns an object array with the absolute path of the object each
+        reference points to, or None for null references.  No Reference
+        instances are created and no objects are opened; distinct targets
+        are looked up once, in a single pass over the file, and cached
+        until links in the file are removed or moved through h5py.  The
+        selection must be the output of numpy.s_[<args>].
+        """
+        with phil:
+            if h5t.check_dtype(ref=self.dtype) is not h5r.Reference:
+                raise TypeError("Dataset must contain object references")
+            if source_sel is None:
+                source_sel = sel.SimpleSelection(self.shape)
+            else:
+                source_sel = sel.select(self.shape, source_sel, self.id)
+
+            refs = numpy.zeros(source_sel.mshape, dtype='u8')
+            if source_sel.nselect > 0:
+                mspace = h5s.create_simple((source_sel.nselect,))
+                self.id.read(mspace, source_sel._id, refs, h5t.STD_REF_OBJ)
+            names = h5r.dereference_many(refs, self.id,
+                                         file_cache(self.id, 'ref_names'))
+
+            decoded = {}
+            out = numpy.empty(names.shape, dtype=object)
+            flat = out.reshape(-1)
+            for i, name in enumerate(names.flat):
+                if name not in decoded:
+                    decoded[name] = self._d(name)
+                flat[i] = decoded[name]
+            return out
+
+    def read_regions(self, refs, ragged=False):
+        """ Read the regions of many RegionReferences to this dataset.
+
+        *refs* is a sequence of RegionReference objects, e.g. read from a
+        dataset of region references.  All the regions are decoded first,
+        then the elements they cover are fetched with a single read.
+        Returns a list with a 1-D array of each region's elements, in the
+        order dset[ref] gives them; null references give empty arrays.
+        With ragged=True, returns an (offsets, values) pair instead, where
+        region i is values[offsets[i]:offsets[i+1]].
+        """
+        with phil:
+            refs = numpy.asarray(refs, dtype=object).reshape(-1)
+            offsets, points = h5r.get_region_points(self.id, refs)
+
+            # Read each element once, however many regions cover it
+            uniq, inverse = numpy.unique(points, return_inverse=True)
+            values = self._read_flat(uniq)[inverse]
+
+            if ragged:
+                return offsets, values
+            if len(refs) == 0:
+                return []
+            return numpy.split(values, offsets[1:-1])
+
+    def _read_flat(self, indices):
+        """ Read the elements at sorted, distinct *indices* into the
+        flattened dataset, as a 1-D array. """
+        if len(indices) == 0:
+            return numpy.empty((0,), dtype=self.dtype)
+        if self.shape == ():
+            return numpy.asarray(self[()]).reshape((1,))
+
+        # If the elements are dense enough, read every row they span with
+        # one hyperslab and pick them out; otherwise select them as points.
+        rowsize = int(numpy.product(self.shape[1:]))
+        lo = int(indices[0]) // rowsize
+        hi = int(indices[-1]) // rowsize + 1
+        if (hi - lo)*rowsize <= 4*len(indices):
+            return self[lo:hi].reshape(-1)[indices - lo*rowsize]
+
+        coords = numpy.array(numpy.unravel_index(indices, self.shape)).T
+        fspace = self.id.get_space()
+        fspace.select_elements(numpy.ascontiguousarray(coords, dtype='u8'))
+        out = numpy.empty((len(indices),), dtype=self.dtype)
+        mspace = h5s.create_simple((len(indices),))
+        self.id.read(mspace, fspace, out)
+        return out
+
+    def as_mmap(self):
+        """ Return a read-only numpy.memmap over the dataset's raw data.
+
+        Only contiguous datasets without filters or external storage, in
+        files opened with the "sec2" or "stdio" drivers, can be mapped.
+        The dtype (including byte order) is that of the data on disk, and
+        pages are read from the file on demand rather than copied up front.
+
+        The offset reported by HDF5 already accounts for any user block.
+        Storage must have been allocated, e.g. by writing to the dataset.
+
+        The map stays valid after the file is closed, but will not reflect
+        writes made through h5py after it was created.
+        """
+        with phil:
+            if self._dcpl.get_layout() != h5d.CONTIGUOUS:
+                raise TypeError("Only contiguous datasets can be memory-mapped")
+            if self._dcpl.get_nfilters() > 0:
+                raise TypeError("Filtered datasets can't be memory-mapped")
+            if self._dcpl.get_external_count() > 0:
+                raise TypeError("Datasets with external storage can't be memory-mapped")
+            if self.file.driver not in ('sec2', 'stdio'):
+                raise TypeError("Memory mapping requires the sec2 or stdio driver (not %s)" % self.file.driver)
+
+            dt = self.dtype
+            _check_raw_layout(self.id.get_type(), dt)
+
+            shape = self.shape
+            if numpy.product(shape) == 0:
+                return numpy.empty(shape, dtype=dt)
+
+            offset = self.id.get_offset()
+            if offset is None:
+                raise ValueError("Dataset storage has not been allocated")
+
+            # Make sure the raw data has actually reached the disk
+            if self.file.mode == 'r+':
+                self.file.flush()
+            return numpy.memmap(self.file.filename, dtype=dt, mode='r',
+                                offset=offset, shape=shape)
+
+    def mmap_chunks(self):
+        """ Return a lazy, read-only array-like view backed by a memory map.
+
+        Slicing the returned ChunkMap assembles the result directly from
+        the file's unfiltered chunks, bypassing HDF5 and its chunk cache.
+        Filtered chunks fall back to normal reads.  Only chunked datasets
+        in files opened with the "sec2" or "stdio" driver are supported,
+        and HDF5 1.10.5 or later is required.
+        """
+        from .chunkmap import ChunkMap
+        return ChunkMap(self)
+
     @with_phil
     def __array__(self, dtype=None):
         """ Create a Numpy array containing the whole dataset.  DON'T THINK
@@ -11,12 +11,44 @@ from __future__ import absolute_import
 
 import numpy
 
-from .. import h5ds
+from .. import h5ds, h5d, h5o, h5r
 from . import base
 from .base import phil, with_phil
 from .dataset import Dataset, readtime_dtype
 
 
+def scale_addrs(dsid):
+    """ Object addresses of the scales attached to each dimension of the
+    dataset *dsid*, from the per-file cache (see base.file_cache) """
+    cache = base.file_cache(dsid, 'dimscales')
+    addr = h5o.get_info(dsid).addr
+    dims = cache.get(addr)
+    if dims is None:
+        dims = tuple(tuple(x) for x in h5ds.get_dimension_list(dsid))
+        cache[addr] = dims
+    return dims
+
+
+def scale_paths(dsid, addrs):
+    """ Absolute paths (bytes) of the scales at *addrs* """
+    return h5r.dereference_many(numpy.array(addrs, dtype='u8'), dsid,
+                                base.file_cache(dsid, 'ref_names'))
+
+
+def open_scale(dsid, addr, path):
+    """ Open the scale at *addr*, whose path according to scale_paths is
+    *path*.  Scales without one (e.g. reachable only through an external
+    link) are opened by address. """
+    if path is None:
+        return h5r.dereference(addr, dsid)
+    return h5d.open(dsid, path)
+
+
+def invalidate_scales(dsid):
+    """ Forget cached scale attachments and names in the file of *dsid* """
+    base.clear_file_caches(dsid)
+
+
 class DimensionProxy(base.CommonStateObject):
 
     @property
@@ -55,52 +87,61 @@ class DimensionProxy(base.CommonStateObject):
 
     @with_phil
     def __len__(self):
-        return h5ds.get_num_scales(self._id, self._dimension)
+        return len(self._addrs())
+
+    def _addrs(self):
+        return scale_addrs(self._id)[self._dimension]
+
+    def _scale_names(self, addrs, paths):
+        """ Scale names (bytes) of the scales at *addrs*, cached per file """
+        cache = base.file_cache(self._id, 'scale_names')
+        names = []
+        for addr, path in zip(addrs, paths):
+            if addr not in cache:
+                cache[addr] = h5ds.get_scale_name(open_scale(self._id, addr, path))
+            names.append(cache[addr])
+        return names
 
     @with_phil
     def __getitem__(self, item):
+        addrs = self._addrs()
+        if len(addrs) == 0:
+            # What H5DSiterate does, which this used to call
+            raise RuntimeError("No dimension scales attached to dimension %d" % self._dimension)
         if isinstance(item, int):
-            scales = []
-            def f(dsid):
-                scales.append(Dataset(dsid))
-            h5ds.iterate(self._id, self._dimension, f, 0)
-            return scales[item]
+            addr = addrs[item]
+            return Dataset(open_scale(self._id, addr, scale_paths(self._id, [addr])[0]))
         else:
-            def f(dsid):
-                if h5ds.get_scale_name(dsid) == self._e(item):
-                    return Dataset(dsid)
-            res = h5ds.iterate(self._id, self._dimension, f, 0)
-            if res is None:
-                raise KeyError('%s not found' % item)
-            return res
+            paths = scale_paths(self._id, addrs)
+            name = self._e(item)
+            for addr, path, scale_name in zip(addrs, paths, self._scale_names(addrs, paths)):
+                if scale_name == name:
+                    return Dataset(open_scale(self._id, addr, path))
+            raise KeyError('%s not found' % item)
 
     def attach_scale(self, dset):
         with phil:
             h5ds.attach_scale(self._id, dset.id, self._dimension)
+            invalidate_scales(self._id)
 
     def detach_scale(self, dset):
         with phil:
             h5ds.detach_scale(self._id, dset.id, self._dimension)
+            invalidate_scales(self._id)
 
     def items(self):
         with phil:
-            scales = []
-            def f(dsid):
-                scales.append(dsid)
-            
-            # H5DSiterate raises an error if there are no dimension scales,
-            # rather than iterating 0 times.  See #483.
-            if len(self) > 0:
-                h5ds.iterate(self._id, self._dimension, f, 0)
-                
-            return [
-                (self._d(h5ds.get_scale_name(id)), Dataset(id))
-                for id in scales
-                ]
+            addrs = self._addrs()
+            paths = scale_paths(self._id, addrs)
+            names = self._scale_names(addrs, paths)
+            return [(self._d(name), Dataset(open_scale(self._id, addr, path)))
+                    for name, addr, path in zip(names, addrs, paths)]
 
     def keys(self):
         with phil:
-            return [key for (key, val) in self.items()]
+            addrs = self._addrs()
+            paths = scale_paths(self._id, addrs)
+            return [self._d(name) for name in self._scale_names(addrs, paths)]
 
     def values(self):
         with phil:
@@ -153,3 +194,4 @@ class DimensionManager(base.DictCompat, base.CommonStateObject):
     def create_scale(self, dset, name=''):
         with phil:
             h5ds.set_scale(dset.id, self._e(name))
+            invalidate_scales(dset.id)
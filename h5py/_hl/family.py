@@ -0,0 +1,327 @@
+# This file is part of h5py, a Python interface to the HDF5 library.
+#
+# http://www.h5py.org
+#
+# Copyright 2008-2013 Andrew Collette and contributors
+#
+# License:  Standard 3-clause BSD; see "license.txt" for full license terms
+#           and contributor agreement.
+
+"""
+    Support for family files: member size detection, and a file-like
+    object which performs I/O on several members at once.
+"""
+
+from __future__ import absolute_import
+
+import io
+import os
+import struct
+
+import numpy
+
+from multiprocessing.pool import ThreadPool
+
+SIGNATURE = b'\x89HDF\r\n\x1a\n'
+
+# Driver info names written by HDF5's family driver (and h5fd.PYFAMILY_NCSA)
+# and by h5fd.PYFAMILY; both hold the member size
+NCSA_FAMILY = b'NCSAfami'
+FAMILY_DRIVER_NAMES = (NCSA_FAMILY, b'H5PYfami')
+
+# Same default as h5p.PropFAID.set_fapl_family
+DEFAULT_MEMB_SIZE = 2**31 - 1
+
+
+def member_names(pattern):
+    """ Names of the existing members of family *pattern*, in order """
+    names = []
+    while os.path.exists(pattern % len(names)):
+        names.append(pattern % len(names))
+    return names
+
+
+def _superblock_driver_info(fname):
+    """ Read the driver info name and, for the family drivers, member size
+    from a version 0 or 1 superblock, or return None.  Later superblock
+    versions keep driver info in an object header message, which isn't
+    worth decoding here. """
+    with open(fname, 'rb') as f:
+        base = 0
+        while True:
+            f.seek(base)
+            sig = f.read(8)
+            if len(sig) < 8:
+                return None
+            if sig == SIGNATURE:
+                break
+            base = 512 if base == 0 else 2*base
+
+        head = f.read(16)
+        if len(head) < 16 or head[0:1] not in (b'\x00', b'\x01'):
+            return None
+        sizeof_addr = ord(head[5:6])
+        fmt = {2: '<H', 4: '<I', 8: '<Q'}.get(sizeof_addr)
+        if fmt is None:
+            return None
+        if head[0:1] == b'\x01':
+            f.read(4)   # Indexed storage K and reserved
+        addrs = f.read(4*sizeof_addr)
+        if len(addrs) < 4*sizeof_addr:
+            return None
+        drvinfo, = struct.unpack(fmt, addrs[3*sizeof_addr:])
+        if drvinfo == (1 << 8*sizeof_addr) - 1:  # Undefined address
+            return None
+
+        f.seek(base + drvinfo)
+        info = f.read(24)
+        if len(info) < 16:
+            return None
+        name = info[8:16]
+        if name not in FAMILY_DRIVER_NAMES or len(info) < 24:
+            return name, None
+        return name, struct.unpack('<Q', info[16:24])[0]
+
+
+def driver_info_name(pattern):
+    """ Superblock driver info name of the existing family *pattern*, e.g.
+    b"NCSAfami" if it was written by HDF5's family driver.  None if there's
+    no driver info, or it can't be read. """
+    names = member_names(pattern)
+    if not names:
+        return None
+    try:
+        info = _superblock_driver_info(names[0])
+    except (IOError, OSError, struct.error):
+        return None
+    return None if info is None else info[0]
+
+
+def guess_memb_size(pattern):
+    """ Determine the member size of the existing family *pattern*.
+
+    Every member but the last is exactly one member size long, so with
+    two or more members the answer is the size of the first.  Otherwise
+    it's read from the superblock, if possible.  Returns None if the family
+    doesn't exist or the size can't be determined.
+    """
+    names = member_names(pattern)
+    if len(names) > 1:
+        return os.path.getsize(names[0])
+    if names:
+        try:
+            info = _superblock_driver_info(names[0])
+        except (IOError, OSError, struct.error):
+            return None
+        return None if info is None else info[1]
+    return None
+
+
+class FamilyFile(object):
+
+    """
+        Seekable file-like object spanning the members of a family file.
+
+        Reads and writes which cross member boundaries are split up, and
+        the pieces are handled concurrently by a pool of threads, one per
+        member touched.  Used by File(..., driver='family', threads=N)
+        through the file-object driver.
+    """
+
+    def __init__(self, pattern, memb_size=None, mode='rb', threads=4):
+        """ Open the family *pattern* (a name containing e.g. "%d").
+
+        mode
+            'rb', 'r+b' (existing family) or 'w+b' (create or truncate).
+        memb_size
+            Member size in bytes.  If None, it's taken from the existing
+            family, or from the superblock when HDF5 opens the file.
+        """
+        if mode not in ('rb', 'r+b', 'w+b'):
+            raise ValueError("Invalid mode %r" % mode)
+        if memb_size is None and mode == 'w+b':
+            raise ValueError("A member size is required to create a family")
+        self.pattern = pattern
+        self.mode = mode
+        if memb_size is None:
+            memb_size = guess_memb_size(pattern)
+        self.memb_size = memb_size
+        self._threads = threads
+        self._pool = None
+        self._pos = 0
+
+        if mode == 'w+b':
+            for name in member_names(pattern)[1:]:
+                os.unlink(name)
+            self._members = [io.open(pattern % 0, 'w+b', buffering=0)]
+        else:
+            names = member_names(pattern)
+            if not names:
+                raise IOError(2, "No such file or directory", pattern % 0)
+            self._members = [io.open(name, mode, buffering=0) for name in names]
+
+    @property
+    def closed(self):
+        return self._members is None
+
+    def _member(self, idx):
+        """ Get the file object for member *idx*, creating members as
+        needed when writing. """
+        while idx >= len(self._members):
+            if self.mode == 'rb':
+                return None
+            name = self.pattern % len(self._members)
+            self._members.append(io.open(name, 'w+b', buffering=0))
+        return self._members[idx]
+
+    def _segments(self, start, size):
+        """ Split [start, start+size) into (member, offset, lo, hi) pieces,
+        where lo/hi index into the caller's buffer. """
+        msize = self.memb_size
+        if not msize:
+            return [(0, start, 0, size)]
+        segs = []
+        done = 0
+        while done < size:
+            idx, off = divmod(start + done, msize)
+            n = min(msize - off, size - done)
+            segs.append((idx, off, done, done + n))
+            done += n
+        return segs
+
+    def _run(self, func, segs):
+        if len(segs) == 1 or self._threads <= 1:
+            return [func(seg) for seg in segs]
+        if self._pool is None:
+            self._pool = ThreadPool(self._threads)
+        return self._pool.map(func, segs)
+
+    def seek(self, offset, whence=0):
+        if whence == 0:
+            self._pos = offset
+        elif whence == 1:
+            self._pos += offset
+        elif whence == 2:
+            self._pos = self._eof() + offset
+        else:
+            raise ValueError("Invalid whence (%s)" % whence)
+        return self._pos
+
+    def tell(self):
+        return self._pos
+
+    def _eof(self):
+        # The end of the last non-empty member; truncation leaves empty
+        # members behind.
+        for idx in range(len(self._members) - 1, -1, -1):
+            size = os.fstat(self._members[idx].fileno()).st_size
+            if size > 0 or idx == 0:
+                return idx*(self.memb_size or 0) + size
+
+    def readinto(self, buf):
+        """ Fill *buf* from the current position.  Holes in members before
+        the end of the family read as zeros. """
+        out = numpy.asarray(buf).view('u1').reshape(-1)
+        size = min(len(out), max(0, self._eof() - self._pos))
+
+        def read(seg):
+            idx, off, lo, hi = seg
+            member = self._member(idx)
+            done = 0
+            if member is not None:
+                member.seek(off)
+                while lo + done < hi:
+                    n = member.readinto(out[lo+done:hi])
+                    if not n:
+                        break
+                    done += n
+            out[lo+done:hi] = 0
+
+        self._run(read, self._segments(self._pos, size))
+        self._pos += size
+        return size
+
+    def read(self, size=-1):
+        if size < 0:
+            size = max(0, self._eof() - self._pos)
+        buf = bytearray(size)
+        n = self.readinto(buf)
+        return bytes(buf[:n])
+
+    def write(self, data):
+        if isinstance(data, (bytes, bytearray)):
+            data = numpy.frombuffer(data, dtype='u1')
+        else:
+            data = numpy.asarray(data).view('u1').reshape(-1)
+
+        def write(seg):
+            idx, off, lo, hi = seg
+            member = self._member(idx)
+            member.seek(off)
+            member.write(data[lo:hi])
+
+        segs = self._segments(self._pos, len(data))
+        # Members before the last must be full-sized, so pad (or create)
+        # any that the write skips over.
+        last = segs[-1][0] if segs else 0
+        nmembers = len(self._members)
+        for idx in range(nmembers - 1, last):
+            member = self._member(idx)
+            if os.fstat(member.fileno()).st_size < self.memb_size:
+                member.truncate(self.memb_size)
+        self._run(write, segs)
+        self._pos += len(data)
+        return len(data)
+
+    def truncate(self, size=None):
+        """ Resize the family.  As with HDF5's family driver, members before
+        the last are padded to the full member size and members after it
+        are left empty. """
+        if size is None:
+            size = self._pos
+        msize = self.memb_size
+        if not msize:
+            self._members[0].truncate(size)
+            return size
+        last = max(0, (size - 1) // msize)
+        self._member(last)
+        for idx, member in enumerate(self._members):
+            if idx < last:
+                member.truncate(msize)
+            elif idx == last:
+                member.truncate(size - idx*msize)
+            else:
+                member.truncate(0)
+        return size
+
+    def flush(self):
+        for member in self._members:
+            member.flush()
+
+    def close(self):
+        if self._members is None:
+            return
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+        for member in self._members:
+            member.close()
+        self._members = None
+
+
+def open_family(pattern, mode, memb_size=None, threads=4):
+    """ Open family *pattern* as a FamilyFile for File mode *mode*.
+    Returns the FamilyFile and the mode HDF5 should use. """
+    exists = os.path.exists(pattern % 0)
+    if mode == 'r' or (mode is None and exists and not os.access(pattern % 0, os.W_OK)):
+        return FamilyFile(pattern, memb_size, 'rb', threads), 'r'
+    if mode == 'r+' or (mode in ('a', None) and exists):
+        return FamilyFile(pattern, memb_size, 'r+b', threads), 'r+'
+    if mode in ('w-', 'x', 'a', None) and exists:
+        raise IOError(17, "File exists", pattern % 0)
+    if mode not in ('w', 'w-', 'x', 'a', None):
+        raise ValueError("Invalid mode; must be one of r, r+, w, w-, x, a")
+    if memb_size is None:
+        memb_size = DEFAULT_MEMB_SIZE
+    return FamilyFile(pattern, memb_size, 'w+b', threads), 'w'
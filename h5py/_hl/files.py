@@ -10,14 +10,19 @@
 from __future__ import absolute_import
 
 import weakref
+import warnings
 import sys
 import os
+import io
+import itertools
 
 import six
 
-from .base import HLObject, phil, with_phil
+from .base import HLObject, phil, with_phil, file_cache, attach_file_caches, \
+    detach_file_caches
 from .group import Group
-from .. import h5, h5f, h5p, h5i, h5fd, h5t, _objects
+from . import catalog
+from .. import h5, h5f, h5p, h5i, h5fd, h5t, h5o, h5a, h5d, h5ds, _objects
 from .. import version
 
 mpi = h5.get_config().mpi
@@ -29,6 +34,69 @@ if mpi:
 libver_dict = {'earliest': h5f.LIBVER_EARLIEST, 'latest': h5f.LIBVER_LATEST}
 libver_dict_r = dict((y, x) for x, y in six.iteritems(libver_dict))
 
+# The core driver treats files with the same name as the same file, so each
+# image opened from memory gets its own name.
+_image_counter = itertools.count()
+
+
+# Format signature, found at offset 0, 512, 1024, 2048... of an HDF5 file
+_signature = b'\x89HDF\r\n\x1a\n'
+
+
+def _is_image(data):
+    """ Determine if the byte string *data* is an HDF5 file image, rather
+    than a file name. """
+    offset = 0
+    while offset + len(_signature) <= len(data):
+        if data[offset:offset+len(_signature)] == _signature:
+            return True
+        offset = 512 if offset == 0 else 2*offset
+    return False
+
+
+def _is_fileobj(obj):
+    """ Determine if *obj* should be opened with the fileobj driver, i.e.
+    it's neither a file name nor an identifier, but something seekable or
+    supporting the buffer protocol.  Byte strings are names unless they
+    hold an HDF5 file, in which case they're read-only buffers. """
+    if isinstance(obj, six.binary_type):
+        return _is_image(obj)
+    if isinstance(obj, (six.text_type, _objects.ObjectID)):
+        return False
+    return hasattr(obj, 'seek') or h5fd.is_buffer(obj)
+
+
+# Keywords which route a named file through the fileobj driver's page cache
+_cache_kwds = ('page_size', 'readahead', 'cache_size')
+
+def _open_cached(name, mode):
+    """ Open file *name* as an unbuffered Python file object, for use with
+    the fileobj driver's page cache.  Returns the file object and the mode
+    HDF5 should use. """
+    exists = os.path.exists(name)
+    try:
+        if mode == 'r' or (mode is None and exists and not os.access(name, os.W_OK)):
+            return io.open(name, 'rb', buffering=0), 'r'
+        if mode == 'r+' or (mode in ('a', None) and exists):
+            return io.open(name, 'r+b', buffering=0), 'r+'
+        if mode == 'w':
+            flags = os.O_TRUNC
+        elif mode in ('w-', 'x', 'a', None):
+            flags = os.O_EXCL
+        else:
+            raise ValueError("Invalid mode; must be one of r, r+, w, w-, x, a")
+        fd = os.open(name, os.O_RDWR | os.O_CREAT | getattr(os, 'O_BINARY', 0) | flags, 0o666)
+        return io.open(fd, 'r+b', buffering=0), 'w'
+    except OSError as e:
+        raise IOError(e.errno, e.strerror, name)
+
+
+def _encode_name(name):
+    """ Encode a unicode file name (or template) for HDF5 """
+    if isinstance(name, six.text_type):
+        return name.encode(sys.getfilesystemencoding())
+    return name
+
 
 def make_fapl(driver, libver, **kwds):
     """ Set up a file access property list """
@@ -53,6 +121,22 @@ def make_fapl(driver, libver, **kwds):
         plist.set_fapl_core(**kwds)
     elif(driver == 'family'):
         plist.set_fapl_family(memb_fapl=plist.copy(), **kwds)
+    elif(driver == 'fileobj'):
+        plist.set_fileobj_driver(h5fd.FILEOBJ, **kwds)
+    elif(driver == 'pyfamily'):
+        plist.set_fileobj_driver(h5fd.PYFAMILY, **kwds)
+    elif(driver == 'pyfamily-ncsa'):
+        plist.set_fileobj_driver(h5fd.PYFAMILY_NCSA, **kwds)
+    elif(driver == 'split'):
+        for key in ('meta_ext', 'raw_ext'):
+            if key in kwds:
+                kwds[key] = _encode_name(kwds[key])
+        plist.set_fapl_split(**kwds)
+    elif(driver == 'multi'):
+        if 'memb_name' in kwds:
+            kwds['memb_name'] = [None if x is None else _encode_name(x)
+                                 for x in kwds['memb_name']]
+        plist.set_fapl_multi(**kwds)
     elif(driver == 'mpio'):
         kwds.setdefault('info', mpi4py.MPI.Info())
         plist.set_fapl_mpio(**kwds)
@@ -62,6 +146,60 @@ def make_fapl(driver, libver, **kwds):
     return plist
 
 
+# Presets for File(profile=...), tuning how HDF5 lays out file space.
+# Individual settings may be overridden by keywords of the same name.
+profiles = {
+    # HDF5's own defaults; smallest files
+    'compact':    {'alignment': (1, 1),
+                   'sieve_buf_size': 64*1024,
+                   'meta_block_size': 2048,
+                   'small_data_block_size': 2048},
+    # Local SSDs and disks: page-aligned large allocations
+    'local':      {'alignment': (64*1024, 4096),
+                   'sieve_buf_size': 256*1024,
+                   'meta_block_size': 64*1024,
+                   'small_data_block_size': 64*1024},
+    # Striped parallel file systems (Lustre, GPFS...): 1 MiB stripes
+    'striped-fs': {'alignment': (512*1024, 1024*1024),
+                   'sieve_buf_size': 1024*1024,
+                   'meta_block_size': 1024*1024,
+                   'small_data_block_size': 1024*1024},
+}
+
+
+def set_fapl_profile(plist, profile=None, alignment=None, sieve_buf_size=None,
+                     meta_block_size=None, small_data_block_size=None):
+    """ Apply a file-space profile and/or individual settings to a FAPL """
+    if profile is None:
+        settings = {}
+    else:
+        try:
+            settings = dict(profiles[profile])
+        except KeyError:
+            raise ValueError('Unknown profile "%s" (must be one of %s)' %
+                             (profile, ', '.join(sorted(profiles))))
+
+    for key, val in (('alignment', alignment),
+                     ('sieve_buf_size', sieve_buf_size),
+                     ('meta_block_size', meta_block_size),
+                     ('small_data_block_size', small_data_block_size)):
+        if val is not None:
+            settings[key] = val
+
+    if 'alignment' in settings:
+        try:
+            threshold, align = settings['alignment']
+        except (TypeError, ValueError):
+            raise ValueError("Alignment must be a (threshold, alignment) tuple")
+        plist.set_alignment(threshold, align)
+    if 'sieve_buf_size' in settings:
+        plist.set_sieve_buf_size(settings['sieve_buf_size'])
+    if 'meta_block_size' in settings:
+        plist.set_meta_block_size(settings['meta_block_size'])
+    if 'small_data_block_size' in settings:
+        plist.set_small_data_block_size(settings['small_data_block_size'])
+
+
 def make_fid(name, mode, userblock_size, fapl, fcpl=None):
     """ Get a new FileID by opening or creating a file.
     Also validates mode argument."""
@@ -151,8 +289,10 @@ class File(Group):
         """Low-level HDF5 file driver used to open file"""
         drivers = {h5fd.SEC2: 'sec2', h5fd.STDIO: 'stdio',
                    h5fd.CORE: 'core', h5fd.FAMILY: 'family',
+                   h5fd.MULTI: 'multi',
                    h5fd.WINDOWS: 'windows', h5fd.MPIO: 'mpio',
-                   h5fd.MPIPOSIX: 'mpiposix'}
+                   h5fd.MPIPOSIX: 'mpiposix', h5fd.FILEOBJ: 'fileobj',
+                   h5fd.PYFAMILY: 'family', h5fd.PYFAMILY_NCSA: 'family'}
         return drivers.get(self.fid.get_access_plist().get_driver(), 'unknown')
 
     @property
@@ -199,30 +339,88 @@ class File(Group):
 
 
     def __init__(self, name, mode=None, driver=None, 
-                 libver=None, userblock_size=None, **kwds):
+                 libver=None, userblock_size=None, profile=None,
+                 alignment=None, sieve_buf_size=None, meta_block_size=None,
+                 small_data_block_size=None, index=None, **kwds):
         """Create a new file object.
 
         See the h5py user guide for a detailed explanation of the options.
 
         name
             Name of the file on disk.  Note: for files created with the 'core'
-            driver, HDF5 still requires this be non-empty.
+            driver, HDF5 still requires this be non-empty.  May also be a
+            Python file-like object or buffer, which selects the 'fileobj'
+            driver.
         driver
             Name of the driver to use.  Legal values are None (default,
-            recommended), 'core', 'sec2', 'stdio', 'mpio'.
+            recommended), 'core', 'sec2', 'stdio', 'mpio', 'fileobj',
+            'family', 'split', 'multi'.
         libver
             Library version bounds.  Currently only the strings 'earliest'
             and 'latest' are defined.
         userblock
             Desired size of user block.  Only allowed when creating a new
             file (mode w, w- or x).
+        profile
+            Name of a file-space preset: 'compact', 'local' or 'striped-fs'.
+        alignment, sieve_buf_size, meta_block_size, small_data_block_size
+            Individual file-space settings; override those of the profile.
+            Alignment is a (threshold, alignment) tuple in bytes.
+        index
+            Name of a sidecar catalog written by h5py.index.build().  If it
+            matches the file, membership tests and member listings are
+            answered from it.  Only for files opened read-only.
         Additional keywords
-            Passed on to the selected file driver.
+            Passed on to the selected file driver.  For named files with
+            no driver given, any of page_size, readahead or cache_size
+            instead read the file through the fileobj driver's page
+            cache.  With the 'family' driver, memb_size is found
+            automatically for existing families, and threads=N performs
+            I/O spanning several members concurrently.
         """
         with phil:
+            if index is not None and mode != 'r':
+                raise ValueError("Catalogs may only be used in read-only mode")
+
             if isinstance(name, _objects.ObjectID):
                 fid = h5i.get_file_id(name)
             else:
+                if _is_fileobj(name):
+                    if driver not in (None, 'fileobj'):
+                        raise ValueError("File objects can only be used with the fileobj driver")
+                    driver = 'fileobj'
+                    kwds['fileobj'] = name
+                    # Only used in messages; repr() would copy out the
+                    # contents of a buffer
+                    name = '<%s object at 0x%x>' % (type(name).__name__, id(name))
+                elif driver in ('sec2', 'stdio') and \
+                  any(x in kwds for x in _cache_kwds):
+                    raise ValueError("page_size, readahead and cache_size "
+                                     "can't be used with the %s driver" % driver)
+                elif driver is None and any(x in kwds for x in _cache_kwds):
+                    fileobj, mode = _open_cached(name, mode)
+                    driver = 'fileobj'
+                    kwds.update(fileobj=fileobj, close=True)
+                elif driver == 'family':
+                    from . import family
+                    pattern = name
+                    if isinstance(pattern, bytes):
+                        pattern = pattern.decode(sys.getfilesystemencoding())
+                    if 'threads' in kwds:
+                        # Families written by HDF5's own driver need a
+                        # driver class named "family" to be opened
+                        ncsa = mode not in ('w', 'w-', 'x') and \
+                          family.driver_info_name(pattern) == family.NCSA_FAMILY
+                        fileobj, mode = family.open_family(pattern, mode,
+                                    kwds.pop('memb_size', None), kwds.pop('threads'))
+                        driver = 'pyfamily-ncsa' if ncsa else 'pyfamily'
+                        kwds.update(fileobj=fileobj, close=True)
+                    elif kwds.get('memb_size') is None and mode not in ('w', 'w-', 'x'):
+                        kwds.pop('memb_size', None)
+                        memb_size = family.guess_memb_size(pattern)
+                        if memb_size is not None:
+                            kwds['memb_size'] = memb_size
+
                 try:
                     # If the byte string doesn't match the default
                     # encoding, just pass it on as-is.  Note Unicode
@@ -232,13 +430,126 @@ class File(Group):
                     pass
 
                 fapl = make_fapl(driver, libver, **kwds)
+                set_fapl_profile(fapl, profile, alignment, sieve_buf_size,
+                                 meta_block_size, small_data_block_size)
                 fid = make_fid(name, mode, userblock_size, fapl)
 
             Group.__init__(self, fid)
+            attach_file_caches(self.id)
+
+            if index is not None:
+                cat = catalog.load(index)
+                if cat.matches(self.id, self.filename):
+                    self._catalog = cat
+                else:
+                    warnings.warn("Catalog %s is out of date; ignoring it" % index)
+
+    @property
+    def catalog(self):
+        """ Sidecar catalog in use (see h5py.index), or None """
+        return self._catalog
+
+    @classmethod
+    def from_bytes(cls, image, mode='r', libver=None):
+        """ Open an in-memory copy of an HDF5 file image.
+
+        image
+            The file contents, as bytes or any other object supporting the
+            buffer protocol (bytearray, memoryview, BytesIO.getbuffer()...).
+            HDF5 takes its own copy.
+        mode
+            'r' (default) or 'r+'.  Changes made in 'r+' mode only affect
+            the in-memory copy; retrieve them with to_bytes().
+
+        Nothing is read from or written to disk.  Requires HDF5 1.8.9.
+        """
+        with phil:
+            if mode not in ('r', 'r+'):
+                raise ValueError("File images may only be opened in mode r or r+")
+            fapl = make_fapl('core', libver, backing_store=False)
+            if not hasattr(fapl, 'set_file_image'):
+                raise NotImplementedError("File images require HDF5 1.8.9 or later")
+            fapl.set_file_image(image)
+            name = six.b('<h5py file image %d>' % next(_image_counter))
+            fid = make_fid(name, mode, None, fapl)
+            return cls(fid)
+
+    def to_bytes(self):
+        """ Return the current contents of the file as a bytes image.
+
+        Open objects are flushed first.  Works with any driver, and for
+        'core' files without a backing store nothing touches the disk.
+        The result can be passed to File.from_bytes().  Requires HDF5 1.8.9.
+        """
+        with phil:
+            if not hasattr(self.id, 'get_file_image'):
+                raise NotImplementedError("File images require HDF5 1.8.9 or later")
+            return self.id.get_file_image()
+
+    def io_stats(self):
+        """ I/O statistics for files read through the fileobj driver's page
+        cache, as a dict (see h5fd.FileObjIO.get_stats), or None.
+        """
+        with phil:
+            if self.driver not in ('fileobj', 'family'):
+                return None
+            try:
+                fio = h5fd.get_fileobj_io(self.id)
+            except TypeError:
+                return None     # HDF5's own family driver
+            return None if fio is None else fio.get_stats()
+
+    def family_members(self):
+        """ For files using the family driver, a list of (filename, size)
+        tuples giving each member file and its current size in bytes, or
+        None for other drivers.
+        """
+        with phil:
+            if self.driver != 'family':
+                return None
+            from .family import member_names
+            if self.mode == 'r+':
+                self.flush()
+            return [(name, os.path.getsize(name)) for name in member_names(self.filename)]
+
+    def dimension_map(self):
+        """ Dimension scales attached anywhere in the file, as a dict mapping
+        the path of each dataset with scales to a list, one entry per
+        dimension, of the paths of the attached scales.
+
+        Built in a single pass over the file, from the DIMENSION_LIST
+        attributes, without opening the scales.  The result also fills the
+        cache used by Dataset.dims.
+        """
+        with phil:
+            from .dims import scale_paths
+            index = h5o.index(self.id, types=[h5o.TYPE_DATASET])
+            paths = dict((int(row['addr']), b'/' + row['path']) for row in index)
+            cache = file_cache(self.id, 'dimscales')
+            out = {}
+            for row in index:
+                if row['num_attrs'] == 0 or \
+                  not h5a.exists(self.id, b'DIMENSION_LIST', obj_name=row['path']):
+                    continue
+                dsid = h5d.open(self.id, row['path'])
+                dims = tuple(tuple(x) for x in h5ds.get_dimension_list(dsid))
+                cache[int(row['addr'])] = dims
+                if not any(dims):
+                    continue
+                missing = [x for d in dims for x in d if x not in paths]
+                if missing:
+                    # Scales outside the datasets visited, e.g. in a group
+                    # reachable only through a soft link
+                    paths.update(zip(missing, scale_paths(self.id, missing)))
+                out[self._d(b'/' + row['path'])] = [[self._d(paths[x]) for x in d]
+                                                    for d in dims]
+            return out
 
     def close(self):
         """ Close the file.  All open objects become invalid """
         with phil:
+            detach_file_caches(self.id)
+
             # We have to explicitly murder all open objects related to the file
             
             # Close file-resident objects first, then the files.
@@ -16,11 +16,12 @@ import six
 import numpy
 import collections
 
-from .. import h5g, h5i, h5o, h5r, h5t, h5l, h5p
+from .. import h5, h5a, h5d, h5g, h5i, h5o, h5r, h5t, h5l, h5p
 from . import base
-from .base import HLObject, DictCompat, phil, with_phil
+from .base import HLObject, DictCompat, phil, with_phil, clear_file_caches
 from . import dataset
 from . import datatype
+from . import catalog
 
 
 class Group(HLObject, DictCompat):
@@ -28,6 +29,10 @@ class Group(HLObject, DictCompat):
     """ Represents an HDF5 group.
     """
 
+    # Sidecar catalog (see catalog.py) shared by groups of a File opened
+    # with index=...; None means always ask HDF5.
+    _catalog = None
+
     def __init__(self, bind):
         """ Create a new Group object by binding to a low-level GroupID.
         """
@@ -36,15 +41,32 @@ class Group(HLObject, DictCompat):
                 raise ValueError("%s is not a GroupID" % bind)
             HLObject.__init__(self, bind)
 
-    def create_group(self, name):
+    def create_group(self, name, track_order=False, attr_storage=None,
+                     track_attr_order=None):
         """ Create and return a new subgroup.
 
         Name may be absolute or relative.  Fails if the target name already
-        exists.
+        exists.  If track_order is True, the creation order of the group's
+        members is recorded and indexed, and they are listed in that order.
+
+        attr_storage
+            'dense' to keep attributes in B-tree indexed storage from the
+            start, for objects with many attributes, or a (max_compact,
+            min_dense) tuple of thresholds for switching storage.
+        track_attr_order
+            (T/F) Record and index attribute creation order; attributes
+            are then listed in that order.
         """
         with phil:
             name, lcpl = self._e(name, lcpl=True)
-            gid = h5g.create(self.id, name, lcpl=lcpl)
+            gcpl = None
+            if track_order or attr_storage is not None or track_attr_order is not None:
+                gcpl = h5p.create(h5p.GROUP_CREATE)
+                if track_order:
+                    gcpl.set_link_creation_order(h5p.CRT_ORDER_TRACKED |
+                                                 h5p.CRT_ORDER_INDEXED)
+                base.set_attr_options(gcpl, attr_storage, track_attr_order)
+            gid = h5g.create(self.id, name, lcpl=lcpl, gcpl=gcpl)
             return Group(gid)
 
     def create_dataset(self, name, shape=None, dtype=None, data=None, **kwds):
@@ -98,6 +120,8 @@ class Group(HLObject, DictCompat):
             (Scalar) Use this value for uninitialized parts of the dataset.
         track_times
             (T/F) Enable dataset creation timestamps.
+        attr_storage, track_attr_order
+            Attribute storage options, as for create_group.
         """
         with phil:
             dsid = dataset.make_new_dset(self, shape, dtype, data, **kwds)
@@ -165,7 +189,9 @@ class Group(HLObject, DictCompat):
 
         otype = h5i.get_type(oid)
         if otype == h5i.GROUP:
-            return Group(oid)
+            grp = Group(oid)
+            grp._catalog = self._catalog
+            return grp
         elif otype == h5i.DATASET:
             return dataset.Dataset(oid)
         elif otype == h5i.DATATYPE:
@@ -173,6 +199,31 @@ class Group(HLObject, DictCompat):
         else:
             raise TypeError("Unknown object type")
 
+    def open_many(self, paths, lazy_meta=True):
+        """ Open many objects at once, returning a list in the same order.
+
+        Equivalent to [self[x] for x in paths], but the paths are resolved
+        in a single call, and each parent group along the way is looked up
+        only once.  If lazy_meta is False, datasets read their creation
+        property list and filters right away instead of when first needed.
+        """
+        with phil:
+            oids = h5o.open_many(self.id, [self._e(x) for x in paths],
+                                 lapl=self._lapl)
+            out = []
+            for oid in oids:
+                if isinstance(oid, h5g.GroupID):
+                    obj = Group(oid)
+                    obj._catalog = self._catalog
+                elif isinstance(oid, h5d.DatasetID):
+                    obj = dataset.Dataset(oid, lazy_meta=lazy_meta)
+                elif isinstance(oid, h5t.TypeID):
+                    obj = datatype.Datatype(oid)
+                else:
+                    raise TypeError("Unknown object type")
+                out.append(obj)
+            return out
+
     def get(self, name, default=None, getclass=False, getlink=False):
         """ Retrieve an item or other information.
 
@@ -287,22 +338,110 @@ class Group(HLObject, DictCompat):
     def __delitem__(self, name):
         """ Delete (unlink) an item from this group. """
         self.id.unlink(self._e(name))
+        self._page_names = None
+        clear_file_caches(self.id)
 
     @with_phil
     def __len__(self):
         """ Number of members attached to this group """
+        names = self._catalog_children()
+        if names is not None:
+            return len(names)
         return self.id.get_num_objs()
 
     @with_phil
     def __iter__(self):
         """ Iterate over member names """
-        for x in self.id.__iter__():
+        # The catalog knows which groups track creation order, and doesn't
+        # list their members
+        names = self._catalog_children()
+        if names is None:
+            if self._track_order:
+                names = []
+                self.id.links.iterate(names.append, idx_type=h5.INDEX_CRT_ORDER,
+                                      order=h5.ITER_INC)
+            else:
+                names = self.id.__iter__()
+        for x in names:
             yield self._d(x)
 
+    def keys(self, start=None, stop=None):
+        """ Get the names of directly attached group members.
+
+        With no arguments, this is a list on Py2 and a set-like view on Py3.
+        If start and/or stop are given, returns a list of the names from
+        position start up to stop, in iteration order, as for a slice.
+        For groups created with track_order=True each name is looked up in
+        the creation-order index, so pages of a large group are cheap to
+        fetch whatever their position.  For other groups the names are
+        listed once, when a page starting at 0 is requested, and later
+        pages are sliced from that list while the group keeps the same
+        number of members.
+        """
+        if start is None and stop is None:
+            return DictCompat.keys(self)
+        with phil:
+            start, stop, _ = slice(start, stop).indices(len(self))
+            if stop <= start:
+                return []
+            names = self._catalog_children()
+            if names is not None:
+                names = names[start:stop]
+            elif self._track_order:
+                names = self.id.links.get_names(start, stop,
+                            idx_type=h5.INDEX_CRT_ORDER, order=h5.ITER_INC)
+            else:
+                names = self._page_names
+                if start == 0 or names is None or len(names) != len(self):
+                    names = []
+                    self.id.links.iterate(names.append)
+                    self._page_names = names
+                names = names[start:stop]
+            return [self._d(x) for x in names]
+
+    # Whether link creation order is tracked; read on first use
+    _track_order_flag = None
+
+    # Member names listed for keys(start, stop) in groups which don't
+    # track creation order; dropped when links are changed through h5py
+    _page_names = None
+
+    @property
+    def _track_order(self):
+        """ True if the group lists its members in creation order """
+        if self._track_order_flag is None:
+            flags = self.id.get_create_plist().get_link_creation_order()
+            self._track_order_flag = bool(flags & h5p.CRT_ORDER_TRACKED)
+        return self._track_order_flag
+
     @with_phil
     def __contains__(self, name):
         """ Test if a member name exists """
-        return self._e(name) in self.id
+        name = self._e(name)
+        if self._catalog is not None:
+            path = name
+            if not path.startswith(b'/'):
+                base = h5i.get_name(self.id)
+                path = None if base is None else base + b'/' + path
+            if path is not None:
+                try:
+                    return path in self._catalog
+                except KeyError:
+                    pass
+        return name in self.id
+
+    def _catalog_children(self):
+        """ Member names according to the sidecar catalog, or None if there
+        is none or it can't tell. """
+        if self._catalog is None:
+            return None
+        base = h5i.get_name(self.id)
+        if base is None:
+            return None
+        names = self._catalog.children(base)
+        if names is catalog.UNKNOWN:
+            return None
+        return names
 
     def copy(self, source, dest, name=None,
              shallow=False, expand_soft=False, expand_external=False,
@@ -396,6 +535,8 @@ class Group(HLObject, DictCompat):
                 return
             self.id.links.move(self._e(source), self.id, self._e(dest),
                                lapl=self._lapl, lcpl=self._lcpl)
+            self._page_names = None
+            clear_file_caches(self.id)
 
     def visit(self, func):
         """ Recursively visit all names in this group and subgroups (HDF5 1.8).
@@ -452,6 +593,97 @@ class Group(HLObject, DictCompat):
                 return func(name, self[name])
             return h5o.visit(self.id, proxy)
 
+    # Names accepted for the "types" argument of index() and walk()
+    _index_types = {'group': h5o.TYPE_GROUP, 'dataset': h5o.TYPE_DATASET,
+                    'datatype': h5o.TYPE_NAMED_DATATYPE}
+
+    def index(self, types=None, max_depth=None):
+        """ Build a flat index of all objects in this group and subgroups.
+
+        Returns a NumPy structured array, one row per object, with fields
+        path, type (h5o.TYPE_*), addr, ndim, shape, dtype, chunks,
+        storage_size and num_attrs; see h5o.index.  The traversal happens
+        in a single call, without creating Group or Dataset objects.
+
+        types
+            'group', 'dataset', 'datatype' or a list of these, to include
+            only objects of those types.
+        max_depth
+            Include only objects at most this many links below this
+            group; 1 means direct members only.
+        """
+        with phil:
+            codes = None
+            if types is not None:
+                if isinstance(types, six.string_types):
+                    types = (types,)
+                try:
+                    codes = [self._index_types[x] for x in types]
+                except KeyError as e:
+                    raise ValueError('Unknown object type "%s"' % e.args[0])
+            if max_depth is None:
+                max_depth = -1
+            elif max_depth < 1:
+                raise ValueError("max_depth must be at least 1")
+            arr = h5o.index(self.id, codes, max_depth)
+            if six.PY2:
+                return arr
+            # Paths as str, still in a fixed-width column
+            paths = numpy.char.decode(arr['path'], 'utf-8')
+            out = numpy.empty(arr.shape, dtype=[(x, paths.dtype if x == 'path' else arr.dtype.fields[x][0])
+                                                for x in arr.dtype.names])
+            for x in arr.dtype.names:
+                out[x] = paths if x == 'path' else arr[x]
+            return out
+
+    def walk(self, types=None, max_depth=None):
+        """ Iterate over (path, record) pairs for all objects in this group
+        and subgroups.  Records are rows of the array from index(), which
+        takes the same arguments.
+        """
+        for row in self.index(types, max_depth):
+            yield row['path'], row
+
+    def read_attrs_recursive(self, paths=None):
+        """ Read the attributes of many objects at once.
+
+        Returns a dict mapping each path to a dict of that object's
+        attributes, as from attrs.read_all().  Paths are relative to this
+        group; if None, every object below this group is included, with
+        names as from visit().
+        """
+        with phil:
+            if paths is None:
+                names = []
+                h5o.visit(self.id, names.append)
+            else:
+                names = [self._e(x) for x in paths]
+            values = h5a.read_all_many(self.id, names, lapl=self._lapl)
+            out = {}
+            for name, attrs in zip(names, values):
+                out[self._d(name)] = dict((self._d(k), v) for k, v in attrs.items())
+            return out
+
+    def links_info(self, objtypes=True):
+        """ Describe the links directly in this group, without opening any
+        objects.
+
+        Returns a NumPy structured array, one row per link in iteration
+        order, with fields name, type (h5l.TYPE_*), obj_type (h5o.TYPE_*
+        for hard links, -1 otherwise), addr (0 for soft and external links)
+        and corder (-1 unless the group tracks creation order).  With
+        objtypes=False the object types aren't looked up, and only the
+        group's own link storage is read.
+        """
+        with phil:
+            if self._track_order:
+                arr = self.id.links.get_info_table(objtypes=objtypes,
+                        idx_type=h5.INDEX_CRT_ORDER, order=h5.ITER_INC)
+            else:
+                arr = self.id.links.get_info_table(objtypes=objtypes)
+            arr['name'] = [self._d(x) for x in arr['name']]
+            return arr
+
     @with_phil
     def __repr__(self):
         if not self:
@@ -15,6 +15,7 @@ cdef class ObjectID:
     cdef readonly hid_t id
     cdef public int locked              # Cannot be closed, explicitly or auto
     cdef object _hash
+    cdef bint registered                # Tracked by the identifier registry
 
 # Convenience functions
 cdef hid_t pdefault(ObjectID pid)
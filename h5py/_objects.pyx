@@ -77,36 +77,70 @@ def with_phil(func):
 # When such a "nonlocal" event occurs, we have to examine all live ObjectID
 # instances, and manually set obj.id = 0.  That's what the function
 # nonlocal_close() does.  We maintain an inventory of all live ObjectID
-# instances in the registry dict.  Then, when a nonlocal event occurs,
+# instances in the registry set.  Then, when a nonlocal event occurs,
 # nonlocal_close() walks through the inventory and sets the stale identifiers
 # to 0.  It must be explictly called; currently, this happens in FileID.close()
 # as well as the high-level File.close().
 #
+# The registry holds the addresses of the live instances rather than weak
+# references to them, so registration is a single set insertion with no
+# per-object weakref allocation.  An instance removes its own entry as the
+# first thing in __dealloc__.  Before that, while its weak references are
+# cleared, arbitrary code (weakref callbacks) may run and reach
+# nonlocal_close() with the address still registered; the instance's
+# reference count is zero then, and nonlocal_close() skips it rather than
+# touching an object which is being destroyed.
+#
+# Identifiers which are not file-resident (dataspaces and property lists)
+# can never be invalidated by closing a file, so they can never become
+# zombies.  The modules defining them call _register_transient() with their
+# base classes, and instances of those classes are not registered at all.
+# This matters because several of them are created behind the scenes for
+# every read or write.
+#
 # The entire low-level API is now explicitly locked, so only one thread at at
 # time is taking actions that may create or invalidate identifiers. See the
 # "locking code" section above.
 #
 # See also __cinit__ and __dealloc__ for class ObjectID.
 
-import weakref
-import warnings
+cdef extern from "Python.h":
+    Py_ssize_t Py_REFCNT(PyObject *o)
+
+# Addresses of live, registered ObjectID instances.  Entries are added only
+# via ObjectID.__cinit__, and removed only by ObjectID.__dealloc__.
+cdef set registry = set()
+
+# ObjectID subclasses whose instances are never registered.
+cdef tuple transient_types = ()
 
-# Will map id(obj) -> weakref(obj), where obj is an ObjectID instance.
-# Objects are added only via ObjectID.__cinit__, and removed only by
-# ObjectID.__dealloc__.
-cdef dict registry = {}
+def _register_transient(cls):
+    """ Exempt instances of an ObjectID subclass from the registry.
+
+    Only for identifiers which cannot be closed by a nonlocal event.
+    """
+    global transient_types
+    with _phil:
+        if not issubclass(cls, ObjectID):
+            raise TypeError("%s is not an ObjectID subclass" % cls)
+        transient_types = transient_types + (cls,)
 
 @with_phil
 def print_reg():
+    cdef size_t addr
     import h5py
-    refs = registry.values()
-    objs = [r() for r in refs]
+    objs = []
+    dying = 0
+    for addr in registry:
+        if Py_REFCNT(<PyObject*><void*>addr) == 0:
+            dying += 1
+        else:
+            objs.append(<object><void*>addr)
 
-    none = len([x for x in objs if x is None])
     files = len([x for x in objs if isinstance(x, h5py.h5f.FileID)])
     groups = len([x for x in objs if isinstance(x, h5py.h5g.GroupID)])
 
-    print "REGISTRY: %d | %d None | %d FileID | %d GroupID" % (len(objs), none, files, groups)
+    print "REGISTRY: %d | %d dying | %d FileID | %d GroupID" % (len(objs) + dying, dying, files, groups)
 
 
 @with_phil
@@ -114,19 +148,24 @@ def nonlocal_close():
     """ Find dead ObjectIDs and set their integer identifiers to 0.
     """
     cdef ObjectID obj
+    cdef size_t addr
 
-    for python_id, ref in registry.items():
+    for addr in list(registry):
 
-        obj = ref()
+        # The object may have been deallocated since we took the snapshot,
+        # e.g. by the cyclic garbage collector.  Nothing may allocate
+        # between this check and the cast below.
+        if addr not in registry:
+            continue
 
-        # Object somehow died without being removed from the registry.
-        # I think this is impossible, but let's make sure.
-        if obj is None:
-            warnings.warn("Found murdered identifier %d of kind %s HDF5 id %d" % 
-                             (python_id, type(obj), obj.id), RuntimeWarning)
-            del registry[python_id]
+        # The object is being deallocated (a weakref callback triggered
+        # this call from its tp_dealloc) but __dealloc__ hasn't removed it
+        # yet.  It will do so shortly.
+        if Py_REFCNT(<PyObject*><void*>addr) == 0:
             continue
 
+        obj = <ObjectID><void*>addr
+
         # Locked objects are immortal, as they generally are provided by
         # the HDF5 library itself (property list classes, etc.).
         if obj.locked:
@@ -136,7 +175,7 @@ def nonlocal_close():
         if not H5Iis_valid(obj.id):
             IF DEBUG_ID:
                 print("NONLOCAL - invalidating %d of kind %s HDF5 id %d" %
-                        (python_id, type(obj), obj.id) )
+                        (addr, type(obj), obj.id) )
             obj.id = 0
             continue
 
@@ -179,22 +218,25 @@ cdef class ObjectID:
         with _phil:
             self.id = id_
             self.locked = 0
-            IF DEBUG_ID:
-                print("CINIT - registering %d of kind %s HDF5 id %d" % (id(self), type(self), id_))
-            registry[id(self)] = weakref.ref(self)
+            self.registered = not isinstance(self, transient_types)
+            if self.registered:
+                IF DEBUG_ID:
+                    print("CINIT - registering %d of kind %s HDF5 id %d" % (id(self), type(self), id_))
+                registry.add(<size_t><void*>self)
 
 
     def __dealloc__(self):
+        # Unregister before anything can release the GIL; see the notes
+        # above the registry.
+        if self.registered:
+            registry.discard(<size_t><void*>self)
         with _phil:
             IF DEBUG_ID:
                 print("DEALLOC - unregistering %d of kind %s HDF5 id %d" % (id(self), type(self), self.id))
-            try:
-                # There's no reason to expect it, but in principle H5Idec_ref
-                # could raise an exception.
-                if self.valid and (not self.locked):
-                    H5Idec_ref(self.id)
-            finally:
-                del registry[id(self)] 
+            # There's no reason to expect it, but in principle H5Idec_ref
+            # could raise an exception.
+            if self.valid and (not self.locked):
+                H5Idec_ref(self.id)
 
 
     def _close(self):
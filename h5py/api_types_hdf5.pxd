@@ -7,6 +7,8 @@
 # License:  Standard 3-clause BSD; see "license.txt" for full license terms
 #           and contributor agreement.
 
+include "config.pxi"
+
 from api_types_ext cimport *
 
 cdef extern from "hdf5.h":
@@ -167,6 +169,45 @@ cdef extern from "hdf5.h":
   int H5FD_LOG_ALLOC      # 0x4000
   int H5FD_LOG_ALL        # (H5FD_LOG_ALLOC|H5FD_LOG_TIME_IO|H5FD_LOG_NUM_IO|H5FD_LOG_FLAVOR|H5FD_LOG_FILE_IO|H5FD_LOG_LOC_IO)
 
+  # Driver feature flags reported by the "query" callback
+  unsigned long H5FD_FEAT_AGGREGATE_METADATA
+  unsigned long H5FD_FEAT_ACCUMULATE_METADATA
+  unsigned long H5FD_FEAT_DATA_SIEVE
+  unsigned long H5FD_FEAT_AGGREGATE_SMALLDATA
+
+  # Public part of every open file handle; drivers extend this struct
+  ctypedef struct H5FD_t:
+    hid_t driver_id
+
+  # Driver class description passed to H5FDregister.  Only the members
+  # used by h5py's own drivers are declared here; the rest stay NULL.
+  ctypedef struct H5FD_class_t:
+    const char *name
+    haddr_t maxaddr
+    H5F_close_degree_t fc_degree
+    hsize_t (*sb_size)(H5FD_t *file)
+    herr_t (*sb_encode)(H5FD_t *file, char *name, unsigned char *p)
+    herr_t (*sb_decode)(H5FD_t *f, const char *name, const unsigned char *p)
+    size_t fapl_size
+    void *(*fapl_get)(H5FD_t *file)
+    void *(*fapl_copy)(const void *fapl)
+    herr_t (*fapl_free)(void *fapl)
+    H5FD_t *(*open)(const char *name, unsigned flags, hid_t fapl, haddr_t maxaddr)
+    herr_t (*close)(H5FD_t *file)
+    int (*cmp)(const H5FD_t *f1, const H5FD_t *f2)
+    herr_t (*query)(const H5FD_t *f1, unsigned long *flags)
+    haddr_t (*get_eoa)(const H5FD_t *file, H5FD_mem_t type)
+    herr_t (*set_eoa)(H5FD_t *file, H5FD_mem_t type, haddr_t addr)
+    IF HDF5_VERSION >= (1, 10, 0):
+      haddr_t (*get_eof)(const H5FD_t *file, H5FD_mem_t type)
+    ELSE:
+      haddr_t (*get_eof)(const H5FD_t *file)
+    herr_t (*get_handle)(H5FD_t *file, hid_t fapl, void **file_handle)
+    herr_t (*read)(H5FD_t *file, H5FD_mem_t type, hid_t dxpl, haddr_t addr, size_t size, void *buffer)
+    herr_t (*write)(H5FD_t *file, H5FD_mem_t type, hid_t dxpl, haddr_t addr, size_t size, const void *buffer)
+    herr_t (*flush)(H5FD_t *file, hid_t dxpl, hbool_t closing)
+    herr_t (*truncate)(H5FD_t *file, hid_t dxpl, hbool_t closing)
+
 # === H5G - Groups API ========================================================
 
   ctypedef enum H5G_link_t:
@@ -325,6 +366,10 @@ cdef extern from "hdf5.h":
 
   int H5P_DEFAULT
 
+  # Memory management for variable-length data
+  ctypedef void *(*H5MM_allocate_t)(size_t size, void *alloc_info)
+  ctypedef void (*H5MM_free_t)(void *mem, void *free_info)
+
   ctypedef int H5Z_filter_t
 
   # HDF5 layouts
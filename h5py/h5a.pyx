@@ -23,6 +23,8 @@ from _proxy cimport attr_rw
 from h5py import _objects
 from ._objects import phil, with_phil
 
+import numpy
+
 # Initialization
 import_array()
 
@@ -289,6 +291,126 @@ def iterate(ObjectID loc not None, object func, int index=0, *,
     return vis.retval
 
 
+# === Bulk reading ============================================================
+
+cdef class _AttrReader:
+
+    """ Reads every attribute of an object into a dict.  Memory types are
+    kept between objects, keyed by file type. """
+
+    cdef dict out
+    cdef list ftypes        # File TypeIDs seen so far
+    cdef list conv          # Matching (mtype, dtype, subshape)
+
+    def __init__(self):
+        self.out = {}
+        self.ftypes = []
+        self.conv = []
+
+    cdef object lookup(self, hid_t type_id):
+        # Find the memory type etc. for file type type_id, which we own
+        cdef TypeID ftype
+        cdef int i
+        for i from 0<=i<len(self.ftypes):
+            ftype = self.ftypes[i]
+            if H5Tequal(type_id, ftype.id):
+                H5Tclose(type_id)
+                return self.conv[i]
+        ftype = typewrap(type_id)
+        dtype = ftype.dtype
+        # Created before stripping top-level array types; see AttrID.read
+        mtype = py_create(dtype)
+        subshape = ()
+        if dtype.subdtype is not None:
+            dtype, subshape = dtype.subdtype
+        self.ftypes.append(ftype)
+        self.conv.append((mtype, dtype, subshape))
+        return self.conv[-1]
+
+cdef herr_t cb_attr_read(hid_t loc_id, char* attr_name, H5A_info_t *ainfo, void* data) except 2:
+
+    cdef _AttrReader reader = <_AttrReader>data
+    cdef hid_t attr_id, space_id = -1, type_id
+    cdef hsize_t dims[32]
+    cdef int rank, i
+    cdef TypeID mtype
+    cdef ndarray arr
+
+    attr_id = H5Aopen(loc_id, attr_name, H5P_DEFAULT)
+    try:
+        space_id = H5Aget_space(attr_id)
+        if H5Sget_simple_extent_type(space_id) == H5S_NULL:
+            return 0    # Empty attributes can't be read
+        rank = H5Sget_simple_extent_ndims(space_id)
+        if rank > 32:
+            raise ValueError("Attribute rank must not exceed 32")
+        H5Sget_simple_extent_dims(space_id, dims, NULL)
+        shape = []
+        for i from 0<=i<rank:
+            shape.append(dims[i])
+        shape = tuple(shape)
+
+        type_id = H5Aget_type(attr_id)
+        mtype, dtype, subshape = reader.lookup(type_id)
+
+        arr = numpy.ndarray(shape + subshape, dtype=dtype, order='C')
+        attr_rw(attr_id, mtype.id, PyArray_DATA(arr), 1)
+        reader.out[<bytes>attr_name] = arr[()] if arr.ndim == 0 else arr
+    finally:
+        if space_id >= 0:
+            H5Sclose(space_id)
+        H5Aclose(attr_id)
+    return 0
+
+cdef int _read_attrs(hid_t loc_id, char* obj_name, hid_t lapl,
+                     _AttrReader reader) except -1:
+    cdef hid_t obj_id
+    cdef hsize_t i = 0
+    obj_id = H5Oopen(loc_id, obj_name, lapl)
+    try:
+        H5Aiterate2(obj_id, H5_INDEX_NAME, H5_ITER_NATIVE, &i,
+                    cb_attr_read, <void*>reader)
+    finally:
+        H5Oclose(obj_id)
+    return 0
+
+
+@with_phil
+def read_all(ObjectID loc not None, *, char* obj_name='.', PropID lapl=None):
+    """(ObjectID loc, **kwds) => DICT
+
+    Read every attribute attached to an object, returning a dict mapping
+    names (bytes) to values.  Values are NumPy arrays, or scalars for
+    scalar attributes, as with AttrID.read.  Attributes with a null
+    dataspace can't be read and are left out.  This makes one pass over
+    the attributes and builds each distinct memory type only once.
+
+    STRING obj_name (".")
+        Read attributes of this group member instead
+
+    PropID lapl (None)
+        Link access property list for obj_name
+    """
+    cdef _AttrReader reader = _AttrReader()
+    _read_attrs(loc.id, obj_name, pdefault(lapl), reader)
+    return reader.out
+
+
+@with_phil
+def read_all_many(ObjectID loc not None, object obj_names, PropID lapl=None):
+    """(ObjectID loc, LIST obj_names, PropID lapl=None) => LIST of DICT
+
+    As read_all, for each of the objects named (relative to loc) in
+    obj_names.  Memory types are shared between objects.
+    """
+    cdef _AttrReader reader = _AttrReader()
+    cdef list out = []
+    for name in obj_names:
+        reader.out = {}
+        _read_attrs(loc.id, name, pdefault(lapl), reader)
+        out.append(reader.out)
+    return out
+
 
 # === Attribute class & methods ===============================================
 
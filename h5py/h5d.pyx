@@ -10,11 +10,14 @@
     Provides access to the low-level HDF5 "H5D" dataset interface.
 """
 
+include "config.pxi"
+
 # Compile-time imports
 from _objects cimport pdefault
 from numpy cimport ndarray, import_array, PyArray_DATA, NPY_WRITEABLE
 from utils cimport  check_numpy_read, check_numpy_write, \
-                    convert_tuple, emalloc, efree
+                    convert_tuple, convert_dims, require_tuple, \
+                    emalloc, efree
 from h5t cimport TypeID, typewrap, py_create
 from h5s cimport SpaceID
 from h5p cimport PropID, propwrap
@@ -23,6 +26,8 @@ from _proxy cimport dset_rw
 from h5py import _objects
 from ._objects import phil, with_phil
 
+import numpy
+
 # Initialization
 import_array()
 
@@ -84,6 +89,192 @@ def open(ObjectID loc not None, char* name, PropID dapl=None):
     """
     return DatasetID(H5Dopen2(loc.id, name, pdefault(dapl)))
 
+# === Variable-length data ====================================================
+
+# HDF5 allocates memory for each variable-length element it reads.  With
+# this allocator, that memory is carved out of a few large blocks which are
+# released together once the data has been copied out, so there is no
+# per-element malloc or free.
+
+ctypedef struct _arena_block:
+    _arena_block* next
+    size_t used
+    size_t size
+
+ctypedef struct _arena:
+    _arena_block* head
+
+cdef enum:
+    ARENA_BLOCK_SIZE = 1048576
+
+cdef void* _arena_alloc(size_t size, void* info):
+    cdef _arena* arena = <_arena*>info
+    cdef _arena_block* block = arena.head
+    cdef size_t bsize
+    cdef char* ptr
+
+    size = (size + 7) & ~(<size_t>7)
+    if block == NULL or block.size - block.used < size:
+        bsize = size if size > ARENA_BLOCK_SIZE else ARENA_BLOCK_SIZE
+        block = <_arena_block*>malloc(sizeof(_arena_block) + bsize)
+        if block == NULL:
+            return NULL
+        block.next = arena.head
+        block.used = 0
+        block.size = bsize
+        arena.head = block
+    ptr = (<char*>block) + sizeof(_arena_block) + block.used
+    block.used += size
+    return ptr
+
+cdef void _arena_free(void* mem, void* info):
+    pass    # Everything goes at once in _VlenBuffer.__dealloc__
+
+
+cdef class _VlenBuffer:
+
+    """
+        Variable-length data read from a dataset into a contiguous buffer
+        of npoints elements of the memory type, using an arena for the
+        element data.
+    """
+
+    cdef _arena arena
+    cdef void* buf
+    cdef size_t npoints
+
+    def __cinit__(self):
+        self.arena.head = NULL
+        self.buf = NULL
+        self.npoints = 0
+
+    def __dealloc__(self):
+        cdef _arena_block* block = self.arena.head
+        cdef _arena_block* next
+        while block != NULL:
+            next = block.next
+            free(block)
+            block = next
+        self.arena.head = NULL
+        efree(self.buf)
+
+    cdef int read(self, hid_t dset, hid_t mtype, hid_t fspace,
+                  hid_t dxpl) except -1:
+        cdef hid_t mspace = -1, plist = -1
+        cdef hsize_t npoints
+        cdef size_t size
+
+        npoints = H5Sget_select_npoints(fspace)
+        self.npoints = npoints
+        if npoints == 0:
+            return 0
+        size = H5Tget_size(mtype)*npoints
+        self.buf = emalloc(size)
+        memset(self.buf, 0, size)
+        try:
+            mspace = H5Screate_simple(1, &npoints, NULL)
+            if dxpl == H5P_DEFAULT:
+                plist = H5Pcreate(H5P_DATASET_XFER)
+            else:
+                plist = H5Pcopy(dxpl)
+            H5Pset_vlen_mem_manager(plist, _arena_alloc, &self.arena,
+                                    _arena_free, NULL)
+            H5Dread(dset, mtype, mspace, fspace, plist, self.buf)
+        finally:
+            if mspace >= 0:
+                H5Sclose(mspace)
+            if plist >= 0:
+                H5Pclose(plist)
+        return 0
+
+
+cdef hid_t _vlen_str_type(hid_t dset) except -1:
+    # Memory type of C strings for a variable-length string dataset
+    cdef hid_t ftype, mtype
+    ftype = H5Dget_type(dset)
+    try:
+        if not H5Tis_variable_str(ftype):
+            raise TypeError("Dataset must have a variable-length string type")
+        mtype = H5Tcopy(H5T_C_S1)
+        H5Tset_size(mtype, H5T_VARIABLE)
+        H5Tset_cset(mtype, H5Tget_cset(ftype))
+    finally:
+        H5Tclose(ftype)
+    return mtype
+
+
+cdef object _vlen_base_dtype(hid_t dset):
+    # NumPy dtype of the elements of a variable-length dataset, or None
+    # for variable-length strings.  Elements are copied as raw bytes, so
+    # base types holding pointers or references (nested vlens, vlen
+    # strings, either of those inside a compound...) are refused.
+    cdef hid_t ftype
+    cdef TypeID base
+    ftype = H5Dget_type(dset)
+    try:
+        if H5Tis_variable_str(ftype):
+            return None
+        if H5Tget_class(ftype) != H5T_VLEN:
+            raise TypeError("Dataset must have a variable-length type")
+        base = typewrap(H5Tget_super(ftype))
+        dt = base.dtype
+        if dt.hasobject:
+            raise TypeError("Variable-length types of %s aren't supported" % dt)
+        return dt
+    finally:
+        H5Tclose(ftype)
+
+
+cdef int _write_vlen_str(hid_t dset, hid_t fspace, char** ptrs,
+                         hsize_t npoints, hid_t dxpl) except -1:
+    # Write a table of npoints C strings to the selection in fspace
+    cdef hid_t mtype = -1, mspace = -1
+    try:
+        mtype = _vlen_str_type(dset)
+        mspace = H5Screate_simple(1, &npoints, NULL)
+        H5Dwrite(dset, mtype, mspace, fspace, dxpl, ptrs)
+    finally:
+        if mspace >= 0:
+            H5Sclose(mspace)
+        if mtype >= 0:
+            H5Tclose(mtype)
+    return 0
+
+
+cdef char* _put_utf8(char* out, unsigned int* src, size_t nchars) except NULL:
+    # Encode UCS4 code points as NUL-terminated UTF-8, stopping at the first
+    # NUL as NumPy does.  Returns the position after the terminator.
+    cdef size_t i
+    cdef unsigned int c
+    for i from 0<=i<nchars:
+        c = src[i]
+        if c == 0:
+            break
+        elif c < 0x80:
+            out[0] = <char>c
+            out += 1
+        elif c < 0x800:
+            out[0] = <char>(0xC0 | (c >> 6))
+            out[1] = <char>(0x80 | (c & 0x3F))
+            out += 2
+        elif c < 0x10000:
+            if 0xD800 <= c < 0xE000:
+                raise ValueError("Surrogate U+%04X can't be encoded as UTF-8" % c)
+            out[0] = <char>(0xE0 | (c >> 12))
+            out[1] = <char>(0x80 | ((c >> 6) & 0x3F))
+            out[2] = <char>(0x80 | (c & 0x3F))
+            out += 3
+        elif c < 0x110000:
+            out[0] = <char>(0xF0 | (c >> 18))
+            out[1] = <char>(0x80 | ((c >> 12) & 0x3F))
+            out[2] = <char>(0x80 | ((c >> 6) & 0x3F))
+            out[3] = <char>(0x80 | (c & 0x3F))
+            out += 4
+        else:
+            raise ValueError("Invalid code point 0x%X" % c)
+    out[0] = 0
+    return out + 1
+
 # --- Proxy functions for safe(r) threading -----------------------------------
 
 
@@ -351,3 +542,326 @@ cdef class DatasetID(ObjectID):
             may even be zero.
         """
         return H5Dget_storage_size(self.id)
+
+
+    IF HDF5_VERSION >= (1, 10, 5):
+
+        @with_phil
+        def get_num_chunks(self, SpaceID space=None):
+            """ (SpaceID space=None) => INT num_chunks
+
+                Get the number of allocated chunks, optionally only those
+                intersecting the selection in *space*.  Chunked datasets only.
+            """
+            cdef hsize_t nchunks
+            cdef hid_t space_id = H5S_ALL if space is None else space.id
+            H5Dget_num_chunks(self.id, space_id, &nchunks)
+            return nchunks
+
+
+        @with_phil
+        def get_chunk_info(self, hsize_t index, SpaceID space=None):
+            """ (INT index, SpaceID space=None) => TUPLE chunk_info
+
+                Get storage information for the allocated chunk at position
+                *index*, counting only chunks which intersect the selection
+                in *space* if given.  Tuple elements are:
+
+                0. TUPLE logical offset of the chunk in dataset coordinates
+                1. UINT filter mask (bit N set means filter N was skipped)
+                2. LONG byte offset of the chunk in the file
+                3. LONG size of the stored chunk, in bytes
+            """
+            cdef unsigned int filter_mask
+            cdef haddr_t addr
+            cdef hsize_t size
+            cdef int rank = self.rank
+            cdef hsize_t* offset = NULL
+            cdef hid_t space_id = H5S_ALL if space is None else space.id
+
+            offset = <hsize_t*>emalloc(sizeof(hsize_t)*rank)
+            try:
+                H5Dget_chunk_info(self.id, space_id, index, offset,
+                                  &filter_mask, &addr, &size)
+                return (convert_dims(offset, rank), filter_mask, addr, size)
+            finally:
+                efree(offset)
+
+
+        @with_phil
+        def get_chunk_info_by_coord(self, object chunk_offset not None):
+            """ (TUPLE chunk_offset) => TUPLE chunk_info
+
+                Get storage information for the chunk whose logical offset,
+                in dataset coordinates, is *chunk_offset*.  Returns a tuple
+                like get_chunk_info(); the byte offset is None if the chunk
+                has not been allocated.
+            """
+            cdef unsigned int filter_mask
+            cdef haddr_t addr
+            cdef hsize_t size
+            cdef int rank = self.rank
+            cdef hsize_t* offset = NULL
+
+            require_tuple(chunk_offset, 0, rank, "chunk_offset")
+            offset = <hsize_t*>emalloc(sizeof(hsize_t)*rank)
+            try:
+                convert_tuple(chunk_offset, offset, rank)
+                H5Dget_chunk_info_by_coord(self.id, offset, &filter_mask,
+                                           &addr, &size)
+                return (tuple(chunk_offset), filter_mask,
+                        None if addr == HADDR_UNDEF else addr, size)
+            finally:
+                efree(offset)
+
+
+    @with_phil
+    def read_vlen_str(self, SpaceID fspace not None, ndarray arr not None,
+                      PropID dxpl=None):
+        """ (SpaceID fspace, NDARRAY arr, PropDXID dxpl=None)
+
+            Read variable-length strings from the selection in fspace into
+            arr, a C-contiguous array of fixed-width strings (NumPy "S")
+            with one element per selected point.  Strings are truncated or
+            NUL-padded to fit, without creating a Python object for each
+            element, and the memory HDF5 allocates for them is released in
+            bulk.  Only for datasets with a variable-length string type.
+        """
+        cdef hid_t mtype
+        cdef _VlenBuffer vbuf = _VlenBuffer()
+        cdef char** ptrs
+        cdef char* out
+        cdef char* src
+        cdef size_t i, j, width
+
+        if arr.dtype.kind != 'S':
+            raise TypeError("Output array must have a fixed-width string dtype")
+        check_numpy_write(arr, -1)
+        if <hsize_t>arr.size != <hsize_t>H5Sget_select_npoints(fspace.id):
+            raise ValueError("Output array size must match the number of points selected")
+
+        mtype = _vlen_str_type(self.id)
+        try:
+            vbuf.read(self.id, mtype, fspace.id, pdefault(dxpl))
+        finally:
+            H5Tclose(mtype)
+
+        ptrs = <char**>vbuf.buf
+        out = <char*>PyArray_DATA(arr)
+        width = arr.itemsize
+        for i from 0<=i<vbuf.npoints:
+            src = ptrs[i]
+            j = 0
+            if src != NULL:
+                while j < width and src[j] != 0:
+                    out[j] = src[j]
+                    j += 1
+            if j < width:
+                memset(out + j, 0, width - j)
+            out += width
+
+
+    @with_phil
+    def read_vlen_columnar(self, SpaceID fspace not None, PropID dxpl=None):
+        """ (SpaceID fspace, PropDXID dxpl=None) => (NDARRAY offsets, NDARRAY values)
+
+            Read variable-length data from the selection in fspace as two
+            flat arrays: element i (in selection order) is
+            values[offsets[i]:offsets[i+1]].  Offsets are int64, with one
+            more entry than there are points selected.  For numeric vlen
+            types values has the base type of the dataset; for strings it's
+            a uint8 array of the encoded bytes, without terminators.
+        """
+        cdef hid_t mtype = -1
+        cdef _VlenBuffer vbuf = _VlenBuffer()
+        cdef ndarray offsets, values
+        cdef long long* offs
+        cdef char** ptrs
+        cdef hvl_t* vls
+        cdef char* out
+        cdef size_t i, itemsize
+        cdef bint is_str
+
+        dt = _vlen_base_dtype(self.id)
+        is_str = dt is None
+        try:
+            if is_str:
+                mtype = _vlen_str_type(self.id)
+                dt = numpy.dtype('u1')
+            else:
+                mtype = H5Tvlen_create(py_create(dt).id)
+            vbuf.read(self.id, mtype, fspace.id, pdefault(dxpl))
+        finally:
+            if mtype >= 0:
+                H5Tclose(mtype)
+
+        # Sizes first, so the values can be copied straight into place
+        offsets = numpy.empty((vbuf.npoints+1,), dtype='i8')
+        offs = <long long*>PyArray_DATA(offsets)
+        offs[0] = 0
+        ptrs = <char**>vbuf.buf
+        vls = <hvl_t*>vbuf.buf
+        for i from 0<=i<vbuf.npoints:
+            if is_str:
+                offs[i+1] = offs[i] + (strlen(ptrs[i]) if ptrs[i] != NULL else 0)
+            else:
+                offs[i+1] = offs[i] + vls[i].len
+
+        values = numpy.empty((offs[vbuf.npoints],), dtype=dt)
+        out = <char*>PyArray_DATA(values)
+        itemsize = dt.itemsize
+        for i from 0<=i<vbuf.npoints:
+            if is_str:
+                if ptrs[i] != NULL:
+                    memcpy(out, ptrs[i], offs[i+1] - offs[i])
+            else:
+                memcpy(out, vls[i].p, (offs[i+1] - offs[i])*itemsize)
+            out += (offs[i+1] - offs[i])*itemsize
+
+        return offsets, values
+
+
+    @with_phil
+    def write_vlen_columnar(self, SpaceID fspace not None, ndarray offsets not None,
+                            ndarray values not None, PropID dxpl=None):
+        """ (SpaceID fspace, NDARRAY offsets, NDARRAY values, PropDXID dxpl=None)
+
+            Write variable-length data given as two flat arrays, in the
+            layout returned by read_vlen_columnar, to the selection in
+            fspace.  Offsets must be non-decreasing with one more entry than
+            there are points selected.  For strings, values must have an
+            itemsize of 1 (e.g. uint8) and hold the encoded bytes; for
+            numeric vlen types it may have any type HDF5 can convert to the
+            base type of the dataset.
+        """
+        cdef hid_t mtype = -1, mspace = -1
+        cdef hsize_t npoints
+        cdef long long* offs
+        cdef char* data
+        cdef char* strbuf = NULL
+        cdef char* out
+        cdef void* buf = NULL
+        cdef char** ptrs
+        cdef hvl_t* vls
+        cdef size_t i, n, itemsize
+        cdef bint is_str
+
+        offsets = numpy.ascontiguousarray(offsets, dtype='i8')
+        values = numpy.ascontiguousarray(values)
+        npoints = H5Sget_select_npoints(fspace.id)
+        if offsets.ndim != 1 or <hsize_t>offsets.shape[0] != npoints+1:
+            raise ValueError("Offsets must be 1-D, with one more entry than the number of points selected")
+        offs = <long long*>PyArray_DATA(offsets)
+        if offs[0] < 0 or offs[npoints] > values.size:
+            raise ValueError("Offsets out of range for values array")
+        for i from 0<=i<npoints:
+            if offs[i+1] < offs[i]:
+                raise ValueError("Offsets must be non-decreasing")
+        if npoints == 0:
+            return
+
+        is_str = _vlen_base_dtype(self.id) is None
+        itemsize = values.itemsize
+        if is_str and itemsize != 1:
+            raise TypeError("String values must be an array of bytes (itemsize 1)")
+        data = <char*>PyArray_DATA(values)
+
+        try:
+            if is_str:
+                # HDF5 wants NUL-terminated strings, so copy each one into a
+                # single buffer with room for the terminators
+                ptrs = <char**>emalloc(sizeof(char*)*npoints)
+                buf = ptrs
+                strbuf = <char*>emalloc(offs[npoints] - offs[0] + npoints)
+                out = strbuf
+                for i from 0<=i<npoints:
+                    n = offs[i+1] - offs[i]
+                    memcpy(out, data + offs[i], n)
+                    out[n] = 0
+                    ptrs[i] = out
+                    out += n + 1
+                _write_vlen_str(self.id, fspace.id, ptrs, npoints, pdefault(dxpl))
+            else:
+                # Elements point directly into the values array
+                mtype = H5Tvlen_create(py_create(values.dtype).id)
+                vls = <hvl_t*>emalloc(sizeof(hvl_t)*npoints)
+                buf = vls
+                for i from 0<=i<npoints:
+                    vls[i].len = offs[i+1] - offs[i]
+                    vls[i].p = data + offs[i]*itemsize
+                mspace = H5Screate_simple(1, &npoints, NULL)
+                H5Dwrite(self.id, mtype, mspace, fspace.id, pdefault(dxpl), buf)
+        finally:
+            efree(buf)
+            efree(strbuf)
+            if mspace >= 0:
+                H5Sclose(mspace)
+            if mtype >= 0:
+                H5Tclose(mtype)
+
+
+    @with_phil
+    def write_vlen_str(self, SpaceID fspace not None, ndarray arr not None,
+                       PropID dxpl=None):
+        """ (SpaceID fspace, NDARRAY arr, PropDXID dxpl=None)
+
+            Write a NumPy fixed-width string array (dtype "S" or "U") to
+            the selection in fspace of a variable-length string dataset,
+            one element per selected point in C order.  As in NumPy, each
+            string ends at its first NUL.  "U" arrays are stored as UTF-8.
+
+            The C string table is built in a single buffer, without a
+            Python object or memory allocation per element.
+        """
+        cdef hsize_t npoints
+        cdef char** ptrs = NULL
+        cdef char* strbuf = NULL
+        cdef char* src
+        cdef char* out
+        cdef size_t i, j, width, nchars
+        cdef bint is_unicode
+
+        kind = arr.dtype.kind
+        if kind not in ('S', 'U'):
+            raise TypeError("Array must have a fixed-width string dtype")
+        is_unicode = kind == 'U'
+        if is_unicode and not arr.dtype.isnative:
+            arr = arr.astype(arr.dtype.newbyteorder('='))
+        check_numpy_read(arr, -1)
+        npoints = H5Sget_select_npoints(fspace.id)
+        if <hsize_t>arr.size != npoints:
+            raise ValueError("Array size must match the number of points selected")
+        if npoints == 0:
+            return
+        if _vlen_base_dtype(self.id) is not None:
+            raise TypeError("Dataset must have a variable-length string type")
+
+        width = arr.itemsize
+        src = <char*>PyArray_DATA(arr)
+        try:
+            ptrs = <char**>emalloc(sizeof(char*)*npoints)
+            if is_unicode:
+                # At most 4 UTF-8 bytes per 4-byte character
+                nchars = width // 4
+                strbuf = <char*>emalloc((width + 1)*npoints)
+                out = strbuf
+                for i from 0<=i<npoints:
+                    ptrs[i] = out
+                    out = _put_utf8(out, <unsigned int*>src, nchars)
+                    src += width
+            else:
+                strbuf = <char*>emalloc((width + 1)*npoints)
+                out = strbuf
+                for i from 0<=i<npoints:
+                    ptrs[i] = out
+                    j = 0
+                    while j < width and src[j] != 0:
+                        out[j] = src[j]
+                        j += 1
+                    out[j] = 0
+                    out += j + 1
+                    src += width
+            _write_vlen_str(self.id, fspace.id, ptrs, npoints, pdefault(dxpl))
+        finally:
+            efree(ptrs)
+            efree(strbuf)
@@ -13,6 +13,7 @@
 
 # Compile-time imports
 from h5d cimport DatasetID
+from h5r cimport hobj_ref_t
 from utils cimport emalloc, efree
 
 from ._objects import phil, with_phil
@@ -136,3 +137,55 @@ def iterate(DatasetID dset not None, unsigned int dim, object func,
     H5DSiterate_scales(dset.id, dim, &i, <H5DS_iterate_t>cb_ds_iter, <void*>vis)
 
     return vis.retval
+
+
+@with_phil
+def get_dimension_list(DatasetID dset not None):
+    """ (DatasetID dset) => LIST
+
+    Read the scales attached to each dimension of a dataset straight from
+    its DIMENSION_LIST attribute, without opening them.  Returns a list
+    with, for each dimension, a list of the object header addresses of the
+    attached scales, in attachment order.  These are the raw object
+    reference values; see h5r.dereference_many.
+    """
+    cdef hid_t space = -1, attr = -1, mtype = -1
+    cdef hvl_t* buf = NULL
+    cdef hobj_ref_t* refs
+    cdef int rank
+    cdef size_t i, j
+
+    space = H5Dget_space(dset.id)
+    try:
+        rank = H5Sget_simple_extent_ndims(space)
+    finally:
+        H5Sclose(space)
+        space = -1
+
+    if not H5Aexists(dset.id, "DIMENSION_LIST"):
+        return [[] for i in range(rank)]
+
+    out = []
+    try:
+        attr = H5Aopen(dset.id, "DIMENSION_LIST", H5P_DEFAULT)
+        space = H5Aget_space(attr)
+        mtype = H5Tvlen_create(H5T_STD_REF_OBJ)
+        buf = <hvl_t*>emalloc(sizeof(hvl_t)*rank)
+        memset(buf, 0, sizeof(hvl_t)*rank)
+        H5Aread(attr, mtype, buf)
+        try:
+            for i from 0<=i<rank:
+                refs = <hobj_ref_t*>buf[i].p
+                out.append([refs[j] for j in range(buf[i].len)])
+        finally:
+            H5Dvlen_reclaim(mtype, space, H5P_DEFAULT, buf)
+    finally:
+        efree(buf)
+        if mtype >= 0:
+            H5Tclose(mtype)
+        if space >= 0:
+            H5Sclose(space)
+        if attr >= 0:
+            H5Aclose(attr)
+
+    return out
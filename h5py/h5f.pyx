@@ -359,6 +359,27 @@ cdef class FileID(GroupID):
         return handle[0]
 
 
+    IF HDF5_VERSION >= (1, 8, 9):
+
+        @with_phil
+        def get_file_image(self):
+            """ () => BYTES
+
+            Retrieve a copy of the file's current contents as an image,
+            without writing it to disk.  Works with any driver.
+
+            Feature requires: 1.8.9
+            """
+            cdef ssize_t size
+            cdef bytes image
+
+            H5Fflush(self.id, H5F_SCOPE_LOCAL)
+            size = H5Fget_file_image(self.id, NULL, 0)
+            image = PyBytes_FromStringAndSize(NULL, size)
+            H5Fget_file_image(self.id, <char*>image, size)
+            return image
+
+
     IF MPI and HDF5_VERSION >= (1, 8, 9):
 
         @with_phil
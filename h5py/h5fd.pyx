@@ -11,9 +11,21 @@
 # licenses/hdf5.txt for the full HDF5 software license.
 
 """
-    File driver constants (H5FD*).
+    File driver constants (H5FD*), and the Python file-object driver.
 """
 
+include "config.pxi"
+
+from cpython.ref cimport Py_INCREF, Py_DECREF
+from cpython.buffer cimport PyObject_CheckBuffer, PyObject_GetBuffer, \
+                            PyBuffer_Release, PyBUF_SIMPLE, PyBUF_WRITABLE
+from _objects cimport ObjectID
+
+from ._objects import phil, with_phil
+
+from errno import EEXIST
+from collections import OrderedDict
+
 # === Multi-file driver =======================================================
 
 MEM_DEFAULT = H5FD_MEM_DEFAULT
@@ -73,3 +85,569 @@ LOG_TIME_IO   = H5FD_LOG_TIME_IO    # (H5FD_LOG_TIME_OPEN|H5FD_LOG_TIME_READ|H5F
 LOG_ALLOC     = H5FD_LOG_ALLOC      # 0x4000
 LOG_ALL       = H5FD_LOG_ALL        # (H5FD_LOG_ALLOC|H5FD_LOG_TIME_IO|H5FD_LOG_NUM_IO|H5FD_LOG_FLAVOR|H5FD_LOG_FILE_IO|H5FD_LOG_LOC_IO)
 
+
+
+# === Python file-object driver ===============================================
+
+# Routes HDF5's I/O through an arbitrary Python object.  Objects supporting
+# the buffer protocol (bytearray, mmap, NumPy arrays...) are accessed
+# directly with the GIL released during copies; anything else must be a
+# seekable file-like object, accessed through a FileObjIO instance which
+# adds a page cache with readahead and keeps I/O statistics.
+#
+# The driver info stored in the FAPL is the tuple of arguments given to
+# PropFAID.set_fileobj_driver, owned through the fapl_copy/fapl_free
+# callbacks and by each open file.  The driver never closes the file
+# object itself; see FileObjOwner.  HDF5's own metadata accumulator and sieve buffer are enabled
+# via the feature flags, so small I/O is batched before it reaches Python.
+
+def is_buffer(object obj):
+    """(OBJECT obj) => BOOL
+
+    Determine if *obj* supports the buffer protocol, and so would be
+    accessed directly by the file-object driver.
+    """
+    return PyObject_CheckBuffer(obj)
+
+
+cdef class FileObjIO:
+
+    """
+        I/O layer used by the file-object driver for file-like objects.
+
+        Reads are rounded out to whole pages, and each run of missing pages
+        is fetched with a single call, extended by the readahead window.
+        Pages are kept in a small LRU cache; large reads bypass it.  Writes
+        go straight through and drop any cached pages they overlap.
+    """
+
+    cdef readonly object fileobj
+    cdef size_t page_size
+    cdef size_t readahead       # In pages
+    cdef size_t max_pages
+    cdef object pages           # OrderedDict, page number -> (run, offset),
+                                # least recently used first
+    cdef long long eof          # Size of the file object, -1 if not known
+
+    cdef unsigned long long requests, bytes_requested, cache_hits
+    cdef unsigned long long read_calls, bytes_read
+    cdef unsigned long long write_calls, bytes_written
+
+    def __init__(self, fileobj, size_t page_size, size_t readahead,
+                 size_t cache_size):
+        self.fileobj = fileobj
+        self.page_size = page_size
+        self.pages = OrderedDict()
+        self.eof = -1
+        if page_size > 0:
+            self.readahead = (readahead + page_size - 1) // page_size
+            self.max_pages = max(cache_size // page_size, 2*(self.readahead + 1))
+
+
+    def get_stats(self):
+        """() => DICT
+
+        Counters since the file was opened:
+
+        requests / bytes_requested
+            Read requests made by HDF5, and the bytes they asked for
+        cache_hits
+            Requests served entirely from the page cache
+        read_calls / bytes_read
+            Reads issued to the file object, and the bytes they returned
+        write_calls / bytes_written
+            Writes issued to the file object, and their total size
+        """
+        return {'requests': self.requests,
+                'bytes_requested': self.bytes_requested,
+                'cache_hits': self.cache_hits,
+                'read_calls': self.read_calls,
+                'bytes_read': self.bytes_read,
+                'write_calls': self.write_calls,
+                'bytes_written': self.bytes_written}
+
+
+    cdef int readinto(self, haddr_t addr, char *buf, size_t size) except -1:
+        # Fill buf straight from the file object, zero-filling past EOF
+        cdef unsigned char[:] mview
+        cdef size_t done = 0
+
+        if size == 0:
+            return 0
+        fileobj = self.fileobj
+        fileobj.seek(addr)
+        if hasattr(fileobj, 'readinto'):
+            mview = <unsigned char[:size]><unsigned char*>buf
+            while done < size:
+                self.read_calls += 1
+                n = fileobj.readinto(mview[done:])
+                if not n:
+                    break
+                done += n
+        else:
+            while done < size:
+                self.read_calls += 1
+                data = fileobj.read(size - done)
+                if not data:
+                    break
+                memcpy(buf + done, <char*>data, len(data))
+                done += len(data)
+        self.bytes_read += done
+        if done < size:
+            memset(buf + done, 0, size - done)
+        return 0
+
+
+    cdef long long get_eof(self) except -2:
+        # File size, looked up once and then kept up to date by write()
+        # and truncate()
+        if self.eof < 0:
+            fileobj = self.fileobj
+            fileobj.seek(0, 2)
+            self.eof = fileobj.tell()
+        return self.eof
+
+
+    cdef int fetch(self, list missing) except -1:
+        # Read runs of consecutive missing pages, one call per run.  Pages
+        # refer to slices of the run's buffer rather than copies.
+        cdef size_t P = self.page_size
+        cdef long long start, count, extra, i, npages
+        cdef list runs = []
+
+        for p in missing:
+            if runs and runs[-1][0] + runs[-1][1] == p:
+                runs[-1][1] += 1
+            else:
+                runs.append([p, 1])
+
+        # Read ahead no further than the end of the file
+        npages = (self.get_eof() + P - 1) // P
+        start, count = runs[-1]
+        extra = 0
+        while <size_t>extra < self.readahead and start + count + extra < npages \
+          and (start + count + extra) not in self.pages:
+            extra += 1
+        runs[-1][1] = count + extra
+
+        for start, count in runs:
+            data = bytearray(count*P)
+            self.readinto(start*P, <char*>data, count*P)
+            for i from 0<=i<count:
+                self.pages[start+i] = (data, i*P)
+        return 0
+
+
+    cdef int evict(self) except -1:
+        # Drop the least recently used pages, down to 3/4 of capacity
+        cdef size_t keep = (3*self.max_pages) // 4
+        if <size_t>len(self.pages) <= self.max_pages:
+            return 0
+        while <size_t>len(self.pages) > keep:
+            self.pages.popitem(last=False)
+        return 0
+
+
+    cdef int read(self, haddr_t addr, size_t size, char *buf) except -1:
+        cdef size_t P = self.page_size
+        cdef size_t done, off, n, start
+        cdef long long first, last, p, npages
+
+        self.requests += 1
+        self.bytes_requested += size
+        if size == 0:
+            return 0
+
+        # Large reads gain nothing from the cache
+        if P == 0 or size >= (self.max_pages*P) // 2:
+            return self.readinto(addr, buf, size)
+
+        # Pages past the end of the file read as zeros and aren't cached
+        first = addr // P
+        last = (addr + size - 1) // P
+        npages = (self.get_eof() + P - 1) // P
+        missing = [p for p in range(first, min(last+1, npages)) if p not in self.pages]
+        if missing:
+            self.fetch(missing)
+        else:
+            self.cache_hits += 1
+
+        pages = self.pages
+        done = 0
+        for p from first <= p <= last:
+            off = (addr + done) - p*P
+            n = min(P - off, size - done)
+            if p < npages:
+                # Move to the most recently used end
+                entry = pages.pop(p)
+                pages[p] = entry
+                data, start = entry
+                memcpy(buf + done, <char*>data + start + off, n)
+            else:
+                memset(buf + done, 0, n)
+            done += n
+
+        return self.evict()
+
+
+    cdef int drop(self, haddr_t addr, haddr_t stop) except -1:
+        # Forget cached pages overlapping [addr, stop)
+        cdef size_t P = self.page_size
+        cdef long long first, last, p
+
+        if not self.pages or stop <= addr:
+            return 0
+        first = addr // P
+        last = (stop - 1) // P
+        if last - first + 1 < len(self.pages):
+            for p from first <= p <= last:
+                self.pages.pop(p, None)
+        else:
+            for p in list(self.pages):
+                if first <= p <= last:
+                    del self.pages[p]
+        return 0
+
+
+    cdef int write(self, haddr_t addr, size_t size, const void *buf) except -1:
+        if size == 0:
+            return 0
+        self.drop(addr, addr + size)
+        fileobj = self.fileobj
+        fileobj.seek(addr)
+        fileobj.write(<unsigned char[:size]><unsigned char*>buf)
+        if self.eof >= 0 and <long long>(addr + size) > self.eof:
+            self.eof = addr + size
+        self.write_calls += 1
+        self.bytes_written += size
+        return 0
+
+
+    cdef int truncate(self, haddr_t size) except -1:
+        if self.pages:
+            self.drop(size, (max(self.pages) + 1)*self.page_size)
+        self.fileobj.truncate(size)
+        self.eof = size
+        return 0
+
+
+    cdef int flush(self) except -1:
+        flush = getattr(self.fileobj, 'flush', None)
+        if flush is not None:
+            flush()
+        return 0
+
+
+    cdef int close(self) except -1:
+        self.pages.clear()
+        return 0
+
+
+cdef class FileObjOwner:
+
+    """
+        Closes a file object opened on the user's behalf (e.g. by
+        File(name, page_size=...)) once it's no longer needed.
+
+        PropFAID.set_fileobj_driver(close=True) keeps one of these in the
+        driver info.  The driver info is shared by every property list and
+        open file using the driver, so the file object is closed when the
+        last of them is released, not when HDF5 closes the driver.  HDF5
+        closes and reopens the driver while creating a file, so doing it
+        then would be too early.
+    """
+
+    cdef readonly object fileobj
+
+    def __init__(self, fileobj):
+        self.fileobj = fileobj
+
+    def __dealloc__(self):
+        if self.fileobj is not None:
+            self.fileobj.close()
+
+
+ctypedef struct H5FD_fileobj_t:
+    H5FD_t base
+    PyObject *info          # Driver info tuple, one reference held
+    PyObject *fileobj       # Borrowed from info
+    PyObject *io            # FileObjIO instance, one reference held
+    haddr_t eoa
+    bint is_buffer
+    Py_buffer view          # Only valid if is_buffer
+
+cdef void *H5FD_fileobj_fapl_get(H5FD_fileobj_t *f) with gil:
+    Py_INCREF(<object>f.info)
+    return f.info
+
+cdef void *H5FD_fileobj_fapl_copy(PyObject *old_fa) with gil:
+    Py_INCREF(<object>old_fa)
+    return old_fa
+
+cdef herr_t H5FD_fileobj_fapl_free(PyObject *fa) except -1 with gil:
+    Py_DECREF(<object>fa)
+    return 0
+
+cdef bint _is_zeroed(const unsigned char *buf, Py_ssize_t size):
+    cdef Py_ssize_t i
+    for i from 0<=i<size:
+        if buf[i]:
+            return False
+    return True
+
+cdef H5FD_fileobj_t *H5FD_fileobj_open(const char *name, unsigned flags, hid_t fapl, haddr_t maxaddr) except NULL with gil:
+    cdef H5FD_fileobj_t *f
+    cdef PyObject *info = <PyObject*>H5Pget_driver_info(fapl)
+    cdef int bufflags
+
+    fileobj, page_size, readahead, cache_size, owner = <object>info
+    rdwr = (flags & H5F_ACC_RDWR) != 0
+
+    f = <H5FD_fileobj_t*>malloc(sizeof(H5FD_fileobj_t))
+    if f == NULL:
+        raise MemoryError("Can't allocate file-object driver handle")
+    memset(f, 0, sizeof(H5FD_fileobj_t))
+
+    try:
+        if PyObject_CheckBuffer(fileobj):
+            bufflags = PyBUF_SIMPLE
+            if rdwr:
+                bufflags |= PyBUF_WRITABLE
+            try:
+                PyObject_GetBuffer(fileobj, &f.view, bufflags)
+            except BufferError:
+                raise IOError("Buffer object does not allow %s access" % ("write" if rdwr else "read"))
+            f.is_buffer = True
+            # A buffer can't be empty, so for exclusive creation it must
+            # not hold any data yet
+            if (flags & H5F_ACC_EXCL) and not _is_zeroed(<unsigned char*>f.view.buf, f.view.len):
+                raise IOError(EEXIST, "Buffer is not empty")
+        elif not hasattr(fileobj, 'seek'):
+            raise TypeError("File object must be seekable or support the buffer protocol")
+        else:
+            if flags & H5F_ACC_EXCL:
+                fileobj.seek(0, 2)
+                if fileobj.tell() > 0:
+                    raise IOError(EEXIST, "File object is not empty")
+            if flags & H5F_ACC_TRUNC:
+                fileobj.seek(0)
+                fileobj.truncate(0)
+            io = FileObjIO(fileobj, page_size, readahead, cache_size)
+            Py_INCREF(io)
+            f.io = <PyObject*>io
+    except:
+        if f.is_buffer:
+            PyBuffer_Release(&f.view)
+        free(f)
+        raise
+
+    f.info = info
+    Py_INCREF(<object>info)
+    f.fileobj = <PyObject*>fileobj
+    return f
+
+cdef herr_t H5FD_fileobj_close(H5FD_fileobj_t *f) except -1 with gil:
+    try:
+        if f.is_buffer:
+            PyBuffer_Release(&f.view)
+        else:
+            (<FileObjIO>f.io).close()
+    finally:
+        if f.io != NULL:
+            Py_DECREF(<object>f.io)
+        Py_DECREF(<object>f.info)
+        free(f)
+    return 0
+
+cdef int H5FD_fileobj_cmp(const H5FD_fileobj_t *f1, const H5FD_fileobj_t *f2):
+    if f1.fileobj < f2.fileobj:
+        return -1
+    if f1.fileobj > f2.fileobj:
+        return 1
+    return 0
+
+cdef herr_t H5FD_fileobj_query(const H5FD_fileobj_t *f, unsigned long *flags):
+    flags[0] = (H5FD_FEAT_AGGREGATE_METADATA | H5FD_FEAT_ACCUMULATE_METADATA |
+                H5FD_FEAT_DATA_SIEVE | H5FD_FEAT_AGGREGATE_SMALLDATA)
+    return 0
+
+cdef haddr_t H5FD_fileobj_get_eoa(const H5FD_fileobj_t *f, H5FD_mem_t type):
+    return f.eoa
+
+cdef herr_t H5FD_fileobj_set_eoa(H5FD_fileobj_t *f, H5FD_mem_t type, haddr_t addr):
+    f.eoa = addr
+    return 0
+
+cdef haddr_t _fileobj_eof(const H5FD_fileobj_t *f) with gil:
+    if f.is_buffer:
+        return f.view.len
+    try:
+        fileobj = <object>f.fileobj
+        fileobj.seek(0, 2)
+        return fileobj.tell()
+    except Exception:
+        return HADDR_UNDEF
+
+IF HDF5_VERSION >= (1, 10, 0):
+    cdef haddr_t H5FD_fileobj_get_eof(const H5FD_fileobj_t *f, H5FD_mem_t type):
+        return _fileobj_eof(f)
+ELSE:
+    cdef haddr_t H5FD_fileobj_get_eof(const H5FD_fileobj_t *f):
+        return _fileobj_eof(f)
+
+cdef herr_t H5FD_fileobj_get_handle(H5FD_fileobj_t *f, hid_t fapl, void **handle):
+    handle[0] = <void*>f
+    return 0
+
+cdef herr_t H5FD_fileobj_read(H5FD_fileobj_t *f, H5FD_mem_t type, hid_t dxpl, haddr_t addr, size_t size, void *buf) except -1 with gil:
+    cdef size_t n = 0
+
+    if f.is_buffer:
+        if addr < f.view.len:
+            n = min(size, <size_t>(f.view.len - addr))
+            with nogil:
+                memcpy(buf, <char*>f.view.buf + addr, n)
+        if n < size:
+            memset(<char*>buf + n, 0, size - n)
+        return 0
+
+    return (<FileObjIO>f.io).read(addr, size, <char*>buf)
+
+cdef herr_t H5FD_fileobj_write(H5FD_fileobj_t *f, H5FD_mem_t type, hid_t dxpl, haddr_t addr, size_t size, const void *buf) except -1 with gil:
+    if f.is_buffer:
+        if addr + size > f.view.len:
+            raise IOError("Can't write past the end of a %d-byte buffer" % f.view.len)
+        with nogil:
+            memcpy(<char*>f.view.buf + addr, <void*>buf, size)
+        return 0
+
+    return (<FileObjIO>f.io).write(addr, size, buf)
+
+cdef herr_t H5FD_fileobj_flush(H5FD_fileobj_t *f, hid_t dxpl, hbool_t closing) except -1 with gil:
+    if f.is_buffer:
+        flush = getattr(<object>f.fileobj, 'flush', None)
+        if flush is not None:
+            flush()
+        return 0
+    return (<FileObjIO>f.io).flush()
+
+cdef herr_t H5FD_fileobj_truncate(H5FD_fileobj_t *f, hid_t dxpl, hbool_t closing) except -1 with gil:
+    if f.is_buffer:
+        return 0    # Fixed size
+    return (<FileObjIO>f.io).truncate(f.eoa)
+
+cdef H5FD_class_t fileobj_class
+memset(&fileobj_class, 0, sizeof(H5FD_class_t))
+fileobj_class.name = b'fileobj'
+fileobj_class.maxaddr = 0x7fffffffffffffff
+fileobj_class.fc_degree = H5F_CLOSE_WEAK
+fileobj_class.fapl_size = sizeof(PyObject*)
+fileobj_class.fapl_get = <void *(*)(H5FD_t *)>H5FD_fileobj_fapl_get
+fileobj_class.fapl_copy = <void *(*)(const void *)>H5FD_fileobj_fapl_copy
+fileobj_class.fapl_free = <herr_t (*)(void *)>H5FD_fileobj_fapl_free
+fileobj_class.open = <H5FD_t *(*)(const char *, unsigned, hid_t, haddr_t)>H5FD_fileobj_open
+fileobj_class.close = <herr_t (*)(H5FD_t *)>H5FD_fileobj_close
+fileobj_class.cmp = <int (*)(const H5FD_t *, const H5FD_t *)>H5FD_fileobj_cmp
+fileobj_class.query = <herr_t (*)(const H5FD_t *, unsigned long *)>H5FD_fileobj_query
+fileobj_class.get_eoa = <haddr_t (*)(const H5FD_t *, H5FD_mem_t)>H5FD_fileobj_get_eoa
+fileobj_class.set_eoa = <herr_t (*)(H5FD_t *, H5FD_mem_t, haddr_t)>H5FD_fileobj_set_eoa
+IF HDF5_VERSION >= (1, 10, 0):
+    fileobj_class.get_eof = <haddr_t (*)(const H5FD_t *, H5FD_mem_t)>H5FD_fileobj_get_eof
+ELSE:
+    fileobj_class.get_eof = <haddr_t (*)(const H5FD_t *)>H5FD_fileobj_get_eof
+fileobj_class.get_handle = <herr_t (*)(H5FD_t *, hid_t, void **)>H5FD_fileobj_get_handle
+fileobj_class.read = <herr_t (*)(H5FD_t *, H5FD_mem_t, hid_t, haddr_t, size_t, void *)>H5FD_fileobj_read
+fileobj_class.write = <herr_t (*)(H5FD_t *, H5FD_mem_t, hid_t, haddr_t, size_t, const void *)>H5FD_fileobj_write
+fileobj_class.flush = <herr_t (*)(H5FD_t *, hid_t, hbool_t)>H5FD_fileobj_flush
+fileobj_class.truncate = <herr_t (*)(H5FD_t *, hid_t, hbool_t)>H5FD_fileobj_truncate
+
+FILEOBJ = H5FDregister(&fileobj_class)
+
+
+# === Family files through the file-object driver =============================
+
+# A copy of the file-object driver with its own name, for family files
+# whose member I/O is done in Python.  The file object, normally an
+# h5py._hl.family.FamilyFile, maps addresses onto the member files and
+# provides a memb_size attribute.
+#
+# The member size is kept in the superblock driver info, laid out as by
+# HDF5's family driver (which ignores the driver info name, so it can open
+# these files too) but under the name "H5PYfami".
+#
+# HDF5 refuses to open files whose driver info is named "NCSAfami", i.e.
+# families written by its own driver, unless the driver class is called
+# "family".  PYFAMILY_NCSA is a further copy under that name, which also
+# writes "NCSAfami", for use with such families.
+
+cdef hsize_t H5FD_pyfamily_sb_size(H5FD_fileobj_t *f):
+    return 8
+
+cdef int _pyfamily_encode(H5FD_fileobj_t *f, const char *drvname, char *name, unsigned char *p) except -1:
+    cdef unsigned long long msize = (<object>f.fileobj).memb_size
+    cdef int i
+
+    memcpy(name, drvname, 8)
+    name[8] = 0
+    for i from 0<=i<8:
+        p[i] = (msize >> (8*i)) & 0xff
+    return 0
+
+cdef herr_t H5FD_pyfamily_sb_encode(H5FD_fileobj_t *f, char *name, unsigned char *p) except -1 with gil:
+    return _pyfamily_encode(f, b"H5PYfami", name, p)
+
+cdef herr_t H5FD_ncsafamily_sb_encode(H5FD_fileobj_t *f, char *name, unsigned char *p) except -1 with gil:
+    return _pyfamily_encode(f, b"NCSAfami", name, p)
+
+cdef herr_t H5FD_pyfamily_sb_decode(H5FD_fileobj_t *f, const char *name, const unsigned char *p) except -1 with gil:
+    cdef unsigned long long msize = 0
+    cdef int i
+
+    for i from 0<=i<8:
+        msize |= (<unsigned long long>p[i]) << (8*i)
+    fileobj = <object>f.fileobj
+    if fileobj.memb_size is None:
+        fileobj.memb_size = msize
+    elif fileobj.memb_size != msize:
+        raise ValueError("Family member size should be %d, not %d" % (msize, fileobj.memb_size))
+    return 0
+
+cdef H5FD_class_t pyfamily_class
+memcpy(&pyfamily_class, &fileobj_class, sizeof(H5FD_class_t))
+pyfamily_class.name = b'pyfamily'
+pyfamily_class.sb_size = <hsize_t (*)(H5FD_t *)>H5FD_pyfamily_sb_size
+pyfamily_class.sb_encode = <herr_t (*)(H5FD_t *, char *, unsigned char *)>H5FD_pyfamily_sb_encode
+pyfamily_class.sb_decode = <herr_t (*)(H5FD_t *, const char *, const unsigned char *)>H5FD_pyfamily_sb_decode
+
+PYFAMILY = H5FDregister(&pyfamily_class)
+
+cdef H5FD_class_t ncsafamily_class
+memcpy(&ncsafamily_class, &pyfamily_class, sizeof(H5FD_class_t))
+ncsafamily_class.name = b'family'
+ncsafamily_class.sb_encode = <herr_t (*)(H5FD_t *, char *, unsigned char *)>H5FD_ncsafamily_sb_encode
+
+PYFAMILY_NCSA = H5FDregister(&ncsafamily_class)
+
+
+@with_phil
+def get_fileobj_io(ObjectID fid not None):
+    """(ObjectID fid) => FileObjIO or None
+
+    Retrieve the I/O layer of a file opened with the file-object driver,
+    e.g. to inspect its statistics.  Returns None if the file is backed by
+    a buffer, which is accessed directly.
+    """
+    cdef hid_t fapl
+    cdef H5FD_fileobj_t *f = NULL
+
+    fapl = H5Fget_access_plist(fid.id)
+    try:
+        if H5Pget_driver(fapl) not in (FILEOBJ, PYFAMILY, PYFAMILY_NCSA):
+            raise TypeError("File does not use the file-object driver")
+        H5Fget_vfd_handle(fid.id, fapl, <void**>&f)
+    finally:
+        H5Pclose(fapl)
+
+    if f.is_buffer:
+        return None
+    return <FileObjIO>f.io
@@ -16,7 +16,7 @@ include "config.pxi"
 # Compile-time imports
 from _objects cimport pdefault
 from utils cimport emalloc, efree
-from h5p cimport PropID
+from h5p cimport PropID, propwrap
 cimport _hdf5 # to implement container testing for 1.6
 from _errors cimport set_error_handler, err_cookie
 
@@ -322,6 +322,16 @@ cdef class GroupID(ObjectID):
         return size
 
 
+    @with_phil
+    def get_create_plist(self):
+        """() => PropGCID
+
+        Create and return a new copy of the group creation property list
+        used when this group was created.
+        """
+        return propwrap(H5Gget_create_plist(self.id))
+
+
     @with_phil
     def get_objname_by_idx(self, hsize_t idx):
         """(INT idx) => STRING
@@ -19,6 +19,8 @@ from utils cimport emalloc, efree
 
 from ._objects import phil, with_phil
 
+import numpy
+
 
 # === Public constants ========================================================
 
@@ -26,6 +28,10 @@ TYPE_HARD = H5L_TYPE_HARD
 TYPE_SOFT = H5L_TYPE_SOFT
 TYPE_EXTERNAL = H5L_TYPE_EXTERNAL
 
+# Rows returned by LinkProxy.get_info_table
+INFO_DTYPE = numpy.dtype([('name', object), ('type', 'i1'), ('obj_type', 'i1'),
+                          ('addr', 'u8'), ('corder', 'i8')])
+
 cdef class LinkInfo:
 
     cdef H5L_info_t infostruct
@@ -87,6 +93,49 @@ cdef herr_t cb_link_simple(hid_t grp, char* name, H5L_info_t *istruct, void* dat
     return 1
 
 
+cdef class _InfoTable:
+
+    """ Helper class for get_info_table """
+
+    cdef bint objtypes
+    cdef dict seen                  # Object type by address
+    cdef list names, ltypes, otypes, addrs, corders
+
+    def __init__(self, bint objtypes):
+        self.objtypes = objtypes
+        self.seen = {}
+        self.names = []
+        self.ltypes = []
+        self.otypes = []
+        self.addrs = []
+        self.corders = []
+
+cdef herr_t cb_link_table(hid_t grp, char* name, H5L_info_t *istruct, void* data) except 2:
+    # Record one row of the table; objects are never opened
+
+    cdef _InfoTable table = <_InfoTable>data
+    cdef H5O_info_t oinfo
+    cdef int otype = -1
+
+    if istruct.type == H5L_TYPE_HARD:
+        addr = istruct.u.address
+        if table.objtypes:
+            otype = table.seen.get(addr, -1)
+            if otype < 0:
+                H5Oget_info_by_name(grp, name, &oinfo, H5P_DEFAULT)
+                otype = <int>oinfo.type
+                table.seen[addr] = otype
+    else:
+        addr = 0
+
+    table.names.append(<bytes>name)
+    table.ltypes.append(<int>istruct.type)
+    table.otypes.append(otype)
+    table.addrs.append(addr)
+    table.corders.append(istruct.corder if istruct.corder_valid else -1)
+    return 0
+
+
 cdef class LinkProxy:
 
     """
@@ -318,3 +367,97 @@ cdef class LinkProxy:
             cfunc, <void*>it, pdefault(lapl))
 
         return it.retval, idx
+
+
+    @with_phil
+    def get_names(self, hsize_t start, hsize_t stop, *,
+              int idx_type=H5_INDEX_NAME, int order=H5_ITER_NATIVE,
+              char* obj_name='.', PropID lapl=None):
+        """(UINT start, UINT stop, **kwds) => LIST of names
+
+        Get the names of the links at positions start to stop-1 in the
+        given index, with one H5Lget_name_by_idx call each.  On a group
+        with an indexed creation order, each lookup by creation order is
+        O(log n), so this is suitable for paging through a very large group.
+
+        STRING obj_name (".")
+            List this subgroup instead
+
+        PropLAID lapl (None)
+            Link access property list for "obj_name"
+
+        INT idx_type (h5.INDEX_NAME)
+
+        INT order (h5.ITER_NATIVE)
+        """
+        cdef hsize_t n
+        cdef ssize_t size
+        cdef char* buf = NULL
+        cdef list names = []
+
+        n = start
+        while n < stop:
+            size = H5Lget_name_by_idx(self.id, obj_name, <H5_index_t>idx_type,
+                        <H5_iter_order_t>order, n, NULL, 0, pdefault(lapl))
+            buf = <char*>emalloc(size+1)
+            try:
+                H5Lget_name_by_idx(self.id, obj_name, <H5_index_t>idx_type,
+                        <H5_iter_order_t>order, n, buf, size+1, pdefault(lapl))
+                names.append(buf[:size])
+            finally:
+                efree(buf)
+            n += 1
+
+        return names
+
+
+    @with_phil
+    def get_info_table(self, *, bint objtypes=True,
+              int idx_type=H5_INDEX_NAME, int order=H5_ITER_NATIVE,
+              char* obj_name='.', PropID lapl=None):
+        """(**kwds) => NDARRAY
+
+        Describe every link in this group, in a single iteration pass and
+        without opening any objects.  Returns a structured array (dtype
+        INFO_DTYPE) with one row per link:
+
+        name
+            Link name (bytes)
+        type
+            Link type (TYPE_HARD, TYPE_SOFT or TYPE_EXTERNAL)
+        obj_type
+            For hard links, the h5o.TYPE_* of the target; -1 for other
+            links, or if "objtypes" is False
+        addr
+            For hard links, the address of the target; 0 otherwise
+        corder
+            Creation order, or -1 if the group doesn't track it
+
+        BOOL objtypes (True)
+            Look up the type of each hard link target.  This reads the
+            target's object header (once per distinct object).
+
+        STRING obj_name (".")
+            List this subgroup instead
+
+        PropLAID lapl (None)
+            Link access property list for "obj_name"
+
+        INT idx_type (h5.INDEX_NAME)
+
+        INT order (h5.ITER_NATIVE)
+        """
+        cdef _InfoTable table = _InfoTable(objtypes)
+        cdef hsize_t idx = 0
+
+        H5Literate_by_name(self.id, obj_name, <H5_index_t>idx_type,
+            <H5_iter_order_t>order, &idx,
+            cb_link_table, <void*>table, pdefault(lapl))
+
+        arr = numpy.empty((len(table.names),), dtype=INFO_DTYPE)
+        arr['name'] = table.names
+        arr['type'] = table.ltypes
+        arr['obj_type'] = table.otypes
+        arr['addr'] = table.addrs
+        arr['corder'] = table.corders
+        return arr
@@ -18,10 +18,13 @@ from _objects cimport ObjectID, pdefault
 from h5g cimport GroupID
 from h5i cimport wrap_identifier
 from h5p cimport PropID
+from h5t cimport typewrap
 from utils cimport emalloc, efree
 
 from ._objects import phil, with_phil
 
+import numpy
+
 
 # === Public constants ========================================================
 
@@ -190,6 +193,57 @@ def open(ObjectID loc not None, char* name, PropID lapl=None):
     return wrap_identifier(H5Oopen(loc.id, name, pdefault(lapl)))
 
 
+cdef hid_t _open_parent(hid_t loc, bytes path, dict groups, hid_t plist) except -1:
+    # Open the group at path, relative to its nearest ancestor already in
+    # groups, and add it to groups
+    cdef hid_t gid
+    cdef bytes up, base
+
+    if path in groups:
+        return groups[path]
+    up, sep, base = path.rpartition(b'/')
+    if len(up) == 0 or len(base) == 0:
+        gid = H5Oopen(loc, path, plist)
+    else:
+        gid = H5Oopen(_open_parent(loc, up, groups, plist), base, plist)
+    groups[path] = gid
+    return gid
+
+
+@with_phil
+def open_many(ObjectID loc not None, object names, PropID lapl=None):
+    """(ObjectID loc, LIST names, PropID lapl=None) => LIST
+
+    Open a list of groups, datasets or named datatypes, returning their
+    identifiers in the same order.  Every intermediate group is looked up
+    only once, relative to its own parent, and the objects are opened
+    relative to their parents, so names sharing a path prefix don't repeat
+    the traversal.  Raises the same exceptions as open() if any object
+    can't be opened; nothing is left open in that case.
+    """
+    cdef hid_t plist = pdefault(lapl)
+    cdef hid_t parent_id, obj_id
+    cdef dict parents = {}
+    cdef list out = []
+    cdef bytes name, parent, base
+
+    try:
+        for name in names:
+            parent, sep, base = name.rpartition(b'/')
+            if len(parent) == 0 or len(base) == 0:
+                parent_id = loc.id
+                base = name
+            else:
+                parent_id = _open_parent(loc.id, parent, parents, plist)
+            obj_id = H5Oopen(parent_id, base, plist)
+            out.append(wrap_identifier(obj_id))
+    finally:
+        for parent_id in parents.values():
+            H5Oclose(parent_id)
+
+    return out
+
+
 @with_phil
 def link(ObjectID obj not None, GroupID loc not None, char* name,
     PropID lcpl=None, PropID lapl=None):
@@ -358,9 +412,217 @@ def visit(ObjectID loc not None, object func, *,
     return visit.retval
 
 
+# === Flat index ==============================================================
+
+# Names of the columns of the array returned by index()
+INDEX_FIELDS = ('path', 'type', 'addr', 'ndim', 'shape', 'dtype', 'chunks',
+                'storage_size', 'num_attrs')
+
+def _index_dtype(int pathlen, int rank, int codelen):
+    return numpy.dtype([('path', 'S%d' % pathlen), ('type', 'i1'),
+                        ('addr', 'u8'), ('ndim', 'i1'),
+                        ('shape', 'u8', (rank,)), ('dtype', 'S%d' % codelen),
+                        ('chunks', 'u8', (rank,)), ('storage_size', 'u8'),
+                        ('num_attrs', 'i4')])
+
+cdef bytes _dtype_code(object dt):
+    # Compact string form of a NumPy dtype; see index_dtype()
+    if dt.fields is not None or dt.subdtype is not None:
+        return repr(dt.descr).encode('utf-8')
+    return dt.str.encode('ascii')
+
+def index_dtype(bytes code not None):
+    """(BYTES code) => DTYPE
 
+    Convert an entry of the "dtype" column of the array from index() back
+    to a NumPy dtype.
+    """
+    import ast
+    text = code.decode('utf-8')
+    if text.startswith('['):
+        return numpy.dtype(ast.literal_eval(text))
+    return numpy.dtype(text)
+
+cdef class _IndexBuilder:
+
+    cdef int max_depth
+    cdef object types           # Set of object types, or None for all
+    cdef list paths, otypes, addrs, ndims, dtypes, sizes, nattrs
+    cdef list shapes, chunks    # (row, tuple) for datasets only
+
+    def __init__(self, types, int max_depth):
+        self.types = None if types is None else set(types)
+        self.max_depth = max_depth
+        self.paths = []
+        self.otypes = []
+        self.addrs = []
+        self.ndims = []
+        self.dtypes = []
+        self.sizes = []
+        self.nattrs = []
+        self.shapes = []
+        self.chunks = []
+
+    cdef int add(self, hid_t loc, bytes path, H5O_info_t *info) except -1:
+        # Record one object, if its type is wanted
+        if self.types is not None and <int>info.type not in self.types:
+            return 0
+        if info.type == H5O_TYPE_DATASET:
+            self.add_dataset(loc, info.addr)
+        else:
+            self.ndims.append(-1)
+            self.dtypes.append(b'')
+            self.sizes.append(0)
+        self.paths.append(path)
+        self.otypes.append(<int>info.type)
+        self.addrs.append(info.addr)
+        self.nattrs.append(info.num_attrs)
+        return 0
 
+    cdef int add_dataset(self, hid_t loc, haddr_t addr) except -1:
+        # Record shape, type, chunking and storage size of a dataset
+        cdef hid_t dset_id, space_id = -1, plist_id = -1
+        cdef hsize_t dims[32]
+        cdef int rank, ndim = -1, i
+        cdef Py_ssize_t row = len(self.paths)
+
+        dset_id = H5Oopen_by_addr(loc, addr)
+        try:
+            space_id = H5Dget_space(dset_id)
+            if H5Sget_simple_extent_type(space_id) != H5S_NULL:
+                ndim = H5Sget_simple_extent_ndims(space_id)
+                H5Sget_simple_extent_dims(space_id, dims, NULL)
+                if ndim > 0:
+                    self.shapes.append((row, tuple([dims[i] for i in range(ndim)])))
+            self.dtypes.append(_dtype_code(typewrap(H5Dget_type(dset_id)).py_dtype()))
+            plist_id = H5Dget_create_plist(dset_id)
+            if H5Pget_layout(plist_id) == H5D_CHUNKED:
+                rank = H5Pget_chunk(plist_id, 32, dims)
+                self.chunks.append((row, tuple([dims[i] for i in range(rank)])))
+            self.sizes.append(H5Dget_storage_size(dset_id))
+        finally:
+            if plist_id >= 0:
+                H5Pclose(plist_id)
+            if space_id >= 0:
+                H5Sclose(space_id)
+            H5Dclose(dset_id)
+        self.ndims.append(ndim)
+        return 0
 
+    cdef int visit_depth(self, hid_t loc, hid_t grp, bytes prefix, int depth,
+                         set seen) except -1:
+        # Depth-first walk of the hard links below grp, down to max_depth.
+        # Like H5Ovisit, each object is recorded once, under the first path
+        # found to it.
+        cdef list links = []
+        cdef hsize_t i = 0
+        cdef H5O_info_t info
+        cdef hid_t child
+
+        H5Literate(grp, H5_INDEX_NAME, H5_ITER_NATIVE, &i, cb_index_links, <void*>links)
+        for name, addr in links:
+            if addr in seen:
+                continue
+            seen.add(addr)
+            H5Oget_info_by_name(grp, name, &info, H5P_DEFAULT)
+            path = prefix + name
+            self.add(loc, path, &info)
+            if info.type == H5O_TYPE_GROUP and depth < self.max_depth:
+                child = H5Oopen_by_addr(grp, addr)
+                try:
+                    self.visit_depth(loc, child, path + b'/', depth + 1, seen)
+                finally:
+                    H5Oclose(child)
+        return 0
 
+    cdef object build(self):
+        cdef Py_ssize_t n = len(self.paths)
+
+        rank = max([len(x[1]) for x in self.shapes] + [1])
+        pathlen = max([len(x) for x in self.paths] + [1])
+        codelen = max([len(x) for x in self.dtypes] + [1])
+        arr = numpy.zeros((n,), dtype=_index_dtype(pathlen, rank, codelen))
+        arr['path'] = self.paths
+        arr['type'] = self.otypes
+        arr['addr'] = self.addrs
+        arr['ndim'] = self.ndims
+        arr['dtype'] = self.dtypes
+        arr['storage_size'] = self.sizes
+        arr['num_attrs'] = self.nattrs
+        shape_col, chunk_col = arr['shape'], arr['chunks']
+        for row, shape in self.shapes:
+            shape_col[row, :len(shape)] = shape
+        for row, chunks in self.chunks:
+            chunk_col[row, :len(chunks)] = chunks
+        return arr
+
+cdef herr_t cb_index_links(hid_t grp, char *name, H5L_info_t *info, void *data) except 2:
+    # Collect the hard links of one group, as (name, address)
+    if info.type == H5L_TYPE_HARD:
+        (<list>data).append((<bytes>name, info.u.address))
+    return 0
 
+cdef herr_t cb_obj_index(hid_t obj, char* name, H5O_info_t *info, void* data) except 2:
+
+    if strcmp(name, ".") == 0:
+        return 0
+    (<_IndexBuilder>data).add(obj, <bytes>name, info)
+    return 0
 
+
+@with_phil
+def index(ObjectID loc not None, object types=None, int max_depth=-1, *,
+          char* obj_name=".", PropID lapl=None):
+    """(ObjectID loc, LIST types=None, INT max_depth=-1, **kwds) => NDARRAY
+
+    Build a flat index of every object below the specified one, in a
+    single traversal without creating Python objects for each.  Returns a
+    structured array with one row per object and the columns named in
+    INDEX_FIELDS:
+
+    path
+        Name relative to *loc* (bytes)
+    type
+        Object type (TYPE_GROUP, TYPE_DATASET, TYPE_NAMED_DATATYPE)
+    addr
+        Address of the object header
+    ndim
+        Rank of datasets; -1 for null dataspaces and other objects
+    shape, chunks
+        Dataset shape and chunk shape in the first *ndim* entries of
+        fixed-length arrays, which are as long as the largest rank.  Chunks
+        are all 0 if the dataset isn't chunked, shapes for other objects.
+    dtype
+        Dataset type as a string; see index_dtype().  Empty otherwise.
+    storage_size
+        Bytes of storage allocated to datasets; 0 otherwise
+    num_attrs
+        Number of attributes
+
+    *types*, if given, is a list of object types to include.  If max_depth
+    is not negative, the traversal doesn't go more than *max_depth* links
+    below *loc*.  As with visit(), each object appears once even if
+    reachable by several paths.  Keywords:
+
+    STRING obj_name (".")
+        Index a subgroup of "loc" instead
+
+    PropLAID lapl (None)
+        Control how "obj_name" is interpreted
+    """
+    cdef _IndexBuilder builder = _IndexBuilder(types, max_depth)
+    cdef H5O_info_t info
+    cdef hid_t grp
+
+    if max_depth < 0:
+        H5Ovisit_by_name(loc.id, obj_name, H5_INDEX_NAME, H5_ITER_NATIVE,
+                         cb_obj_index, <void*>builder, pdefault(lapl))
+    elif max_depth > 0:
+        grp = H5Oopen(loc.id, obj_name, pdefault(lapl))
+        try:
+            H5Oget_info(grp, &info)
+            builder.visit_depth(grp, grp, b'', 1, set([info.addr]))
+        finally:
+            H5Oclose(grp)
+
+    return builder.build()
@@ -20,6 +20,7 @@ from utils cimport  require_tuple, convert_dims, convert_tuple, \
 from numpy cimport ndarray, import_array
 from h5t cimport TypeID, py_create
 from h5ac cimport CacheConfig
+from cpython.buffer cimport PyObject_GetBuffer, PyBuffer_Release, PyBUF_SIMPLE
 from h5py import _objects
 
 from ._objects import phil, with_phil
@@ -31,6 +32,9 @@ if MPI:
 # Initialization
 import_array()
 
+# Property lists are not file-resident and cannot become zombies
+_objects._register_transient(PropID)
+
 # === C API ===================================================================
 
 cdef hid_t pdefault(PropID pid):
@@ -441,6 +445,16 @@ cdef class PropDCID(PropOCID):
             efree(dims)
 
 
+    @with_phil
+    def get_external_count(self):
+        """() => INT
+
+        Determine the number of external files used to store the dataset's
+        raw data.  Zero means the data lives in the HDF5 file itself.
+        """
+        return H5Pget_external_count(self.id)
+
+
     @with_phil
     def set_fill_value(self, ndarray value not None):
         """(NDARRAY value)
@@ -825,6 +839,27 @@ cdef class PropFAID(PropInstanceID):
         return (increment, <bint>(backing_store))
 
 
+    IF HDF5_VERSION >= (1, 8, 9):
+
+        @with_phil
+        def set_file_image(self, object image not None):
+            """(BUFFER image)
+
+            Use the contents of *image* (any object supporting the buffer
+            protocol, e.g. bytes) as the initial contents of files opened
+            with this property list.  HDF5 copies the buffer, so it may be
+            discarded afterwards.  Normally used with the h5fd.CORE driver.
+
+            Feature requires: 1.8.9
+            """
+            cdef Py_buffer buf
+            PyObject_GetBuffer(image, &buf, PyBUF_SIMPLE)
+            try:
+                H5Pset_file_image(self.id, buf.buf, buf.len)
+            finally:
+                PyBuffer_Release(&buf)
+
+
     @with_phil
     def set_fapl_family(self, hsize_t memb_size=2147483647, PropID memb_fapl=None):
         """(UINT memb_size=2**31-1, PropFAID memb_fapl=None)
@@ -864,6 +899,129 @@ cdef class PropFAID(PropInstanceID):
         return (msize, plist)
 
 
+    @with_phil
+    def set_fapl_multi(self, memb_map, memb_fapl, memb_name, memb_addr,
+                       bint relax=True):
+        """(LIST memb_map, LIST memb_fapl, LIST memb_name, LIST memb_addr,
+        BOOL relax=True)
+
+        Set up the multi driver (h5fd.MULTI), which stores each type of
+        data in the file (h5fd.MEM_*) in its own member file.  Each list
+        has h5fd.MEM_NTYPES entries, indexed by memory type:
+
+        memb_map
+            Memory type whose member file stores this type; e.g. map
+            everything but MEM_DRAW to MEM_SUPER for two files
+        memb_fapl
+            File access property list for each member, or None
+        memb_name
+            Name template for each member; "%s" is replaced by the file name
+        memb_addr
+            Start of each member's part of the address space
+
+        Entries for types which are mapped elsewhere are ignored.  If
+        *relax* is True, files may be opened read-only with some members
+        missing.
+        """
+        cdef H5FD_mem_t *c_map = NULL
+        cdef hid_t *c_fapl = NULL
+        cdef char **c_name = NULL
+        cdef haddr_t *c_addr = NULL
+        cdef int i, n = H5FD_MEM_NTYPES
+
+        for arg in (memb_map, memb_fapl, memb_name, memb_addr):
+            if len(arg) != n:
+                raise ValueError("Member lists must have %d entries (got %d)" % (n, len(arg)))
+        names = list(memb_name)     # Keep a reference while we borrow them
+
+        try:
+            c_map = <H5FD_mem_t*>emalloc(sizeof(H5FD_mem_t)*n)
+            c_fapl = <hid_t*>emalloc(sizeof(hid_t)*n)
+            c_name = <char**>emalloc(sizeof(char*)*n)
+            c_addr = <haddr_t*>emalloc(sizeof(haddr_t)*n)
+            for i from 0<=i<n:
+                c_map[i] = <H5FD_mem_t>(<int>memb_map[i])
+                c_fapl[i] = pdefault(memb_fapl[i])
+                c_name[i] = NULL if names[i] is None else <char*>names[i]
+                c_addr[i] = memb_addr[i]
+            H5Pset_fapl_multi(self.id, c_map, c_fapl, c_name, c_addr, relax)
+        finally:
+            efree(c_map)
+            efree(c_fapl)
+            efree(c_name)
+            efree(c_addr)
+
+
+    @with_phil
+    def get_fapl_multi(self):
+        """() => TUPLE info
+
+        Determine multi driver settings, as a tuple of the arguments to
+        set_fapl_multi:
+
+        0. LIST memb_map
+        1. LIST memb_fapl (PropFAID or None)
+        2. LIST memb_name
+        3. LIST memb_addr
+        4. BOOL relax
+        """
+        cdef H5FD_mem_t *c_map = NULL
+        cdef hid_t *c_fapl = NULL
+        cdef char **c_name = NULL
+        cdef haddr_t *c_addr = NULL
+        cdef hbool_t relax
+        cdef int i, n = H5FD_MEM_NTYPES
+
+        try:
+            c_map = <H5FD_mem_t*>emalloc(sizeof(H5FD_mem_t)*n)
+            c_fapl = <hid_t*>emalloc(sizeof(hid_t)*n)
+            c_name = <char**>emalloc(sizeof(char*)*n)
+            c_addr = <haddr_t*>emalloc(sizeof(haddr_t)*n)
+            memset(c_name, 0, sizeof(char*)*n)
+            for i from 0<=i<n:
+                c_fapl[i] = -1
+
+            H5Pget_fapl_multi(self.id, c_map, c_fapl, c_name, c_addr, &relax)
+
+            memb_map = [<int>c_map[i] for i in range(n)]
+            memb_fapl = [PropFAID(c_fapl[i]) if c_fapl[i] > 0 else None for i in range(n)]
+            memb_name = [None if c_name[i] == NULL else <bytes>c_name[i] for i in range(n)]
+            memb_addr = [c_addr[i] for i in range(n)]
+            for i from 0<=i<n:
+                c_fapl[i] = -1  # Now owned by the PropFAIDs
+        finally:
+            if c_name != NULL:
+                for i from 0<=i<n:
+                    efree(c_name[i])
+            if c_fapl != NULL:
+                for i from 0<=i<n:
+                    if c_fapl[i] > 0:
+                        H5Pclose(c_fapl[i])
+            efree(c_map)
+            efree(c_fapl)
+            efree(c_name)
+            efree(c_addr)
+
+        return (memb_map, memb_fapl, memb_name, memb_addr, <bint>relax)
+
+
+    @with_phil
+    def set_fapl_split(self, char* meta_ext=b"-m.h5", PropID meta_fapl=None,
+                       char* raw_ext=b"-r.h5", PropID raw_fapl=None):
+        """(STRING meta_ext="-m.h5", PropFAID meta_fapl=None,
+        STRING raw_ext="-r.h5", PropFAID raw_fapl=None)
+
+        Set up the split driver, a special case of the multi driver
+        (h5fd.MULTI) which keeps metadata and raw data in two files.  Their
+        names are the file name plus *meta_ext* and *raw_ext*, or if an
+        extension contains "%s", the extension with the file name
+        substituted.  *meta_fapl* and *raw_fapl* are file access property
+        lists for the two members.
+        """
+        H5Pset_fapl_split(self.id, meta_ext, pdefault(meta_fapl),
+                          raw_ext, pdefault(raw_fapl))
+
+
     @with_phil
     def set_fapl_log(self, char* logfile, unsigned int flags, size_t buf_size):
         """(STRING logfile, UINT flags, UINT buf_size)
@@ -892,6 +1050,32 @@ cdef class PropFAID(PropInstanceID):
         H5Pset_fapl_stdio(self.id)
 
 
+    @with_phil
+    def set_fileobj_driver(self, hid_t driver_id, object fileobj,
+                           size_t page_size=64*1024, size_t readahead=0,
+                           size_t cache_size=4*1024*1024, bint close=False):
+        """(INT driver_id, OBJECT fileobj, UINT page_size=64k,
+        UINT readahead=0, UINT cache_size=4M, BOOL close=False)
+
+        Select the Python file-object driver (h5fd.FILEOBJ), which performs
+        all I/O through *fileobj*.  This may be any object supporting the
+        buffer protocol (accessed directly; it can't grow) or a seekable
+        file-like object providing readinto() or read(), plus write() and
+        truncate() if the file is to be modified.
+
+        For file-like objects, reads are rounded out to aligned pages of
+        *page_size* bytes and kept in an LRU cache of *cache_size* bytes.
+        Runs of missing pages are fetched with a single read, extended by
+        *readahead* bytes.  A page_size of 0 disables the cache.  If
+        *close* is True, fileobj.close() is called once this list, its
+        copies and every file opened with them have been released.
+        """
+        from h5py.h5fd import FileObjOwner
+        owner = FileObjOwner(fileobj) if close else None
+        info = (fileobj, page_size, readahead, cache_size, owner)
+        H5Pset_driver(self.id, driver_id, <void*>info)
+
+
     @with_phil
     def get_driver(self):
         """() => INT driver code
@@ -908,6 +1092,9 @@ cdef class PropFAID(PropInstanceID):
         - h5fd.MULTI
         - h5fd.SEC2
         - h5fd.STDIO
+        - h5fd.FILEOBJ
+        - h5fd.PYFAMILY
+        - h5fd.PYFAMILY_NCSA
         """
         return H5Pget_driver(self.id)
 
@@ -964,6 +1151,49 @@ cdef class PropFAID(PropInstanceID):
         return size
 
 
+    @with_phil
+    def set_meta_block_size(self, hsize_t size):
+        """ (UINT size)
+
+        Set the minimum size of the blocks allocated for file metadata.
+        Small metadata objects are aggregated into blocks of this size,
+        which reduces small writes and fragmentation.  The default is 2k.
+        """
+        H5Pset_meta_block_size(self.id, size)
+
+
+    @with_phil
+    def get_meta_block_size(self):
+        """ () => UINT size
+
+        Get the minimum metadata block size (in bytes).
+        """
+        cdef hsize_t size
+        H5Pget_meta_block_size(self.id, &size)
+        return size
+
+
+    @with_phil
+    def set_small_data_block_size(self, hsize_t size):
+        """ (UINT size)
+
+        Set the size of the blocks in which small raw data allocations
+        (e.g. contiguous datasets) are aggregated.  The default is 2k.
+        """
+        H5Pset_small_data_block_size(self.id, size)
+
+
+    @with_phil
+    def get_small_data_block_size(self):
+        """ () => UINT size
+
+        Get the small raw data block size (in bytes).
+        """
+        cdef hsize_t size
+        H5Pget_small_data_block_size(self.id, &size)
+        return size
+
+
     @with_phil
     def set_libver_bounds(self, int low, int high):
         """ (INT low, INT high)
@@ -1056,8 +1286,10 @@ cdef class PropFAID(PropInstanceID):
         """
         H5Pset_mdc_config(self.id, &config.cache_config)
 
+    @with_phil
     def get_alignment(self):
-        """
+        """ () => TUPLE (threshold, alignment)
+
         Retrieves the current settings for alignment properties from a file access property list.
         """
         cdef hsize_t threshold, alignment
@@ -1065,9 +1297,13 @@ cdef class PropFAID(PropInstanceID):
 
         return threshold, alignment
 
-    def set_alignment(self, threshold, alignment):
-        """
-        Sets alignment properties of a file access property list.
+    @with_phil
+    def set_alignment(self, hsize_t threshold, hsize_t alignment):
+        """ (UINT threshold, UINT alignment)
+
+        Sets alignment properties of a file access property list.  Every
+        file allocation of at least *threshold* bytes starts at a multiple
+        of *alignment* bytes.
         """
         H5Pset_alignment(self.id, threshold, alignment)
 
@@ -1268,6 +1504,57 @@ cdef class PropOCID(PropCreateID):
         return track_times
 
 
+    @with_phil
+    def set_attr_phase_change(self, unsigned int max_compact=8,
+                              unsigned int min_dense=6):
+        """(UINT max_compact=8, UINT min_dense=6)
+
+        Set the thresholds for switching attribute storage between compact
+        (in the object header) and dense (indexed with a B-tree).  Storage
+        becomes dense when there are more than max_compact attributes, and
+        compact again when there are fewer than min_dense.  Use (0, 0) to
+        always use dense storage.
+        """
+        H5Pset_attr_phase_change(self.id, max_compact, min_dense)
+
+
+    @with_phil
+    def get_attr_phase_change(self):
+        """() => TUPLE (UINT max_compact, UINT min_dense)
+
+        Get the thresholds for switching attribute storage between compact
+        and dense.
+        """
+        cdef unsigned int max_compact
+        cdef unsigned int min_dense
+        H5Pget_attr_phase_change(self.id, &max_compact, &min_dense)
+        return (max_compact, min_dense)
+
+
+    @with_phil
+    def set_attr_creation_order(self, unsigned int flags):
+        """(UINT flags)
+
+        Set tracking and indexing of creation order for attributes added to
+        this object.
+
+        flags -- h5p.CRT_ORDER_TRACKED, h5p.CRT_ORDER_INDEXED
+        """
+        H5Pset_attr_creation_order(self.id, flags)
+
+
+    @with_phil
+    def get_attr_creation_order(self):
+        """() => UINT flags
+
+        Get tracking and indexing of creation order for attributes added to
+        this object.
+        """
+        cdef unsigned int flags
+        H5Pget_attr_creation_order(self.id, &flags)
+        return flags
+
+
 # Dataset access
 cdef class PropDAID(PropInstanceID):
 
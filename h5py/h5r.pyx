@@ -13,9 +13,15 @@
 
 # Pyrex compile-time imports
 from _objects cimport ObjectID
+from numpy cimport ndarray, import_array, PyArray_DATA
 
 from ._objects import phil, with_phil
 
+import numpy
+
+# Initialization
+import_array()
+
 
 # === Public constants and data structures ====================================
 
@@ -64,20 +70,30 @@ def create(ObjectID loc not None, char* name, int ref_type, ObjectID space=None)
 
 
 @with_phil
-def dereference(Reference ref not None, ObjectID id not None):
-    """(Reference ref, ObjectID id) => ObjectID or None
+def dereference(object ref not None, ObjectID id not None):
+    """(Reference or INT ref, ObjectID id) => ObjectID or None
 
     Open the object pointed to by the reference and return its
     identifier.  The file identifier (or the identifier for any object
     in the file) must also be provided.  Returns None if the reference
     is zero-filled.
 
-    The reference may be either Reference or RegionReference.
+    The reference may be either Reference or RegionReference, or a raw
+    object reference value (an object header address) as used by
+    dereference_many and h5ds.get_dimension_list.
     """
+    cdef Reference r
+    cdef hobj_ref_t addr
     import h5i
-    if not ref:
+    if isinstance(ref, Reference):
+        r = ref
+        if not r:
+            return None
+        return h5i.wrap_identifier(H5Rdereference(id.id, <H5R_type_t>r.typecode, &r.ref))
+    addr = ref
+    if addr == 0:
         return None
-    return h5i.wrap_identifier(H5Rdereference(id.id, <H5R_type_t>ref.typecode, &ref.ref))
+    return h5i.wrap_identifier(H5Rdereference(id.id, H5R_OBJECT, &addr))
 
 
 @with_phil
@@ -142,6 +158,237 @@ def get_name(Reference ref not None, ObjectID loc not None):
             free(namebuf)
 
 
+# === Bulk dereferencing ======================================================
+
+cdef class _NameFinder:
+
+    """ Names for a set of object addresses, filled in by cb_find_names """
+
+    cdef dict names         # addr -> name, or None if not yet found
+    cdef Py_ssize_t remaining
+
+    def __init__(self, addrs):
+        self.names = dict((addr, None) for addr in addrs)
+        self.remaining = len(self.names)
+
+
+cdef herr_t cb_find_names(hid_t obj, char* name, H5O_info_t *info, void* data) except 2:
+
+    cdef _NameFinder finder = <_NameFinder>data
+
+    addr = info.addr
+    if addr in finder.names and finder.names[addr] is None:
+        if strcmp(name, ".") == 0:
+            finder.names[addr] = b"/"
+        else:
+            finder.names[addr] = b"/" + name
+        finder.remaining -= 1
+        if finder.remaining == 0:
+            return 1    # Stop early; everything's been found
+    return 0
+
+
+@with_phil
+def dereference_many(ndarray refs not None, ObjectID loc not None, dict cache=None):
+    """(NDARRAY refs, ObjectID loc, DICT cache=None) => NDARRAY names
+
+    Find the names of the objects an array of object references point
+    to, without creating a Reference instance or opening an object for
+    each.  "refs" holds raw hobj_ref_t values, e.g. read from a dataset
+    with memory type h5t.STD_REF_OBJ into a uint64 array; these are the
+    object header addresses.  "loc" is any object in the file.
+
+    Returns an object array of the same shape, with the absolute name
+    (bytes) of each object, or None for null references and objects
+    with no name.  Where an object has several names, one is picked.
+
+    Each distinct reference is resolved once, and all of them together
+    in a single traversal of the file, which ends as soon as every one
+    has been found.  If "cache" is given, it maps addresses to names
+    and is consulted and updated.
+    """
+    cdef _NameFinder finder
+    cdef hobj_ref_t ref
+    cdef ssize_t namesize
+    cdef char* namebuf = NULL
+
+    if refs.dtype.itemsize != sizeof(hobj_ref_t) or refs.dtype.kind not in ('u', 'i', 'V'):
+        raise TypeError("References must be raw 8-byte values (e.g. uint64)")
+    if cache is None:
+        cache = {}
+
+    addrs, inverse = numpy.unique(refs.view('u8').reshape(-1), return_inverse=True)
+    names = numpy.empty((len(addrs),), dtype=object)
+
+    missing = [int(x) for x in addrs if x != 0 and int(x) not in cache]
+    if missing:
+        finder = _NameFinder(missing)
+        H5Ovisit_by_name(loc.id, "/", H5_INDEX_NAME, H5_ITER_NATIVE,
+                         cb_find_names, <void*>finder, H5P_DEFAULT)
+        for addr, name in finder.names.items():
+            if name is None:
+                # Not reachable from the root group (e.g. only through a
+                # mount point); ask HDF5 directly.
+                ref = addr
+                namesize = H5Rget_name(loc.id, H5R_OBJECT, &ref, NULL, 0)
+                if namesize > 0:
+                    namebuf = <char*>malloc(namesize+1)
+                    try:
+                        H5Rget_name(loc.id, H5R_OBJECT, &ref, namebuf, namesize+1)
+                        name = namebuf
+                    finally:
+                        free(namebuf)
+                        namebuf = NULL
+            cache[addr] = name
+
+    for i, addr in enumerate(addrs):
+        if addr != 0:
+            names[i] = cache[int(addr)]
+
+    return names[inverse].reshape(refs.shape)
+
+
+# === Bulk region decoding ====================================================
+
+cdef enum:
+    MAX_RANK = 32   # H5S_MAX_RANK
+
+cdef hssize_t _region_points(hid_t space, long long* out) except -1:
+    # Write the flat (C-order) dataset index of each selected element to
+    # out, in the order a read would return them, except that the blocks
+    # of a hyperslab selection are written one after another.  Returns the
+    # number of hyperslab blocks, or 0 for other selections.
+
+    cdef int rank, k
+    cdef hsize_t dims[MAX_RANK]
+    cdef hsize_t stride[MAX_RANK]
+    cdef hsize_t pos[MAX_RANK]
+    cdef hsize_t *buf = NULL
+    cdef hsize_t *start
+    cdef hsize_t *end
+    cdef hssize_t n, j, b, nblocks = 0
+    cdef long long idx
+    cdef H5S_sel_type seltype
+
+    rank = H5Sget_simple_extent_ndims(space)
+    if rank > MAX_RANK:
+        raise ValueError("Dataspace rank %d too large" % rank)
+    H5Sget_simple_extent_dims(space, dims, NULL)
+    for k from rank>k>=0:
+        stride[k] = 1 if k == rank-1 else stride[k+1]*dims[k+1]
+
+    seltype = H5Sget_select_type(space)
+    if seltype == H5S_SEL_ALL:
+        n = H5Sget_select_npoints(space)
+        for j from 0<=j<n:
+            out[j] = j
+
+    elif seltype == H5S_SEL_POINTS:
+        n = H5Sget_select_elem_npoints(space)
+        buf = <hsize_t*>malloc(sizeof(hsize_t)*rank*n + 1)
+        if buf == NULL:
+            raise MemoryError()
+        try:
+            H5Sget_select_elem_pointlist(space, 0, n, buf)
+            for j from 0<=j<n:
+                idx = 0
+                for k from 0<=k<rank:
+                    idx += buf[j*rank+k]*stride[k]
+                out[j] = idx
+        finally:
+            free(buf)
+
+    elif seltype == H5S_SEL_HYPERSLABS:
+        nblocks = H5Sget_select_hyper_nblocks(space)
+        buf = <hsize_t*>malloc(sizeof(hsize_t)*2*rank*nblocks + 1)
+        if buf == NULL:
+            raise MemoryError()
+        try:
+            H5Sget_select_hyper_blocklist(space, 0, nblocks, buf)
+            j = 0
+            for b from 0<=b<nblocks:
+                start = buf + b*2*rank
+                end = start + rank
+                for k from 0<=k<rank:
+                    pos[k] = start[k]
+                while True:
+                    idx = 0
+                    for k from 0<=k<rank:
+                        idx += pos[k]*stride[k]
+                    out[j] = idx
+                    j += 1
+                    # Advance to the next element of the block, C order
+                    k = rank-1
+                    while k >= 0 and pos[k] == end[k]:
+                        pos[k] = start[k]
+                        k -= 1
+                    if k < 0:
+                        break
+                    pos[k] += 1
+        finally:
+            free(buf)
+
+    return nblocks
+
+
+@with_phil
+def get_region_points(ObjectID dset not None, object refs):
+    """(ObjectID dset, SEQUENCE refs) => (NDARRAY offsets, NDARRAY points)
+
+    Decode a sequence of RegionReferences to dataset "dset" in one go.
+    Returns two int64 arrays: the elements of region i are
+    points[offsets[i]:offsets[i+1]], given as indices into the flattened
+    dataset and in the order reading the region would return them.  Null
+    references give empty regions.  Raises ValueError if a reference
+    points to some other dataset.
+    """
+    cdef RegionReference ref
+    cdef H5O_info_t target, info
+    cdef hid_t obj, space
+    cdef ndarray offsets, points
+    cdef long long* offs
+    cdef Py_ssize_t i, nrefs
+    cdef hssize_t used = 0, n, cap, nblocks
+
+    H5Oget_info(dset.id, &target)
+
+    nrefs = len(refs)
+    offsets = numpy.zeros((nrefs+1,), dtype='i8')
+    offs = <long long*>PyArray_DATA(offsets)
+    cap = nrefs if nrefs > 16 else 16
+    points = numpy.empty((cap,), dtype='i8')
+
+    for i from 0<=i<nrefs:
+        ref = refs[i]
+        if ref:
+            obj = H5Rdereference(dset.id, H5R_DATASET_REGION, &ref.ref)
+            try:
+                H5Oget_info(obj, &info)
+            finally:
+                H5Oclose(obj)
+            if info.addr != target.addr or info.fileno != target.fileno:
+                raise ValueError("Region reference must point to this dataset")
+
+            space = H5Rget_region(dset.id, H5R_DATASET_REGION, &ref.ref)
+            try:
+                n = H5Sget_select_npoints(space)
+                if used + n > cap:
+                    while used + n > cap:
+                        cap *= 2
+                    points = numpy.concatenate((points[:used],
+                                                numpy.empty((cap-used,), dtype='i8')))
+                nblocks = _region_points(space, (<long long*>PyArray_DATA(points)) + used)
+            finally:
+                H5Sclose(space)
+            if nblocks > 1:
+                # HDF5 reads hyperslabs in C order, not block by block
+                points[used:used+n].sort()
+            used += n
+        offs[i+1] = used
+
+    return offsets, points[:used]
+
+
 cdef class Reference:
 
     """
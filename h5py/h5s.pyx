@@ -19,6 +19,9 @@ from numpy cimport ndarray
 from h5py import _objects
 from ._objects import phil, with_phil
 
+# Dataspaces are not file-resident and cannot become zombies
+_objects._register_transient(SpaceID)
+
 cdef object lockid(hid_t id_):
     cdef SpaceID space
     space = SpaceID(id_)
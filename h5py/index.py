@@ -0,0 +1,20 @@
+# This file is part of h5py, a Python interface to the HDF5 library.
+#
+# http://www.h5py.org
+#
+# Copyright 2008-2013 Andrew Collette and contributors
+#
+# License:  Standard 3-clause BSD; see "license.txt" for full license terms
+#           and contributor agreement.
+
+"""
+    Sidecar catalogs for large files.
+
+    build(f) writes a catalog of every link in an open (read-only) File,
+    which File(name, 'r', index=path) then uses to answer membership tests
+    and member listings without reading HDF5 metadata.
+"""
+
+from __future__ import absolute_import
+
+from ._hl.catalog import build, load, Catalog, default_path
@@ -4,9 +4,17 @@ from __future__ import absolute_import
 from . import  (test_dataset_getitem, 
                 test_dims_dimensionproxy,
                 test_file, 
-                test_attribute_create, )
+                test_attribute_create,
+                test_dataset_mmap,
+                test_group_index,
+                test_catalog,
+                test_open_many, )
                 
 MODULES = ( test_dataset_getitem, 
             test_dims_dimensionproxy,
             test_file,
-            test_attribute_create, )
+            test_attribute_create,
+            test_dataset_mmap,
+            test_group_index,
+            test_catalog,
+            test_open_many, )
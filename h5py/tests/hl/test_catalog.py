@@ -0,0 +1,120 @@
+# This file is part of h5py, a Python interface to the HDF5 library.
+#
+# http://www.h5py.org
+#
+# Copyright 2008-2013 Andrew Collette and contributors
+#
+# License:  Standard 3-clause BSD; see "license.txt" for full license terms
+#           and contributor agreement.
+
+"""
+    Tests sidecar catalogs (h5py.index).
+"""
+
+from __future__ import absolute_import
+
+import os
+import warnings
+
+import numpy as np
+import h5py
+
+from ..common import ut, TestCase
+
+
+class TestCatalog(TestCase):
+
+    def setUp(self):
+        self.fname = self.mktemp()
+        with h5py.File(self.fname, 'w') as f:
+            f.create_group('a/b')
+            f['a/x'] = np.zeros((3, 4), dtype='<f4')
+            f['a/b/y'] = np.zeros((2,), dtype=[('a', '<i4'), ('b', '<f8')])
+            f['s'] = h5py.SoftLink('/a')
+            f['dangling'] = h5py.SoftLink('/nowhere')
+            f['h'] = f['a']     # Second hard link to a group
+        with h5py.File(self.fname, 'r') as f:
+            self.index = h5py.index.build(f)
+        self.f = h5py.File(self.fname, 'r', index=self.index)
+
+    def test_default_path(self):
+        """ Catalogs are written next to the file by default """
+        self.assertEqual(self.index, self.fname + '.idx')
+        self.assertTrue(os.path.exists(self.index))
+
+    def test_in_use(self):
+        """ A matching catalog is used """
+        self.assertIsInstance(self.f.catalog, h5py.index.Catalog)
+
+    def test_contains(self):
+        """ Membership tests agree with HDF5 """
+        for name in ('a', 'a/x', '/a/b/y', 'a/b', 'nothing', 'a/nothing',
+                     'a/x/y', 's', 's/x', 'dangling', 'h/x', 'h/nothing'):
+            self.assertEqual(name in self.f, self.f.id.__contains__(name.encode('ascii')), name)
+        grp = self.f['a']
+        self.assertTrue('x' in grp)
+        self.assertTrue('b/y' in grp)
+        self.assertFalse('y' in grp)
+
+    def test_keys(self):
+        """ Listings agree with HDF5 """
+        self.assertEqual(list(self.f), ['a', 'dangling', 'h', 's'])
+        self.assertEqual(list(self.f['a']), ['b', 'x'])
+        self.assertEqual(len(self.f['a']), 2)
+        self.assertEqual(list(self.f['h']), ['b', 'x'])
+        self.assertEqual(list(self.f['a/b']), ['y'])
+
+    def test_no_gcpl(self):
+        """ Listings from the catalog don't read group creation properties """
+        grp = self.f['a']
+        self.assertEqual(list(grp), ['b', 'x'])
+        self.assertEqual(grp.keys(0, 1), ['b'])
+        self.assertIsNone(grp._track_order_flag)
+
+    def test_track_order(self):
+        """ Groups tracking creation order are listed in that order """
+        fname = self.mktemp()
+        with h5py.File(fname, 'w') as f:
+            grp = f.create_group('o', track_order=True)
+            for name in ('z', 'y', 'x'):
+                grp.create_group(name)
+        with h5py.File(fname, 'r') as f:
+            index = h5py.index.build(f)
+        with h5py.File(fname, 'r', index=index) as f:
+            self.assertEqual(list(f['o']), ['z', 'y', 'x'])
+            self.assertEqual(f['o'].keys(1, 3), ['y', 'x'])
+            self.assertEqual(list(f), ['o'])
+
+    def test_info(self):
+        """ Object metadata is available without HDF5 """
+        cat = self.f.catalog
+        x = cat.info(b'a/x')
+        self.assertEqual(x['type'], h5py.h5o.TYPE_DATASET)
+        self.assertEqual(x['shape'], (3, 4))
+        self.assertEqual(x['dtype'], np.dtype('<f4'))
+        self.assertEqual(x['addr'], h5py.h5o.get_info(self.f['a/x'].id).addr)
+        y = cat.info(b'a/b/y')
+        self.assertEqual(y['dtype'], np.dtype([('a', '<i4'), ('b', '<f8')]))
+        self.assertEqual(cat.info(b'a')['type'], h5py.h5o.TYPE_GROUP)
+        self.assertEqual(cat.info(b's')['link'], h5py.h5l.TYPE_SOFT)
+        self.assertIsNone(cat.info(b'missing'))
+
+    def test_stale(self):
+        """ Out-of-date catalogs are ignored with a warning """
+        self.f.close()
+        with h5py.File(self.fname, 'a') as f:
+            f['new'] = 1
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            self.f = h5py.File(self.fname, 'r', index=self.index)
+        self.assertEqual(len(w), 1)
+        self.assertIsNone(self.f.catalog)
+        self.assertTrue('new' in self.f)
+
+    def test_mode(self):
+        """ Catalogs require read-only mode """
+        with self.assertRaises(ValueError):
+            h5py.File(self.fname, 'a', index=self.index)
+        with h5py.File(self.fname, 'a') as f:
+            with self.assertRaises(ValueError):
+                h5py.index.build(f)
@@ -0,0 +1,159 @@
+# This file is part of h5py, a Python interface to the HDF5 library.
+#
+# http://www.h5py.org
+#
+# Copyright 2008-2013 Andrew Collette and contributors
+#
+# License:  Standard 3-clause BSD; see "license.txt" for full license terms
+#           and contributor agreement.
+
+"""
+    Tests the h5py.Dataset.as_mmap method.
+"""
+
+from __future__ import absolute_import
+
+import numpy as np
+import h5py
+
+from ..common import ut, TestCase
+
+
+class TestMmap(TestCase):
+
+    def test_contiguous(self):
+        """ Contiguous data maps to a read-only memmap with matching contents """
+        data = np.arange(100, dtype='f8').reshape((10, 10))
+        dset = self.f.create_dataset('x', data=data)
+        out = dset.as_mmap()
+        self.assertIsInstance(out, np.memmap)
+        self.assertArrayEqual(out, data)
+        self.assertFalse(out.flags.writeable)
+
+    def test_byteorder(self):
+        """ Byte order is taken from the file type """
+        data = np.arange(10, dtype='>i4')
+        dset = self.f.create_dataset('x', data=data)
+        out = dset.as_mmap()
+        self.assertEqual(out.dtype, np.dtype('>i4'))
+        self.assertArrayEqual(out, data)
+
+    def test_compound(self):
+        """ Packed compound types map directly """
+        dt = np.dtype([('a', 'i4'), ('b', 'f8')])
+        data = np.zeros((5,), dtype=dt)
+        data['a'] = np.arange(5)
+        dset = self.f.create_dataset('x', data=data)
+        self.assertArrayEqual(dset.as_mmap(), data)
+
+    def test_userblock(self):
+        """ Offsets account for the user block """
+        fname = self.mktemp()
+        data = np.arange(50, dtype='i8')
+        with h5py.File(fname, 'w', userblock_size=512) as f:
+            f.create_dataset('x', data=data)
+        with h5py.File(fname, 'r') as f:
+            self.assertArrayEqual(f['x'].as_mmap(), data)
+
+    def test_empty(self):
+        """ Zero-size datasets give an empty array """
+        dset = self.f.create_dataset('x', (0,), dtype='f')
+        self.assertEqual(dset.as_mmap().shape, (0,))
+
+    def test_unallocated(self):
+        """ Unallocated storage -> ValueError """
+        dset = self.f.create_dataset('x', (10,), dtype='f')
+        with self.assertRaises(ValueError):
+            dset.as_mmap()
+
+    def test_chunked(self):
+        """ Chunked data -> TypeError """
+        dset = self.f.create_dataset('x', data=np.arange(10), chunks=(5,))
+        with self.assertRaises(TypeError):
+            dset.as_mmap()
+
+    def test_compressed(self):
+        """ Compressed data -> TypeError """
+        dset = self.f.create_dataset('x', data=np.arange(10), compression='gzip')
+        with self.assertRaises(TypeError):
+            dset.as_mmap()
+
+    def test_vlen(self):
+        """ Variable-length types -> TypeError """
+        dt = h5py.special_dtype(vlen=bytes)
+        dset = self.f.create_dataset('x', (10,), dtype=dt)
+        dset[0] = b'hello'
+        with self.assertRaises(TypeError):
+            dset.as_mmap()
+
+    def test_core_driver(self):
+        """ Non-file drivers -> TypeError """
+        with h5py.File(self.mktemp(), 'w', driver='core', backing_store=False) as f:
+            dset = f.create_dataset('x', data=np.arange(10))
+            with self.assertRaises(TypeError):
+                dset.as_mmap()
+
+
+@ut.skipUnless(hasattr(h5py.h5d.DatasetID, 'get_chunk_info_by_coord'),
+               'HDF5 1.10.5+ required')
+class TestChunkMap(TestCase):
+
+    def setUp(self):
+        TestCase.setUp(self)
+        self.data = np.arange(300, dtype='i4').reshape((20, 15))
+        self.dset = self.f.create_dataset('x', data=self.data, chunks=(6, 4),
+                                          maxshape=(None, 15))
+
+    def test_full(self):
+        """ Ellipsis reads the whole dataset, including edge chunks """
+        cm = self.dset.mmap_chunks()
+        self.assertArrayEqual(cm[...], self.data)
+        self.assertArrayEqual(np.asarray(cm), self.data)
+        cm.close()
+
+    def test_slices(self):
+        """ Strided slices and integers assemble across chunks """
+        with self.dset.mmap_chunks() as cm:
+            self.assertArrayEqual(cm[3:17:3, 1:14:5], self.data[3:17:3, 1:14:5])
+            self.assertArrayEqual(cm[7], self.data[7])
+            self.assertArrayEqual(cm[:, -1], self.data[:, -1])
+            self.assertEqual(cm[19, 14], self.data[19, 14])
+            self.assertEqual(cm[5:5].shape, (0, 15))
+
+    def test_fancy(self):
+        """ Unsupported selections fall back to the dataset """
+        with self.dset.mmap_chunks() as cm:
+            self.assertArrayEqual(cm[[1, 4, 9]], self.data[[1, 4, 9]])
+
+    def test_unallocated(self):
+        """ Unallocated chunks read as the fill value """
+        dset = self.f.create_dataset('y', (10, 10), dtype='f', chunks=(5, 5),
+                                     fillvalue=42)
+        dset[0:5, 0:5] = 1
+        with dset.mmap_chunks() as cm:
+            out = cm[...]
+        self.assertTrue(np.all(out[0:5, 0:5] == 1))
+        self.assertTrue(np.all(out[5:, :] == 42))
+
+    def test_filtered(self):
+        """ Compressed chunks are read through HDF5 """
+        dset = self.f.create_dataset('z', data=self.data, chunks=(6, 4),
+                                     compression='gzip')
+        with dset.mmap_chunks() as cm:
+            self.assertArrayEqual(cm[2:11, 3:9], self.data[2:11, 3:9])
+
+    def test_userblock(self):
+        """ Chunk addresses account for the user block """
+        fname = self.mktemp()
+        with h5py.File(fname, 'w', userblock_size=512) as f:
+            f.create_dataset('x', data=self.data, chunks=(6, 4))
+        with h5py.File(fname, 'r') as f:
+            with f['x'].mmap_chunks() as cm:
+                self.assertArrayEqual(cm[...], self.data)
+                self.assertArrayEqual(cm[3:17:3, 1:14:5], self.data[3:17:3, 1:14:5])
+
+    def test_contiguous(self):
+        """ Contiguous data -> TypeError """
+        dset = self.f.create_dataset('c', data=np.arange(10))
+        with self.assertRaises(TypeError):
+            dset.mmap_chunks()
@@ -24,3 +24,56 @@ class TestItems(TestCase):
         """ no dimension scales -> empty list """
         dset = self.f.create_dataset('x', (10,))
         self.assertEqual(dset.dims[0].items(), [])
+
+
+class TestScaleCache(TestCase):
+
+    """
+        Scale attachments are cached per file and kept up to date
+    """
+
+    def setUp(self):
+        TestCase.setUp(self)
+        self.dset = self.f.create_dataset('data', (4, 3))
+        self.x = self.f.create_dataset('x', (3,))
+        self.dset.dims.create_scale(self.x, b'x name')
+        self.dset.dims[1].attach_scale(self.x)
+
+    def test_other_handle(self):
+        """ Changes through one Dataset are seen through another """
+        other = self.f['data']
+        self.assertEqual(other.dims[1].keys(), ['x name'])
+        self.dset.dims[1].detach_scale(self.x)
+        self.assertEqual(len(other.dims[1]), 0)
+
+    def test_rename(self):
+        """ Renaming a scale is seen by keys() """
+        self.assertEqual(self.dset.dims[1].keys(), ['x name'])
+        self.dset.dims.create_scale(self.x, b'new name')
+        self.assertEqual(self.dset.dims[1].keys(), ['new name'])
+
+    def test_move(self):
+        """ Scales are found after their links move """
+        self.assertEqual(self.dset.dims[1][0].name, '/x')
+        self.f.move('x', 'y')
+        self.assertEqual(self.dset.dims[1][0].name, '/y')
+
+
+class TestDimensionMap(TestCase):
+
+    def test_map(self):
+        """ File.dimension_map lists scales of every dataset """
+        dset = self.f.create_dataset('g/data', (4, 3))
+        self.f.create_dataset('plain', (2,))
+        x1 = self.f.create_dataset('x1', (3,))
+        x2 = self.f.create_dataset('x2', (3,))
+        for scale in (x1, x2):
+            dset.dims.create_scale(scale)
+            dset.dims[1].attach_scale(scale)
+        self.assertEqual(self.f.dimension_map(),
+                         {'/g/data': [[], ['/x1', '/x2']]})
+
+    def test_empty(self):
+        """ No scales, empty map """
+        self.f.create_dataset('x', (3,))
+        self.assertEqual(self.f.dimension_map(), {})
@@ -13,6 +13,10 @@
 
 from __future__ import absolute_import
 
+import io
+import os
+
+import numpy as np
 import h5py
 
 from ..common import ut, TestCase
@@ -67,3 +71,421 @@ class TestDealloc(TestCase):
         
         self.assertEqual(nfiles(), start_nfiles)
         self.assertEqual(ngroups(), start_ngroups)
+
+
+@ut.skipUnless(hasattr(h5py.h5f.FileID, 'get_file_image'), 'HDF5 1.8.9+ required')
+class TestFileImage(TestCase):
+
+    """
+        Opening files from, and serializing them to, in-memory images.
+    """
+
+    def make_image(self):
+        with h5py.File(self.mktemp(), 'w') as f:
+            f['x'] = list(range(10))
+            f.attrs['a'] = 42
+            return f.to_bytes()
+
+    def test_roundtrip(self):
+        """ to_bytes() output can be reopened with from_bytes() """
+        image = self.make_image()
+        self.assertIsInstance(image, bytes)
+        with h5py.File.from_bytes(image) as f:
+            self.assertEqual(list(f['x'][...]), list(range(10)))
+            self.assertEqual(f.attrs['a'], 42)
+            self.assertEqual(f.mode, 'r')
+            self.assertEqual(f.driver, 'core')
+
+    def test_core(self):
+        """ Purely in-memory files can be serialized """
+        with h5py.File(self.mktemp(), 'w', driver='core', backing_store=False) as f:
+            f['x'] = 1
+            image = f.to_bytes()
+        with h5py.File.from_bytes(image) as f:
+            self.assertEqual(f['x'][()], 1)
+
+    def test_buffer(self):
+        """ Any buffer-protocol object is accepted """
+        image = bytearray(self.make_image())
+        with h5py.File.from_bytes(image) as f:
+            self.assertIn('x', f)
+
+    def test_many(self):
+        """ Several images may be open at once """
+        image = self.make_image()
+        f1 = h5py.File.from_bytes(image, 'r+')
+        f2 = h5py.File.from_bytes(image)
+        try:
+            f1['y'] = 1
+            self.assertIn('y', f1)
+            self.assertNotIn('y', f2)
+        finally:
+            f1.close()
+            f2.close()
+
+    def test_modify(self):
+        """ Changes in r+ mode show up in the new image only """
+        image = self.make_image()
+        with h5py.File.from_bytes(image, 'r+') as f:
+            f['y'] = 1
+            newimage = f.to_bytes()
+        with h5py.File.from_bytes(newimage) as f:
+            self.assertIn('y', f)
+        with h5py.File.from_bytes(image) as f:
+            self.assertNotIn('y', f)
+
+    def test_mode(self):
+        """ Creation modes -> ValueError """
+        with self.assertRaises(ValueError):
+            h5py.File.from_bytes(self.make_image(), 'w')
+
+    def test_garbage(self):
+        """ Non-HDF5 data -> IOError """
+        with self.assertRaises(IOError):
+            h5py.File.from_bytes(b'not an hdf5 file' * 100)
+
+
+class TestFileObj(TestCase):
+
+    """
+        Files backed by Python file-like objects and buffers.
+    """
+
+    def test_bytesio(self):
+        """ Write to and read back from a BytesIO object """
+        bio = io.BytesIO()
+        with h5py.File(bio, 'w') as f:
+            self.assertEqual(f.driver, 'fileobj')
+            f['x'] = np.arange(1000)
+            f.attrs['a'] = 42
+        self.assertTrue(len(bio.getvalue()) > 0)
+        with h5py.File(bio, 'r') as f:
+            self.assertArrayEqual(f['x'][...], np.arange(1000))
+            self.assertEqual(f.attrs['a'], 42)
+
+    def test_disk_file(self):
+        """ Regular Python file objects work, and match the file on disk """
+        fname = self.mktemp()
+        with h5py.File(fname, 'w') as f:
+            f['x'] = np.arange(100)
+        with open(fname, 'rb') as fobj:
+            with h5py.File(fobj, 'r') as f:
+                self.assertArrayEqual(f['x'][...], np.arange(100))
+
+    def test_bytes(self):
+        """ Read-only buffers open read-only """
+        bio = io.BytesIO()
+        with h5py.File(bio, 'w') as f:
+            f['x'] = 42
+        buf = bio.getvalue()
+        with h5py.File(buf, 'r') as f:
+            self.assertEqual(f['x'][()], 42)
+        with self.assertRaises(IOError):
+            h5py.File(buf, 'r+')
+
+    def test_bytes_userblock(self):
+        """ Byte strings with a user block are also recognized as files """
+        bio = io.BytesIO()
+        with h5py.File(bio, 'w', userblock_size=512) as f:
+            f['x'] = 42
+        with h5py.File(bio.getvalue(), 'r') as f:
+            self.assertEqual(f['x'][()], 42)
+
+    def test_bytearray(self):
+        """ Writable buffers can be modified in place """
+        bio = io.BytesIO()
+        with h5py.File(bio, 'w') as f:
+            f['x'] = np.zeros((10,), dtype='i4')
+        buf = bytearray(bio.getvalue())
+        with h5py.File(buf, 'r+') as f:
+            f['x'][...] = np.arange(10)
+        with h5py.File(bytes(buf), 'r') as f:
+            self.assertArrayEqual(f['x'][...], np.arange(10))
+
+    def test_exclusive(self):
+        """ Mode 'w-' refuses to overwrite a non-empty object """
+        bio = io.BytesIO()
+        with h5py.File(bio, 'w-') as f:
+            f['x'] = 42
+        data = bio.getvalue()
+        with self.assertRaises(IOError):
+            h5py.File(bio, 'w-')
+        self.assertEqual(bio.getvalue(), data)
+        with self.assertRaises(IOError):
+            h5py.File(bytearray(data), 'w-')
+
+    def test_no_readahead(self):
+        """ Read-ahead can be disabled """
+        bio = io.BytesIO()
+        with h5py.File(bio, 'w', page_size=0) as f:
+            f['x'] = np.arange(10)
+        with h5py.File(bio, 'r', page_size=0) as f:
+            self.assertArrayEqual(f['x'][...], np.arange(10))
+
+    def test_wrong_driver(self):
+        """ File objects with another driver -> ValueError """
+        with self.assertRaises(ValueError):
+            h5py.File(io.BytesIO(), 'w', driver='core')
+
+    def test_exception(self):
+        """ Exceptions raised by the file object propagate """
+        class BadFile(io.BytesIO):
+            def readinto(self, buf):
+                raise ZeroDivisionError
+        with self.assertRaises(ZeroDivisionError):
+            h5py.File(BadFile(b'x'*4096), 'r')
+
+
+class TestPageCache(TestCase):
+
+    """
+        Named files read through the fileobj driver's page cache.
+    """
+
+    def make_file(self):
+        fname = self.mktemp()
+        with h5py.File(fname, 'w') as f:
+            for idx in range(50):
+                f.create_dataset('x%d' % idx, data=np.arange(100), chunks=(10,))
+        return fname
+
+    def test_read(self):
+        """ Reads are coalesced, and statistics reported """
+        fname = self.make_file()
+        with h5py.File(fname, 'r', page_size=4096, readahead=256*1024) as f:
+            self.assertEqual(f.driver, 'fileobj')
+            for idx in range(50):
+                self.assertArrayEqual(f['x%d' % idx][...], np.arange(100))
+            stats = f.io_stats()
+        self.assertTrue(stats['cache_hits'] > 0)
+        self.assertTrue(stats['read_calls'] < stats['requests'])
+        self.assertTrue(stats['bytes_read'] > 0)
+
+    def test_readahead_eof(self):
+        """ Read-ahead stops at the end of the file """
+        fname = self.make_file()
+        with h5py.File(fname, 'r', page_size=4096, readahead=2**24) as f:
+            for idx in range(50):
+                f['x%d' % idx][...]
+            stats = f.io_stats()
+        self.assertTrue(stats['bytes_read'] <= os.path.getsize(fname))
+
+    def test_write(self):
+        """ Files can be created and modified through the cache """
+        fname = self.mktemp()
+        with h5py.File(fname, 'w', page_size=4096) as f:
+            f['x'] = np.arange(10)
+        with h5py.File(fname, 'r+', page_size=4096) as f:
+            f['x'][0] = 42
+            self.assertEqual(f['x'][0], 42)
+            self.assertTrue(f.io_stats()['write_calls'] > 0)
+        with h5py.File(fname, 'r') as f:
+            self.assertEqual(f['x'][0], 42)
+
+    def test_close(self):
+        """ The file object is closed with the file, and not before """
+        fname = self.mktemp()
+        with h5py.File(fname, 'w', page_size=4096) as f:
+            fobj = h5py.h5fd.get_fileobj_io(f.id).fileobj
+            self.assertFalse(fobj.closed)
+            f['x'] = np.arange(10)
+        self.assertTrue(fobj.closed)
+
+    def test_exclusive(self):
+        """ Mode w- refuses to clobber existing files """
+        fname = self.make_file()
+        with self.assertRaises(IOError):
+            h5py.File(fname, 'w-', readahead=65536)
+
+    def test_explicit_driver(self):
+        """ Cache keywords with an explicit sec2 driver -> ValueError """
+        with self.assertRaises(ValueError):
+            h5py.File(self.mktemp(), 'w', driver='sec2', page_size=4096)
+
+    def test_no_stats(self):
+        """ Files using other drivers have no statistics """
+        self.assertIsNone(self.f.io_stats())
+
+
+class TestProfile(TestCase):
+
+    """
+        Feature: File-space profiles and alignment settings
+    """
+
+    def test_profile(self):
+        """ Profiles set alignment and block sizes """
+        fname = self.mktemp()
+        with h5py.File(fname, 'w', profile='striped-fs') as f:
+            fapl = f.id.get_access_plist()
+            self.assertEqual(fapl.get_alignment(), (512*1024, 1024*1024))
+            self.assertEqual(fapl.get_sieve_buf_size(), 1024*1024)
+            self.assertEqual(fapl.get_meta_block_size(), 1024*1024)
+            self.assertEqual(fapl.get_small_data_block_size(), 1024*1024)
+
+    def test_override(self):
+        """ Explicit keywords override the profile """
+        fname = self.mktemp()
+        with h5py.File(fname, 'w', profile='local', alignment=(1, 8192),
+                       sieve_buf_size=4096) as f:
+            fapl = f.id.get_access_plist()
+            self.assertEqual(fapl.get_alignment(), (1, 8192))
+            self.assertEqual(fapl.get_sieve_buf_size(), 4096)
+            self.assertEqual(fapl.get_meta_block_size(), 64*1024)
+
+    def test_aligned(self):
+        """ Allocations above the threshold start at aligned addresses """
+        fname = self.mktemp()
+        with h5py.File(fname, 'w', alignment=(4096, 65536)) as f:
+            for name in ('a', 'b', 'c'):
+                dset = f.create_dataset(name, data=np.ones((16384,), dtype='f4'))
+                self.assertEqual(dset.id.get_offset() % 65536, 0)
+
+    def test_unknown(self):
+        """ Unknown profile names raise ValueError """
+        with self.assertRaises(ValueError):
+            h5py.File(self.mktemp(), 'w', profile='nonexistent')
+
+    def test_bad_alignment(self):
+        """ Alignment must be a 2-tuple """
+        with self.assertRaises(ValueError):
+            h5py.File(self.mktemp(), 'w', alignment=4096)
+
+
+class TestFamily(TestCase):
+
+    """
+        Feature: Family driver, member size detection and threaded I/O
+    """
+
+    def make_family(self, **kwds):
+        """ Create a 4 KiB-member family holding ~40 KiB of data """
+        fname = self.mktemp(suffix='-%d.hdf5')
+        with h5py.File(fname, 'w', driver='family', memb_size=4096, **kwds) as f:
+            f['x'] = np.arange(10000, dtype='i4')
+        return fname
+
+    def test_memb_size(self):
+        """ Existing families open without specifying memb_size """
+        fname = self.make_family()
+        with h5py.File(fname, 'r', driver='family') as f:
+            self.assertEqual(f.driver, 'family')
+            self.assertArrayEqual(f['x'][...], np.arange(10000))
+            self.assertEqual(f.id.get_access_plist().get_fapl_family()[0], 4096)
+
+    def test_memb_size_single(self):
+        """ Member size is read from the superblock of one-member families """
+        fname = self.mktemp(suffix='-%d.hdf5')
+        with h5py.File(fname, 'w', driver='family', memb_size=1024*1024) as f:
+            f['x'] = 42
+        with h5py.File(fname, 'r', driver='family') as f:
+            self.assertEqual(f['x'][()], 42)
+
+    def test_threads_read(self):
+        """ Families written with threads can be read with threads """
+        fname = self.make_family(threads=4)
+        with h5py.File(fname, 'r', driver='family', threads=4) as f:
+            self.assertEqual(f.driver, 'family')
+            self.assertEqual(f.id.get_access_plist().get_driver(), h5py.h5fd.PYFAMILY)
+            self.assertArrayEqual(f['x'][...], np.arange(10000))
+            self.assertTrue(f.io_stats()['bytes_read'] > 0)
+
+    def test_threads_hdf5_family(self):
+        """ Families written by HDF5 can be read with threads """
+        fname = self.make_family()
+        with h5py.File(fname, 'r', driver='family', threads=4) as f:
+            self.assertEqual(f.driver, 'family')
+            self.assertEqual(f.id.get_access_plist().get_driver(), h5py.h5fd.PYFAMILY_NCSA)
+            self.assertArrayEqual(f['x'][...], np.arange(10000))
+            self.assertTrue(f.io_stats()['bytes_read'] > 0)
+
+    def test_ncsa_driver_name(self):
+        """ HDF5 only opens its own families with a driver named "family" """
+        from h5py._hl.family import FamilyFile
+        fname = self.make_family()
+        fapl = h5py.h5p.create(h5py.h5p.FILE_ACCESS)
+        fapl.set_fileobj_driver(h5py.h5fd.PYFAMILY, FamilyFile(fname), close=True)
+        with self.assertRaises(IOError):
+            h5py.h5f.open(fname.encode('utf8'), h5py.h5f.ACC_RDONLY, fapl=fapl)
+
+    def test_threads_write(self):
+        """ Families written with threads can be read by HDF5 """
+        fname = self.make_family(threads=4)
+        with h5py.File(fname, 'r+', driver='family', threads=4) as f:
+            f['x'][0] = -1
+        with h5py.File(fname, 'r', driver='family', memb_size=4096) as f:
+            self.assertEqual(f['x'][0], -1)
+            self.assertArrayEqual(f['x'][1:], np.arange(1, 10000))
+
+    def test_family_members(self):
+        """ family_members() lists member files and their sizes """
+        fname = self.make_family()
+        with h5py.File(fname, 'r', driver='family') as f:
+            members = f.family_members()
+        self.assertTrue(len(members) >= 10)
+        self.assertEqual(members[0][0], fname % 0)
+        for name, size in members[:-1]:
+            self.assertEqual(size, 4096)
+        self.assertTrue(0 < members[-1][1] <= 4096)
+
+    def test_not_family(self):
+        """ family_members() and io_stats() are None where not applicable """
+        self.assertIsNone(self.f.family_members())
+        fname = self.make_family()
+        with h5py.File(fname, 'r', driver='family') as f:
+            self.assertIsNone(f.io_stats())
+
+
+class TestSplit(TestCase):
+
+    """
+        Feature: Split and multi drivers
+    """
+
+    def test_split(self):
+        """ Metadata and raw data go to separate files """
+        fname = self.mktemp(suffix='')
+        with h5py.File(fname, 'w', driver='split') as f:
+            f['x'] = np.arange(100000)
+            self.assertEqual(f.driver, 'multi')
+        self.assertTrue(os.path.getsize(fname + '-r.h5') >= 800000)
+        self.assertTrue(os.path.getsize(fname + '-m.h5') < 100000)
+        with h5py.File(fname, 'r', driver='split') as f:
+            self.assertArrayEqual(f['x'][...], np.arange(100000))
+
+    def test_split_template(self):
+        """ Extensions containing %s are name templates """
+        fname = self.mktemp(suffix='')
+        with h5py.File(fname, 'w', driver='split', meta_ext=u'%s.meta',
+                       raw_ext=u'%s.raw') as f:
+            f['x'] = 42
+        self.assertTrue(os.path.exists(fname + '.meta'))
+        self.assertTrue(os.path.exists(fname + '.raw'))
+
+    def test_fapl_multi(self):
+        """ Split settings are visible through get_fapl_multi """
+        fapl = h5py.h5p.create(h5py.h5p.FILE_ACCESS)
+        fapl.set_fapl_split(b'.meta', None, b'.raw', None)
+        memb_map, memb_fapl, memb_name, memb_addr, relax = fapl.get_fapl_multi()
+        self.assertEqual(len(memb_map), h5py.h5fd.MEM_NTYPES)
+        self.assertEqual(memb_map[h5py.h5fd.MEM_DRAW], h5py.h5fd.MEM_DRAW)
+        self.assertEqual(memb_map[h5py.h5fd.MEM_BTREE], h5py.h5fd.MEM_SUPER)
+        self.assertEqual(memb_name[h5py.h5fd.MEM_DRAW], b'%s.raw')
+
+    def test_multi(self):
+        """ The multi driver accepts member lists """
+        fname = self.mktemp(suffix='')
+        n = h5py.h5fd.MEM_NTYPES
+        memb_map = [h5py.h5fd.MEM_SUPER]*n
+        memb_map[h5py.h5fd.MEM_DRAW] = h5py.h5fd.MEM_DRAW
+        memb_name = ['%s-s.h5']*n
+        memb_name[h5py.h5fd.MEM_DRAW] = '%s-d.h5'
+        memb_addr = [0]*n
+        memb_addr[h5py.h5fd.MEM_DRAW] = 2**62
+        kwds = dict(memb_map=memb_map, memb_fapl=[None]*n,
+                    memb_name=memb_name, memb_addr=memb_addr)
+        with h5py.File(fname, 'w', driver='multi', **kwds) as f:
+            f['x'] = np.arange(10)
+        self.assertTrue(os.path.exists(fname + '-d.h5'))
+        with h5py.File(fname, 'r', driver='multi', **kwds) as f:
+            self.assertArrayEqual(f['x'][...], np.arange(10))
@@ -0,0 +1,174 @@
+# This file is part of h5py, a Python interface to the HDF5 library.
+#
+# http://www.h5py.org
+#
+# Copyright 2008-2013 Andrew Collette and contributors
+#
+# License:  Standard 3-clause BSD; see "license.txt" for full license terms
+#           and contributor agreement.
+
+"""
+    Tests the Group.index, Group.walk and Group.links_info methods.
+"""
+
+from __future__ import absolute_import
+
+import numpy as np
+import h5py
+
+from ..common import ut, TestCase
+
+
+class TestIndex(TestCase):
+
+    def setUp(self):
+        TestCase.setUp(self)
+        self.f.create_group('a/b/c')
+        self.f.create_dataset('a/x', data=np.zeros((4, 5), dtype='i2'))
+        self.f.create_dataset('a/b/y', (100,), dtype='f8', chunks=(10,))
+        self.f['a/b/y'][...] = 1
+        self.f['a/b/y'].attrs['units'] = 'm'
+        self.f['a'].attrs['one'] = 1
+        self.f['a'].attrs['two'] = 2
+        self.f['t'] = np.dtype('f4')
+
+    def by_path(self, arr):
+        return dict((row['path'], row) for row in arr)
+
+    def test_all(self):
+        """ Every object appears once, with its metadata """
+        rows = self.by_path(self.f.index())
+        self.assertEqual(set(rows), set(['a', 'a/b', 'a/b/c', 'a/x', 'a/b/y', 't']))
+
+        x = rows['a/x']
+        self.assertEqual(x['type'], h5py.h5o.TYPE_DATASET)
+        self.assertEqual(x['ndim'], 2)
+        self.assertEqual(tuple(x['shape']), (4, 5))
+        self.assertEqual(h5py.h5o.index_dtype(x['dtype']), np.dtype('i2'))
+        self.assertEqual(tuple(x['chunks']), (0, 0))
+
+        y = rows['a/b/y']
+        self.assertEqual(y['ndim'], 1)
+        self.assertEqual(tuple(y['shape']), (100, 0))
+        self.assertEqual(tuple(y['chunks']), (10, 0))
+        self.assertEqual(y['storage_size'], 800)
+        self.assertEqual(y['num_attrs'], 1)
+
+        a = rows['a']
+        self.assertEqual(a['type'], h5py.h5o.TYPE_GROUP)
+        self.assertEqual(a['ndim'], -1)
+        self.assertEqual(a['dtype'], b'')
+        self.assertEqual(a['num_attrs'], 2)
+        self.assertEqual(rows['t']['type'], h5py.h5o.TYPE_NAMED_DATATYPE)
+
+    def test_addr(self):
+        """ Addresses match those from h5o """
+        rows = self.by_path(self.f.index())
+        info = h5py.h5o.get_info(self.f['a/x'].id)
+        self.assertEqual(rows['a/x']['addr'], info.addr)
+
+    def test_types(self):
+        """ Results can be filtered by type """
+        arr = self.f.index(types='dataset')
+        self.assertEqual(sorted(arr['path']), ['a/b/y', 'a/x'])
+        arr = self.f.index(types=['group', 'datatype'])
+        self.assertEqual(sorted(arr['path']), ['a', 'a/b', 'a/b/c', 't'])
+        with self.assertRaises(ValueError):
+            self.f.index(types='link')
+
+    def test_depth(self):
+        """ Results can be limited by depth """
+        self.assertEqual(sorted(self.f.index(max_depth=1)['path']), ['a', 't'])
+        self.assertEqual(sorted(self.f.index(max_depth=2)['path']),
+                         ['a', 'a/b', 'a/x', 't'])
+
+    def test_depth_first_path(self):
+        """ With a depth limit, objects appear under a path within it """
+        self.f['q'] = self.f['a/b/c']
+        rows = self.by_path(self.f.index(max_depth=1))
+        self.assertEqual(set(rows), set(['a', 'q', 't']))
+        self.assertEqual(rows['q']['addr'], h5py.h5o.get_info(self.f['q'].id).addr)
+
+    def test_compact(self):
+        """ Columns are fixed-width """
+        arr = self.f.index()
+        self.assertEqual(arr.dtype.names, h5py.h5o.INDEX_FIELDS)
+        self.assertFalse(arr.dtype.hasobject)
+
+    def test_compound_dtype(self):
+        """ Compound types survive the dtype encoding """
+        dt = np.dtype([('a', 'i4'), ('b', 'f8')])
+        self.f.create_dataset('cmp', (2,), dtype=dt)
+        rows = self.by_path(self.f.index(types='dataset'))
+        self.assertEqual(h5py.h5o.index_dtype(rows['cmp']['dtype']), dt)
+
+    def test_subgroup(self):
+        """ Paths are relative to the group """
+        arr = self.f['a/b'].index()
+        self.assertEqual(sorted(arr['path']), ['c', 'y'])
+
+    def test_hardlinks(self):
+        """ Objects with several links are listed once """
+        self.f['z'] = self.f['a/x']
+        arr = self.f.index(types='dataset')
+        self.assertEqual(len(arr), 2)
+
+    def test_walk(self):
+        """ walk() yields (path, record) pairs """
+        out = dict(self.f.walk(types='dataset'))
+        self.assertEqual(set(out), set(['a/x', 'a/b/y']))
+        self.assertEqual(tuple(out['a/x']['shape']), (4, 5))
+
+    def test_empty(self):
+        """ Empty groups give an empty array """
+        grp = self.f.create_group('empty')
+        arr = grp.index()
+        self.assertEqual(len(arr), 0)
+        self.assertEqual(arr.dtype.names, h5py.h5o.INDEX_FIELDS)
+
+
+class TestLinksInfo(TestCase):
+
+    def setUp(self):
+        TestCase.setUp(self)
+        self.f.create_group('g')
+        self.f.create_dataset('d', (10,), dtype='i4')
+        self.f['t'] = np.dtype('f4')
+        self.f['hard'] = self.f['g']
+        self.f['soft'] = h5py.SoftLink('/d')
+        self.f['ext'] = h5py.ExternalLink('missing.hdf5', '/')
+
+    def test_links(self):
+        """ One row per link, with link and object types """
+        arr = self.f.links_info()
+        self.assertEqual(sorted(arr['name']), sorted(self.f))
+        rows = dict((row['name'], row) for row in arr)
+        self.assertEqual(rows['g']['type'], h5py.h5l.TYPE_HARD)
+        self.assertEqual(rows['g']['obj_type'], h5py.h5o.TYPE_GROUP)
+        self.assertEqual(rows['d']['obj_type'], h5py.h5o.TYPE_DATASET)
+        self.assertEqual(rows['t']['obj_type'], h5py.h5o.TYPE_NAMED_DATATYPE)
+        self.assertEqual(rows['hard']['addr'], rows['g']['addr'])
+        self.assertEqual(rows['soft']['type'], h5py.h5l.TYPE_SOFT)
+        self.assertEqual(rows['soft']['obj_type'], -1)
+        self.assertEqual(rows['ext']['type'], h5py.h5l.TYPE_EXTERNAL)
+        self.assertEqual(rows['ext']['addr'], 0)
+        self.assertEqual(rows['d']['corder'], -1)
+
+    def test_no_objtypes(self):
+        """ objtypes=False leaves object types out """
+        arr = self.f.links_info(objtypes=False)
+        self.assertTrue((arr['obj_type'] == -1).all())
+
+    def test_track_order(self):
+        """ Ordered groups give rows in creation order """
+        grp = self.f.create_group('ordered', track_order=True)
+        for name in ('z', 'y', 'x'):
+            grp.create_group(name)
+        arr = grp.links_info()
+        self.assertEqual(list(arr['name']), ['z', 'y', 'x'])
+        self.assertEqual(list(arr['corder']), [0, 1, 2])
+
+    def test_empty(self):
+        """ Empty groups give an empty array """
+        arr = self.f['g'].links_info()
+        self.assertEqual(len(arr), 0)
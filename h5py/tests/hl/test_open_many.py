@@ -0,0 +1,69 @@
+# This file is part of h5py, a Python interface to the HDF5 library.
+#
+# http://www.h5py.org
+#
+# Copyright 2008-2013 Andrew Collette and contributors
+#
+# License:  Standard 3-clause BSD; see "license.txt" for full license terms
+#           and contributor agreement.
+
+"""
+    Tests the Group.open_many method.
+"""
+
+from __future__ import absolute_import
+
+import numpy as np
+import h5py
+
+from ..common import ut, TestCase
+
+
+class TestOpenMany(TestCase):
+
+    def setUp(self):
+        TestCase.setUp(self)
+        for gidx in range(3):
+            for didx in range(3):
+                self.f.create_dataset('g%d/d%d' % (gidx, didx), data=np.arange(didx+1),
+                                      compression='gzip')
+        self.f['t'] = np.dtype('i8')
+
+    def test_order(self):
+        """ Objects come back in the order requested """
+        paths = ['g2/d0', 'g0/d2', 'g1', '/g0/d1', 't', 'g2/d2']
+        objs = self.f.open_many(paths)
+        self.assertEqual([x.name for x in objs],
+                         ['/g2/d0', '/g0/d2', '/g1', '/g0/d1', '/t', '/g2/d2'])
+        self.assertIsInstance(objs[0], h5py.Dataset)
+        self.assertIsInstance(objs[2], h5py.Group)
+        self.assertIsInstance(objs[4], h5py.Datatype)
+
+    def test_relative(self):
+        """ Paths are relative to the group """
+        objs = self.f['g1'].open_many(['d0', 'd1'])
+        self.assertEqual([x.name for x in objs], ['/g1/d0', '/g1/d1'])
+
+    def test_lazy_meta(self):
+        """ Lazily-opened datasets read their metadata on demand """
+        dset, = self.f.open_many(['g0/d2'])
+        self.assertIsNone(dset._dcpl_obj)
+        self.assertEqual(dset.compression, 'gzip')
+        self.assertArrayEqual(dset[...], np.arange(3))
+        dset, = self.f.open_many(['g0/d2'], lazy_meta=False)
+        self.assertIsNotNone(dset._dcpl_obj)
+
+    def test_missing(self):
+        """ Missing paths raise KeyError """
+        with self.assertRaises(KeyError):
+            self.f.open_many(['g0/d0', 'g0/missing'])
+        with self.assertRaises(KeyError):
+            self.f.open_many(['missing/d0'])
+
+    def test_nested(self):
+        """ Paths sharing deeper prefixes """
+        self.f.create_dataset('a/b/c/x', data=1)
+        self.f.create_dataset('a/b/d/y', data=2)
+        self.f.create_dataset('a/z', data=3)
+        objs = self.f.open_many(['a/b/c/x', 'a/b/d/y', 'a/z', '/a/b/c/x'])
+        self.assertEqual([x[()] for x in objs], [1, 2, 3, 1])
@@ -25,7 +25,7 @@ import collections
 from .common import TestCase, ut
 
 from h5py.highlevel import File
-from h5py import h5a,  h5t
+from h5py import h5a, h5s, h5t
 from h5py.highlevel import AttributeManager
 
 
@@ -165,3 +165,157 @@ class TestVlen(BaseAttrs):
             dtype=h5t.special_dtype(vlen=int))
         self.f.attrs['a'] = a
         self.assertArrayEqual(self.f.attrs['a'][0], a[0])
+
+
+class TestReadAll(BaseAttrs):
+
+    """
+        Feature: All attributes can be read at once
+    """
+
+    def test_read_all(self):
+        """ read_all() gives the same values as item access """
+        self.f.attrs['int'] = 42
+        self.f.attrs['arr'] = np.arange(6).reshape((2, 3))
+        self.f.attrs['str'] = b'hello'
+        self.f.attrs['vlen'] = np.array([b'a', b'bc'],
+                                        dtype=h5t.special_dtype(vlen=bytes))
+        self.f.attrs.create('sub', np.ones((2, 3)), dtype='(3,)f4')
+        self.f.attrs['int2'] = 7
+        out = self.f.attrs.read_all()
+        self.assertEqual(sorted(out), sorted(self.f.attrs))
+        for name in self.f.attrs:
+            expected = self.f.attrs[name]
+            if isinstance(expected, np.ndarray):
+                self.assertArrayEqual(out[name], expected)
+                self.assertEqual(out[name].dtype, expected.dtype)
+            else:
+                self.assertEqual(out[name], expected)
+
+    def test_empty_attr(self):
+        """ Attributes with a null dataspace are left out """
+        self.f.attrs['a'] = 1
+        h5a.create(self.f.id, b'empty', h5t.STD_I32LE, h5s.create(h5s.NULL))
+        self.assertEqual(list(self.f.attrs.read_all()), ['a'])
+
+    def test_no_attrs(self):
+        """ Objects without attributes give an empty dict """
+        self.assertEqual(self.f.attrs.read_all(), {})
+
+    def test_recursive(self):
+        """ Group.read_attrs_recursive reads attributes of many objects """
+        grp = self.f.create_group('g')
+        grp.attrs['x'] = 1
+        dset = grp.create_dataset('d', (2,))
+        dset.attrs['y'] = 2.0
+        out = self.f.read_attrs_recursive(['g', 'g/d'])
+        self.assertEqual(out, {'g': {'x': 1}, 'g/d': {'y': 2.0}})
+        out = self.f.read_attrs_recursive()
+        self.assertEqual(sorted(out), ['g', 'g/d'])
+        with self.assertRaises(KeyError):
+            self.f.read_attrs_recursive(['missing'])
+
+
+class TestOverwrite(BaseAttrs):
+
+    """
+        Feature: Attributes of unchanged type and shape are written in place
+    """
+
+    def test_in_place(self):
+        """ Overwriting with the same type and shape keeps the attribute """
+        self.f.attrs['a'] = np.arange(3)
+        attr = h5a.open(self.f.id, b'a')
+        self.f.attrs['a'] = np.arange(3) + 10
+        self.assertArrayEqual(self.f.attrs['a'], np.arange(3) + 10)
+        # An identifier opened before the write sees the new value
+        out = np.zeros((3,), dtype=attr.dtype)
+        attr.read(out)
+        self.assertArrayEqual(out, np.arange(3) + 10)
+
+    def test_changed_shape(self):
+        """ Changing the shape replaces the attribute """
+        self.f.attrs['a'] = np.arange(3)
+        self.f.attrs['a'] = np.arange(5)
+        self.assertArrayEqual(self.f.attrs['a'], np.arange(5))
+
+    def test_changed_type(self):
+        """ Changing the type replaces the attribute """
+        self.f.attrs['a'] = np.int32(1)
+        self.f.attrs['a'] = np.float64(1.5)
+        self.assertEqual(self.f.attrs['a'], 1.5)
+        self.assertEqual(self.f.attrs['a'].dtype, np.dtype('f8'))
+        self.f.attrs['s'] = b'abc'
+        self.f.attrs['s'] = b'abcdef'
+        self.assertEqual(self.f.attrs['s'], b'abcdef')
+
+    def test_header_size(self):
+        """ Repeated updates don't grow the object header """
+        self.f.attrs['counter'] = 0
+        size = self.f.id.get_filesize()
+        for idx in range(100):
+            self.f.attrs['counter'] = idx
+        self.f.flush()
+        self.assertEqual(self.f.attrs['counter'], 99)
+        self.assertEqual(self.f.id.get_filesize(), size)
+
+
+class TestAttrStorage(BaseAttrs):
+
+    """
+        Feature: Objects can use dense attribute storage and track
+        attribute creation order
+    """
+
+    def test_dense_group(self):
+        """ Groups created with attr_storage='dense' """
+        grp = self.f.create_group('g', attr_storage='dense')
+        self.assertEqual(grp.id.get_create_plist().get_attr_phase_change(), (0, 0))
+        for idx in range(50):
+            grp.attrs['a%d' % idx] = idx
+        self.assertEqual(len(grp.attrs), 50)
+        self.assertEqual(grp.attrs['a42'], 42)
+        self.assertIn('a13', grp.attrs)
+
+    def test_dense_dataset(self):
+        """ Datasets created with attr_storage='dense' """
+        dset = self.f.create_dataset('d', (10,), attr_storage='dense')
+        self.assertEqual(dset.id.get_create_plist().get_attr_phase_change(), (0, 0))
+        dset.attrs['x'] = 1
+        self.assertEqual(dset.attrs['x'], 1)
+
+    def test_thresholds(self):
+        """ attr_storage may give the phase change thresholds """
+        grp = self.f.create_group('g', attr_storage=(20, 10))
+        self.assertEqual(grp.id.get_create_plist().get_attr_phase_change(), (20, 10))
+
+    def test_bad_storage(self):
+        """ Unknown attr_storage raises ValueError """
+        with self.assertRaises(ValueError):
+            self.f.create_group('g', attr_storage='fast')
+
+    def test_track_attr_order(self):
+        """ Attributes are listed in creation order if tracked """
+        grp = self.f.create_group('g', track_attr_order=True)
+        dset = self.f.create_dataset('d', (10,), track_attr_order=True,
+                                     attr_storage='dense')
+        names = ['c', 'a', 'b', 'z', 'y']
+        for obj in (grp, dset):
+            for name in names:
+                obj.attrs[name] = 1
+            self.assertEqual(list(obj.attrs), names)
+
+    def test_untracked_order(self):
+        """ Otherwise attributes are listed in name order """
+        grp = self.f.create_group('g')
+        for name in ['c', 'a', 'b']:
+            grp.attrs[name] = 1
+        self.assertEqual(list(grp.attrs), ['a', 'b', 'c'])
+
+    def test_order_other_objects(self):
+        """ Files and named types list attributes by name """
+        self.f['t'] = np.dtype('f4')
+        for obj in (self.f, self.f['t']):
+            for name in ['c', 'a', 'b']:
+                obj.attrs[name] = 1
+            self.assertEqual(list(obj.attrs), ['a', 'b', 'c'])
@@ -594,6 +594,24 @@ class TestResize(BaseDataset):
         self.assertEqual(dset.shape, (15, 0))
         self.assertEqual(dset.maxshape, (15, None))
 
+    def test_resize_other_handle(self):
+        """ Resizing updates the shape seen through other Dataset objects """
+        dset = self.f.create_dataset('foo', (20, 30), maxshape=(20, 60))
+        other = self.f['foo']
+        self.assertEqual(other.shape, (20, 30))
+        dset.resize((20, 50))
+        self.assertEqual(other.shape, (20, 50))
+        self.assertEqual(len(other[0]), 50)
+
+    def test_set_extent_low_level(self):
+        """ Extents changed through the low-level API are seen """
+        dset = self.f.create_dataset('foo', (20, 30), maxshape=(20, 60))
+        self.assertEqual(dset.shape, (20, 30))
+        dset.id.set_extent((20, 40))
+        self.assertEqual(dset.shape, (20, 40))
+        self.assertEqual(len(dset), 20)
+        self.assertEqual(dset[...].shape, (20, 40))
+
 
 class TestDtype(BaseDataset):
 
@@ -607,6 +625,36 @@ class TestDtype(BaseDataset):
         self.assertEqual(dset.dtype, np.dtype('|S10'))
 
 
+class TestMetadata(BaseDataset):
+
+    """
+        Feature: Creation properties are read lazily and cached
+    """
+
+    def test_lazy(self):
+        """ Opening a dataset doesn't read its creation property list """
+        self.f.create_dataset('foo', (10,), chunks=(5,), compression='gzip')
+        dset = self.f['foo']
+        self.assertIsNone(dset._dcpl_obj)
+        self.assertEqual(dset.chunks, (5,))
+        self.assertEqual(dset.compression, 'gzip')
+        self.assertIsNotNone(dset._dcpl_obj)
+
+    def test_cached(self):
+        """ Immutable properties are only read once """
+        dset = self.f.create_dataset('foo', (10,), maxshape=(None,), dtype='i2')
+        self.assertIs(dset.dtype, dset.dtype)
+        self.assertIs(dset.chunks, dset.chunks)
+        self.assertIs(dset.maxshape, dset.maxshape)
+        self.assertEqual(dset.maxshape, (None,))
+
+    def test_contiguous(self):
+        """ Cached chunks are None for contiguous datasets """
+        dset = self.f.create_dataset('foo', (10,))
+        self.assertIsNone(dset.chunks)
+        self.assertIsNone(dset.chunks)
+
+
 class TestLen(BaseDataset):
 
     """
@@ -746,6 +794,319 @@ class TestStrings(BaseDataset):
         self.assertEqual(out, data)
 
 
+class TestVlenStrFixed(BaseDataset):
+
+    """
+        Feature: Vlen string datasets can be read into fixed-width arrays
+    """
+
+    def setUp(self):
+        BaseDataset.setUp(self)
+        self.data = [b'a', b'', b'abcd', b'abcdefgh', b'xyz']
+        dt = h5py.special_dtype(vlen=bytes)
+        self.dset = self.f.create_dataset('x', (6,), dtype=dt)
+        self.dset[0:5] = np.array(self.data, dtype=object)
+
+    def test_read(self):
+        """ Strings are padded or truncated to the output width """
+        with self.dset.astype('S4'):
+            out = self.dset[0:5]
+        self.assertEqual(out.dtype, np.dtype('S4'))
+        self.assertEqual(list(out), [x[:4] for x in self.data])
+
+    def test_unwritten(self):
+        """ Elements never written read as empty strings """
+        with self.dset.astype('S4'):
+            out = self.dset[...]
+        self.assertEqual(out[5], b'')
+
+    def test_selections(self):
+        """ Fancy selections and single elements """
+        with self.dset.astype('S8'):
+            self.assertEqual(list(self.dset[[0, 3, 4]]),
+                             [b'a', b'abcdefgh', b'xyz'])
+            self.assertEqual(self.dset[2], b'abcd')
+
+    def test_unicode(self):
+        """ UTF-8 strings come out as their encoded bytes """
+        dt = h5py.special_dtype(vlen=six.text_type)
+        dset = self.f.create_dataset('u', (2,), dtype=dt)
+        dset[0] = six.u('\u03b1\u03b2')
+        dset[1] = six.u('abc')
+        with dset.astype('S8'):
+            out = dset[...]
+        self.assertEqual(list(out), [six.u('\u03b1\u03b2').encode('utf8'), b'abc'])
+
+    def test_not_vlen(self):
+        """ The low-level call refuses other datasets """
+        dset = self.f.create_dataset('y', (5,), dtype='S4')
+        out = np.empty((5,), dtype='S4')
+        with self.assertRaises(TypeError):
+            dset.id.read_vlen_str(dset.id.get_space(), out)
+
+
+class TestVlenColumnar(BaseDataset):
+
+    """
+        Feature: Vlen data can be read and written as offsets + values
+    """
+
+    def test_numeric_roundtrip(self):
+        """ Numeric sequences round-trip, including empty ones """
+        dt = h5py.special_dtype(vlen=np.dtype('int32'))
+        dset = self.f.create_dataset('x', (4,), dtype=dt)
+        offsets = np.array([0, 3, 3, 4, 6], dtype='i8')
+        dset.write_vlen_columnar(offsets, np.arange(6, dtype='i8'))
+        offs, vals = dset.read_vlen_columnar()
+        self.assertEqual(offs.dtype, np.dtype('i8'))
+        self.assertEqual(vals.dtype, np.dtype('int32'))
+        self.assertArrayEqual(offs, offsets)
+        self.assertArrayEqual(vals, np.arange(6, dtype='int32'))
+        self.assertArrayEqual(dset[3], np.array([4, 5], dtype='int32'))
+
+    def test_strings(self):
+        """ Strings are returned as concatenated bytes """
+        dt = h5py.special_dtype(vlen=bytes)
+        dset = self.f.create_dataset('x', (4,), dtype=dt)
+        dset.write_vlen_columnar([0, 2, 2, 5], b'abcde', np.s_[0:3])
+        self.assertEqual(dset[2], b'cde')
+        offs, vals = dset.read_vlen_columnar()
+        self.assertArrayEqual(offs, np.array([0, 2, 2, 5, 5], dtype='i8'))
+        self.assertEqual(vals.dtype, np.dtype('u1'))
+        self.assertEqual(vals.tostring(), b'abcde')
+
+    def test_selection(self):
+        """ Only the selected elements are read """
+        dt = h5py.special_dtype(vlen=np.dtype('f8'))
+        dset = self.f.create_dataset('x', (3,), dtype=dt)
+        dset.write_vlen_columnar([0, 1, 3, 6], np.arange(6.))
+        offs, vals = dset.read_vlen_columnar(np.s_[1:])
+        self.assertArrayEqual(offs, np.array([0, 2, 5], dtype='i8'))
+        self.assertArrayEqual(vals, np.arange(1., 6.))
+
+    def test_bad_offsets(self):
+        """ Offsets must match the selection and the values """
+        dt = h5py.special_dtype(vlen=np.dtype('int32'))
+        dset = self.f.create_dataset('x', (2,), dtype=dt)
+        with self.assertRaises(ValueError):
+            dset.write_vlen_columnar([0, 1], np.arange(1))
+        with self.assertRaises(ValueError):
+            dset.write_vlen_columnar([0, 2, 1], np.arange(2))
+        with self.assertRaises(ValueError):
+            dset.write_vlen_columnar([0, 1, 3], np.arange(2))
+
+    def test_not_vlen(self):
+        """ Other datasets raise TypeError """
+        dset = self.f.create_dataset('x', (2,), dtype='i4')
+        with self.assertRaises(TypeError):
+            dset.read_vlen_columnar()
+
+    def test_nested(self):
+        """ Vlens of vlens or of vlen strings raise TypeError """
+        strtype = h5py.h5t.C_S1.copy()
+        strtype.set_size(h5py.h5t.VARIABLE)
+        space = h5py.h5s.create_simple((2,))
+        for name, base in ((b'x', h5py.h5t.vlen_create(h5py.h5t.NATIVE_INT32)),
+                           (b'y', strtype)):
+            h5py.h5d.create(self.f.id, name, h5py.h5t.vlen_create(base), space)
+            dset = self.f[name]
+            with self.assertRaises(TypeError):
+                dset.read_vlen_columnar()
+            with self.assertRaises(TypeError):
+                dset.write_vlen_columnar([0, 1, 1], np.arange(1))
+
+
+class TestVlenStrWrite(BaseDataset):
+
+    """
+        Feature: Fixed-width string arrays are written to vlen datasets
+        without an object array in between
+    """
+
+    def test_bytes(self):
+        """ "S" arrays, with strings ending at the first NUL """
+        dt = h5py.special_dtype(vlen=bytes)
+        dset = self.f.create_dataset('x', (3,), dtype=dt)
+        dset[...] = np.array([b'a', b'abcd', b''], dtype='S4')
+        self.assertEqual(list(dset[...]), [b'a', b'abcd', b''])
+
+    def test_unicode(self):
+        """ "U" arrays are stored as UTF-8 """
+        dt = h5py.special_dtype(vlen=six.text_type)
+        dset = self.f.create_dataset('x', (3,), dtype=dt)
+        data = [six.u('a'), six.u('\u03b1\u20ac'), six.u('\U0001f600x')]
+        dset[...] = np.array(data, dtype='U3')
+        self.assertEqual(list(dset[...]), data)
+        offs, vals = dset.read_vlen_columnar()
+        self.assertEqual(vals.tostring(), six.u('').join(data).encode('utf8'))
+
+    def test_broadcast(self):
+        """ Scalars and rows are broadcast as for other types """
+        dt = h5py.special_dtype(vlen=bytes)
+        dset = self.f.create_dataset('x', (2, 3), dtype=dt)
+        dset[...] = np.array(b'xy')
+        self.assertEqual(list(dset[1]), [b'xy']*3)
+        dset[...] = np.array([b'a', b'b', b'c'])
+        self.assertEqual(list(dset[0]), [b'a', b'b', b'c'])
+        self.assertEqual(list(dset[1]), [b'a', b'b', b'c'])
+
+    def test_selection(self):
+        """ Partial and non-contiguous selections """
+        dt = h5py.special_dtype(vlen=bytes)
+        dset = self.f.create_dataset('x', (5,), dtype=dt)
+        dset[::2] = np.array([b'a', b'b', b'c'])
+        self.assertEqual(list(dset[...]), [b'a', b'', b'b', b'', b'c'])
+
+    def test_not_str(self):
+        """ The low-level call refuses other datasets and arrays """
+        dset = self.f.create_dataset('x', (2,), dtype='i4')
+        with self.assertRaises(TypeError):
+            dset.id.write_vlen_str(dset.id.get_space(), np.array([b'a', b'b']))
+        dt = h5py.special_dtype(vlen=bytes)
+        dset = self.f.create_dataset('y', (2,), dtype=dt)
+        with self.assertRaises(TypeError):
+            dset.id.write_vlen_str(dset.id.get_space(), np.arange(2))
+
+
+class TestStrConv(BaseDataset):
+
+    """
+        Feature: HDF5 converts between fixed-width and vlen strings
+    """
+
+    def test_fixed_to_vlen(self):
+        """ Fixed-width array written through a vlen file type """
+        dt = h5py.special_dtype(vlen=bytes)
+        dset = self.f.create_dataset('x', (4,), dtype=dt)
+        data = np.array([b'', b'a', b'abc', b'abcdefgh'], dtype='S8')
+        dset.write_direct(data)
+        self.assertEqual(list(dset[...]), list(data))
+
+    def test_vlen_to_fixed(self):
+        """ Vlen file type read into narrower and wider arrays """
+        dt = h5py.special_dtype(vlen=bytes)
+        dset = self.f.create_dataset('x', (5,), dtype=dt)
+        dset[0:4] = np.array([b'', b'a', b'abc', b'abcdefgh'], dtype=object)
+        out = np.empty((5,), dtype='S3')
+        dset.read_direct(out)
+        self.assertEqual(list(out), [b'', b'a', b'abc', b'abc', b''])
+        out = np.empty((5,), dtype='S32')
+        dset.read_direct(out)
+        self.assertEqual(list(out), [b'', b'a', b'abc', b'abcdefgh', b''])
+
+
+class TestRefPaths(BaseDataset):
+
+    """
+        Feature: Object references can be read as target paths in bulk
+    """
+
+    def setUp(self):
+        BaseDataset.setUp(self)
+        self.f.create_group('a/b')
+        self.f.create_dataset('a/x', (1,))
+        dt = h5py.special_dtype(ref=h5py.Reference)
+        self.dset = self.f.create_dataset('refs', (5,), dtype=dt)
+        self.dset[0] = self.f['a/b'].ref
+        self.dset[1] = self.f['a/x'].ref
+        self.dset[2] = self.f.ref
+        self.dset[3] = self.f['a/b'].ref
+
+    def test_paths(self):
+        """ Paths of targets, None for null references """
+        self.assertEqual(list(self.dset.read_refs_as_paths()),
+                         ['/a/b', '/a/x', '/', '/a/b', None])
+
+    def test_selection(self):
+        """ Selections give arrays of the selected shape """
+        out = self.dset.read_refs_as_paths(np.s_[1:3])
+        self.assertEqual(out.shape, (2,))
+        self.assertEqual(list(out), ['/a/x', '/'])
+
+    def test_move(self):
+        """ Moving a link through h5py isn't hidden by the cache """
+        self.dset.read_refs_as_paths()
+        self.f.move('a/b', 'c')
+        self.assertEqual(self.dset.read_refs_as_paths()[0], '/c')
+
+    def test_reopen(self):
+        """ Names cached for a file aren't used after it's gone """
+        fname = self.mktemp()
+        dt = h5py.special_dtype(ref=h5py.Reference)
+        for name in ('first', 'second'):
+            f = File(fname, 'w')
+            f.create_group(name)
+            dset = f.create_dataset('refs', (1,), dtype=dt)
+            dset[0] = f[name].ref
+            self.assertEqual(list(dset.read_refs_as_paths()), ['/' + name])
+            del f, dset     # Not closed explicitly
+
+    def test_lowlevel(self):
+        """ h5r.dereference_many takes raw addresses and fills a cache """
+        refs = np.array([0, h5py.h5o.get_info(self.f['a/x'].id).addr],
+                        dtype='u8')
+        cache = {}
+        names = h5py.h5r.dereference_many(refs, self.f.id, cache)
+        self.assertEqual(list(names), [None, b'/a/x'])
+        self.assertEqual(list(cache.values()), [b'/a/x'])
+
+    def test_not_refs(self):
+        """ Other datasets raise TypeError """
+        dset = self.f.create_dataset('x', (2,), dtype='i4')
+        with self.assertRaises(TypeError):
+            dset.read_refs_as_paths()
+
+
+class TestReadRegions(BaseDataset):
+
+    """
+        Feature: Many region references are read at once
+    """
+
+    def setUp(self):
+        BaseDataset.setUp(self)
+        self.data = np.arange(100).reshape((10, 10))
+        self.dset = self.f.create_dataset('x', data=self.data)
+
+    def test_regions(self):
+        """ Results match reading each reference """
+        refs = [self.dset.regionref[1:3, 2:5],
+                self.dset.regionref[...],
+                self.dset.regionref[5, ::3],
+                self.dset.regionref[2:4, 3]]
+        out = self.dset.read_regions(refs)
+        self.assertEqual(len(out), len(refs))
+        for ref, arr in zip(refs, out):
+            self.assertArrayEqual(arr, self.dset[ref].reshape(-1))
+
+    def test_ragged(self):
+        """ Ragged output, with a null reference """
+        dt = h5py.special_dtype(ref=h5py.RegionReference)
+        refs = self.f.create_dataset('refs', (3,), dtype=dt)
+        refs[0] = self.dset.regionref[0, 0:2]
+        refs[2] = self.dset.regionref[9, 8:]
+        offsets, values = self.dset.read_regions(refs[...], ragged=True)
+        self.assertArrayEqual(offsets, np.array([0, 2, 2, 4], dtype='i8'))
+        self.assertArrayEqual(values, np.array([0, 1, 98, 99]))
+
+    def test_sparse(self):
+        """ Scattered elements are read as points """
+        dset = self.f.create_dataset('y', data=np.arange(10000))
+        refs = [dset.regionref[5], dset.regionref[9000:9002], dset.regionref[5]]
+        out = dset.read_regions(refs)
+        self.assertEqual([list(x) for x in out], [[5], [9000, 9001], [5]])
+
+    def test_empty(self):
+        """ No references, no regions """
+        self.assertEqual(self.dset.read_regions([]), [])
+
+    def test_other_dataset(self):
+        """ References to another dataset raise ValueError """
+        other = self.f.create_dataset('y', (10,))
+        with self.assertRaises(ValueError):
+            self.dset.read_regions([other.regionref[0:2]])
+
+
 class TestCompound(BaseDataset):
 
     """
@@ -198,6 +198,20 @@ class TestDimensionsHighLevel(BaseDataset):
     def test_repr(self):
         self.assertEqual(repr(self.f['data'].dims[2])[1:16], '"x" dimension 2')
 
+    def test_anonymous_scale(self):
+        """ Scales which have no path are opened by address """
+        scale = self.f.create_dataset(None, data=np.ones((4,), 'f'))
+        self.f['data'].dims.create_scale(scale)
+        self.f['data'].dims[0].attach_scale(scale)
+        self.assertEqual(self.f['data'].dims[0][0], scale)
+        self.assertEqual(self.f['data'].dims[0].items(), [('', scale)])
+
+    def test_delete_attribute(self):
+        """ Deleting DIMENSION_LIST through attrs updates the cache """
+        self.assertEqual(len(self.f['data'].dims[2]), 2)
+        del self.f['data'].attrs['DIMENSION_LIST']
+        self.assertEqual(len(self.f['data'].dims[2]), 0)
+
     def test_attributes(self):
         self.f["data2"].attrs["DIMENSION_LIST"] = self.f["data"].attrs[
             "DIMENSION_LIST"]
@@ -381,6 +381,68 @@ class TestIter(BaseMapping):
         finally:
             hfile.close()
 
+class TestTrackOrder(BaseGroup):
+
+    """
+        Feature: Groups can list members in creation order, and in pages
+    """
+
+    def populate(self, grp):
+        # More than the default of 8 links, so storage is dense
+        names = ['n%02d' % x for x in range(20)][::-1]
+        for name in names:
+            grp.create_group(name)
+        return names
+
+    def test_order(self):
+        """ Members of a track_order group are listed in creation order """
+        grp = self.f.create_group('ordered', track_order=True)
+        names = self.populate(grp)
+        self.assertEqual(list(grp), names)
+        self.assertEqual(list(self.f['ordered']), names)
+
+    def test_default(self):
+        """ Other groups list members in name order """
+        grp = self.f.create_group('plain')
+        names = self.populate(grp)
+        self.assertEqual(list(grp), sorted(names))
+
+    def test_keys_page(self):
+        """ keys(start, stop) returns a slice of the member names """
+        for track_order in (False, True):
+            grp = self.f.create_group('g%s' % track_order,
+                                      track_order=track_order)
+            names = self.populate(grp)
+            if not track_order:
+                names = sorted(names)
+            self.assertEqual(grp.keys(0, 5), names[0:5])
+            self.assertEqual(grp.keys(15, 30), names[15:])
+            self.assertEqual(grp.keys(5), names[5:])
+            self.assertEqual(grp.keys(-3, None), names[-3:])
+            self.assertEqual(grp.keys(10, 5), [])
+
+    def test_keys_page_large(self):
+        """ Paging through a large group without creation order """
+        grp = self.f.create_group('large')
+        target = self.f.create_group('target')
+        names = ['n%05d' % idx for idx in range(5000)]
+        for name in names:
+            grp[name] = target
+        pages = []
+        for start in range(0, len(names), 100):
+            pages.extend(grp.keys(start, start + 100))
+        self.assertEqual(pages, names)
+        # Changes made through h5py are seen by the next page
+        del grp['n00150']
+        self.assertEqual(grp.keys(100, 200), names[100:150] + names[151:201])
+        grp.move('n00250', 'z')
+        self.assertEqual(grp.keys(4990), names[4992:] + ['z'])
+
+    def test_keys_empty(self):
+        """ Paging an empty group gives an empty list """
+        grp = self.f.create_group('empty', track_order=True)
+        self.assertEqual(grp.keys(0, 10), [])
+
 @ut.skipIf(sys.version_info[0] != 2, "Py2")
 class TestPy2Dict(BaseMapping):
 
@@ -113,3 +113,25 @@ class TestPL(ut.TestCase):
         fcpl.set_link_creation_order(flags)
         self.assertEqual(flags, fcpl.get_link_creation_order())
 
+    def test_attr_phase_change(self):
+        """
+        tests the attribute phase change set/get
+        """
+        gcid = h5p.create(h5p.GROUP_CREATE)
+        self.assertEqual((8, 6), gcid.get_attr_phase_change())
+        gcid.set_attr_phase_change(0, 0)
+        self.assertEqual((0, 0), gcid.get_attr_phase_change())
+
+        dcid = h5p.create(h5p.DATASET_CREATE)
+        dcid.set_attr_phase_change(20, 10)
+        self.assertEqual((20, 10), dcid.get_attr_phase_change())
+
+    def test_attr_creation_tracking(self):
+        """
+        tests the attribute creation order set/get
+        """
+        flags = h5p.CRT_ORDER_TRACKED|h5p.CRT_ORDER_INDEXED
+        gcid = h5p.create(h5p.GROUP_CREATE)
+        self.assertEqual(0, gcid.get_attr_creation_order())
+        gcid.set_attr_creation_order(flags)
+        self.assertEqual(flags, gcid.get_attr_creation_order())
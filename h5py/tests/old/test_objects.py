@@ -40,3 +40,41 @@ class TestObjects(ut.TestCase):
         with self.assertRaises(TypeError):
             hash(oid)
 
+
+class TestNonlocalClose(ut.TestCase):
+
+    def test_file_resident_invalidated(self):
+        # Closing a file zeroes identifiers which live in it, but leaves
+        # transient (unregistered) identifiers such as dataspaces alone
+        import tempfile, os
+        import h5py
+        fd, fname = tempfile.mkstemp('.hdf5')
+        os.close(fd)
+        try:
+            f = h5py.File(fname, 'w')
+            grp = f.create_group('foo')
+            dset = f.create_dataset('bar', (10,))
+            space = dset.id.get_space()
+            plist = dset.id.get_create_plist()
+            f.close()
+            self.assertFalse(grp.id)
+            self.assertFalse(dset.id)
+            self.assertTrue(space)
+            self.assertTrue(plist)
+            self.assertEqual(space.shape, (10,))
+        finally:
+            os.unlink(fname)
+
+    def test_weakref_callback(self):
+        # nonlocal_close() may be called from a weakref callback while a
+        # registered identifier is being deallocated
+        import weakref
+        from h5py import h5t, _objects
+        tid = h5t.STD_I32LE.copy()
+        called = []
+        def callback(ref):
+            _objects.nonlocal_close()
+            called.append(True)
+        ref = weakref.ref(tid, callback)
+        del tid
+        self.assertEqual(called, [True])
@@ -0,0 +1,55 @@
+# This file is part of h5py, a Python interface to the HDF5 library.
+#
+# http://www.h5py.org
+#
+# Copyright 2008-2013 Andrew Collette and contributors
+#
+# License:  Standard 3-clause BSD; see "license.txt" for full license terms
+#           and contributor agreement.
+
+"""
+    Times attribute lookups by name on groups with many attributes, with
+    the default storage and with attr_storage='dense'.
+
+    Usage: attr_storage_bench.py [NATTRS [NLOOKUPS]]
+"""
+
+import random
+import sys
+import time
+
+import h5py
+
+FNAME = 'attr_storage_bench.hdf5'
+
+if sys.version_info[0] == 3:
+    xrange = range
+
+
+def make_file(nattrs):
+    with h5py.File(FNAME, 'w') as f:
+        for label, storage in (('default', None), ('dense', 'dense')):
+            grp = f.create_group(label, attr_storage=storage)
+            for idx in xrange(nattrs):
+                grp.attrs['attr%d' % idx] = idx
+
+
+def bench(label, nattrs, nlookups):
+    names = ['attr%d' % random.randrange(nattrs) for x in xrange(nlookups)]
+    with h5py.File(FNAME, 'r') as f:
+        attrs = f[label].attrs
+        start = time.time()
+        for name in names:
+            attrs[name]
+        elapsed = time.time() - start
+    print("%-8s %8.2f us/lookup" % (label, 1e6*elapsed/nlookups))
+
+
+if __name__ == '__main__':
+    print("h5py ", h5py.version.version)
+    print("HDF5 ", h5py.version.hdf5_version)
+    nattrs = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    nlookups = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+    make_file(nattrs)
+    bench('default', nattrs, nlookups)
+    bench('dense', nattrs, nlookups)
@@ -0,0 +1,55 @@
+# This file is part of h5py, a Python interface to the HDF5 library.
+#
+# http://www.h5py.org
+#
+# Copyright 2008-2013 Andrew Collette and contributors
+#
+# License:  Standard 3-clause BSD; see "license.txt" for full license terms
+#           and contributor agreement.
+
+"""
+    Updates a counter attribute in a loop and reports the time per update
+    and the growth of the file.  Updates which keep the type and shape are
+    written in place; alternating between two types forces the attribute
+    to be replaced each time, for comparison.
+
+    Usage: attr_update_bench.py [NUPDATES]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import h5py
+
+FNAME = 'attr_update_bench.hdf5'
+
+if sys.version_info[0] == 3:
+    xrange = range
+
+
+def bench(label, nupdates, types):
+    with h5py.File(FNAME, 'w') as f:
+        grp = f.create_group('g')
+        for idx in xrange(20):
+            grp.attrs['other%d' % idx] = idx
+        grp.attrs['counter'] = types[0](0)
+        f.flush()
+        before = os.path.getsize(FNAME)
+        start = time.time()
+        for idx in xrange(nupdates):
+            grp.attrs['counter'] = types[idx % len(types)](idx)
+        elapsed = time.time() - start
+    after = os.path.getsize(FNAME)
+    os.unlink(FNAME)
+    print("%-10s %8.2f us/update  file grew %8d bytes" % (label,
+          1e6*elapsed/nupdates, after - before))
+
+
+if __name__ == '__main__':
+    print("h5py ", h5py.version.version)
+    print("HDF5 ", h5py.version.hdf5_version)
+    nupdates = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    bench("in place", nupdates, (np.int64,))
+    bench("replace", nupdates, (np.int64, np.int32))
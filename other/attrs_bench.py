@@ -0,0 +1,74 @@
+# This file is part of h5py, a Python interface to the HDF5 library.
+#
+# http://www.h5py.org
+#
+# Copyright 2008-2013 Andrew Collette and contributors
+#
+# License:  Standard 3-clause BSD; see "license.txt" for full license terms
+#           and contributor agreement.
+
+"""
+    Compares reading every attribute of many objects with dict(obj.attrs),
+    attrs.read_all() and Group.read_attrs_recursive.
+
+    Usage: attrs_bench.py [NOBJS [NATTRS]]
+"""
+
+import sys
+import time
+
+import numpy as np
+import h5py
+
+FNAME = 'attrs_bench.hdf5'
+
+if sys.version_info[0] == 3:
+    xrange = range
+
+
+def make_file(nobjs, nattrs):
+    with h5py.File(FNAME, 'w') as f:
+        for oidx in xrange(nobjs):
+            grp = f.create_group('obj%d' % oidx)
+            for aidx in xrange(nattrs):
+                if aidx % 3 == 0:
+                    grp.attrs['a%d' % aidx] = aidx
+                elif aidx % 3 == 1:
+                    grp.attrs['a%d' % aidx] = np.arange(4, dtype='f8')
+                else:
+                    grp.attrs['a%d' % aidx] = b'units'
+
+
+def read_dict(f, names):
+    for name in names:
+        dict(f[name].attrs)
+
+
+def read_all(f, names):
+    for name in names:
+        f[name].attrs.read_all()
+
+
+def read_recursive(f, names):
+    f.read_attrs_recursive(names)
+
+
+def bench(label, func, nobjs, nattrs):
+    names = ['obj%d' % x for x in xrange(nobjs)]
+    with h5py.File(FNAME, 'r') as f:
+        start = time.time()
+        func(f, names)
+        elapsed = time.time() - start
+    print("%-10s %8.3f s %10.0f attributes/s" % (label, elapsed,
+          nobjs*nattrs/elapsed))
+
+
+if __name__ == '__main__':
+    print("h5py ", h5py.version.version)
+    print("HDF5 ", h5py.version.hdf5_version)
+    nobjs = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    nattrs = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    make_file(nobjs, nattrs)
+    bench("dict", read_dict, nobjs, nattrs)
+    bench("read_all", read_all, nobjs, nattrs)
+    bench("recursive", read_recursive, nobjs, nattrs)
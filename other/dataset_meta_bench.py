@@ -0,0 +1,69 @@
+# This file is part of h5py, a Python interface to the HDF5 library.
+#
+# http://www.h5py.org
+#
+# Copyright 2008-2013 Andrew Collette and contributors
+#
+# License:  Standard 3-clause BSD; see "license.txt" for full license terms
+#           and contributor agreement.
+
+"""
+    Measures the cost of opening Dataset objects and of reading their
+    metadata properties (shape, dtype, maxshape, chunks, compression).
+
+    Run against two versions of h5py to compare them.
+
+    Usage: dataset_meta_bench.py [NDSETS [NREPEAT]]
+"""
+
+import sys
+import time
+
+import h5py
+
+FNAME = 'dataset_meta_bench.hdf5'
+
+if sys.version_info[0] == 3:
+    xrange = range
+
+
+def make_file(ndsets):
+    with h5py.File(FNAME, 'w') as f:
+        for idx in xrange(ndsets):
+            f.create_dataset('dset%d' % idx, (100,), dtype='f4', chunks=(10,),
+                             maxshape=(None,), compression='gzip')
+
+
+def open_all(f, ndsets, nrepeat):
+    for idx in xrange(ndsets):
+        f['dset%d' % idx]
+    return ndsets
+
+
+def access(name):
+    def run(f, ndsets, nrepeat):
+        dset = f['dset0']
+        for idx in xrange(nrepeat):
+            getattr(dset, name)
+        return nrepeat
+    return run
+
+
+def bench(label, func, ndsets, nrepeat):
+    with h5py.File(FNAME, 'r') as f:
+        start = time.time()
+        count = func(f, ndsets, nrepeat)
+        elapsed = time.time() - start
+    print("%-12s %8d calls %8.3f s %8.2f us/call" % (label, count, elapsed,
+          1e6*elapsed/count))
+
+
+if __name__ == '__main__':
+    print("h5py ", h5py.version.version)
+    print("HDF5 ", h5py.version.hdf5_version)
+    ndsets = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    nrepeat = int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+    make_file(ndsets)
+    bench("open", open_all, ndsets, nrepeat)
+    for name in ('shape', 'dtype', 'maxshape', 'chunks', 'compression'):
+        bench(name, access(name), ndsets, nrepeat)
@@ -0,0 +1,73 @@
+# This file is part of h5py, a Python interface to the HDF5 library.
+#
+# http://www.h5py.org
+#
+# Copyright 2008-2013 Andrew Collette and contributors
+#
+# License:  Standard 3-clause BSD; see "license.txt" for full license terms
+#           and contributor agreement.
+
+"""
+    Measures dimension scale lookups on a file where many datasets share a
+    few scales, through Dataset.dims and File.dimension_map.
+
+    Usage: dims_bench.py [NDSETS]
+"""
+
+import sys
+import time
+
+import h5py
+
+FNAME = 'dims_bench.hdf5'
+
+if sys.version_info[0] == 3:
+    xrange = range
+
+
+def make_file(ndsets):
+    with h5py.File(FNAME, 'w') as f:
+        x = f.create_dataset('x', (100,), dtype='f8')
+        y = f.create_dataset('y', (50,), dtype='f8')
+        grp = f.create_group('data_group')
+        for idx in xrange(ndsets):
+            dset = grp.create_dataset('dset%d' % idx, (50, 100), dtype='f4')
+            if idx == 0:
+                dset.dims.create_scale(x, 'x')
+                dset.dims.create_scale(y, 'y')
+            dset.dims[0].attach_scale(y)
+            dset.dims[1].attach_scale(x)
+
+
+def lookup_dims(f):
+    grp = f['data_group']
+    n = 0
+    for name in grp:
+        dims = grp[name].dims
+        for dim in dims:
+            dim[0].name
+            dim.keys()
+            n += 1
+    return n
+
+
+def lookup_map(f):
+    return sum(len(x) for x in f.dimension_map().values())
+
+
+def bench(label, func):
+    with h5py.File(FNAME, 'r') as f:
+        start = time.time()
+        n = func(f)
+        elapsed = time.time() - start
+    print("%-12s %8d dimensions %8.3f s %10.0f dimensions/s" % (label, n,
+          elapsed, n/elapsed))
+
+
+if __name__ == '__main__':
+    print("h5py ", h5py.version.version)
+    print("HDF5 ", h5py.version.hdf5_version)
+    ndsets = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    make_file(ndsets)
+    bench("dims", lookup_dims)
+    bench("dimension_map", lookup_map)
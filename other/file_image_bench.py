@@ -0,0 +1,87 @@
+# This file is part of h5py, a Python interface to the HDF5 library.
+#
+# http://www.h5py.org
+#
+# Copyright 2008-2013 Andrew Collette and contributors
+#
+# License:  Standard 3-clause BSD; see "license.txt" for full license terms
+#           and contributor agreement.
+
+"""
+    Compares opening many small HDF5 payloads from memory (File.from_bytes)
+    with the traditional approach of writing each one to a temporary file.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import h5py
+
+NPAYLOADS = 2000
+
+if sys.version_info[0] == 3:
+    xrange = range
+
+
+def make_payload():
+    """ Build a small file image like the ones received off a queue """
+    f = h5py.File('payload', 'w', driver='core', backing_store=False)
+    f['data'] = np.arange(256, dtype='f8')
+    f.attrs['seq'] = 1
+    image = f.to_bytes()
+    f.close()
+    return image
+
+
+def consume(f):
+    return f['data'][0] + f.attrs['seq']
+
+
+def bench_tempfile(image):
+    fd, name = tempfile.mkstemp(suffix='.hdf5')
+    os.close(fd)
+    try:
+        start = time.time()
+        for i in xrange(NPAYLOADS):
+            with open(name, 'wb') as fp:
+                fp.write(image)
+            with h5py.File(name, 'r') as f:
+                consume(f)
+        return time.time() - start
+    finally:
+        os.unlink(name)
+
+
+def bench_from_bytes(image):
+    start = time.time()
+    for i in xrange(NPAYLOADS):
+        with h5py.File.from_bytes(image) as f:
+            consume(f)
+    return time.time() - start
+
+
+def bench_to_bytes():
+    f = h5py.File('scratch', 'w', driver='core', backing_store=False)
+    f['data'] = np.arange(256, dtype='f8')
+    start = time.time()
+    for i in xrange(NPAYLOADS):
+        f.to_bytes()
+    f.close()
+    return time.time() - start
+
+
+def report(label, seconds):
+    print("%-30s %8.0f payloads/s" % (label, NPAYLOADS/seconds))
+
+
+if __name__ == '__main__':
+    print("h5py ", h5py.version.version)
+    print("HDF5 ", h5py.version.hdf5_version)
+    image = make_payload()
+    print("Payload size: %d bytes" % len(image))
+    report("temp file + File()", bench_tempfile(image))
+    report("File.from_bytes()", bench_from_bytes(image))
+    report("File.to_bytes()", bench_to_bytes())
@@ -0,0 +1,59 @@
+# This file is part of h5py, a Python interface to the HDF5 library.
+#
+# http://www.h5py.org
+#
+# Copyright 2008-2013 Andrew Collette and contributors
+#
+# License:  Standard 3-clause BSD; see "license.txt" for full license terms
+#           and contributor agreement.
+
+"""
+    Times listing a large group page by page with Group.keys(start, stop),
+    for a group with creation-order tracking and for a plain one.  The time
+    per page should stay flat for the ordered group as the pages advance.
+
+    Usage: group_page_bench.py [NLINKS [PAGESIZE]]
+"""
+
+import sys
+import time
+
+import h5py
+
+FNAME = 'group_page_bench.hdf5'
+
+if sys.version_info[0] == 3:
+    xrange = range
+
+
+def make_file(nlinks):
+    with h5py.File(FNAME, 'w') as f:
+        target = f.create_group('target')
+        for label, track_order in (('ordered', True), ('plain', False)):
+            grp = f.create_group(label, track_order=track_order)
+            for idx in xrange(nlinks):
+                grp['link%d' % idx] = target
+
+
+def bench(label, nlinks, pagesize):
+    with h5py.File(FNAME, 'r') as f:
+        grp = f[label]
+        times = []
+        start = time.time()
+        for idx in xrange(0, nlinks, pagesize):
+            t0 = time.time()
+            grp.keys(idx, idx + pagesize)
+            times.append(time.time() - t0)
+        elapsed = time.time() - start
+    print("%-8s %8.3f s total  first page %8.2f ms  last page %8.2f ms" % (
+          label, elapsed, 1e3*times[0], 1e3*times[-1]))
+
+
+if __name__ == '__main__':
+    print("h5py ", h5py.version.version)
+    print("HDF5 ", h5py.version.hdf5_version)
+    nlinks = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    pagesize = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    make_file(nlinks)
+    bench('ordered', nlinks, pagesize)
+    bench('plain', nlinks, pagesize)
@@ -0,0 +1,69 @@
+# This file is part of h5py, a Python interface to the HDF5 library.
+#
+# http://www.h5py.org
+#
+# Copyright 2008-2013 Andrew Collette and contributors
+#
+# License:  Standard 3-clause BSD; see "license.txt" for full license terms
+#           and contributor agreement.
+
+"""
+    Measures objects per second when cataloguing a large hierarchy, with
+    Group.visititems compared to Group.index.
+
+    Usage: index_bench.py [NGROUPS [NDSETS]]
+"""
+
+import sys
+import time
+
+import h5py
+
+FNAME = 'index_bench.hdf5'
+
+if sys.version_info[0] == 3:
+    xrange = range
+
+
+def make_file(ngroups, ndsets):
+    with h5py.File(FNAME, 'w') as f:
+        for gidx in xrange(ngroups):
+            grp = f.create_group('group%d' % gidx)
+            for didx in xrange(ndsets):
+                grp.create_dataset('dset%d' % didx, (100,), dtype='f4',
+                                   chunks=(10,))
+
+
+def catalog_visititems(f):
+    rows = []
+    def visitor(name, obj):
+        if isinstance(obj, h5py.Dataset):
+            rows.append((name, obj.shape, obj.dtype, obj.chunks,
+                         obj.id.get_storage_size(), len(obj.attrs)))
+        else:
+            rows.append((name, None, None, None, 0, len(obj.attrs)))
+    f.visititems(visitor)
+    return len(rows)
+
+
+def catalog_index(f):
+    return len(f.index())
+
+
+def bench(label, func):
+    with h5py.File(FNAME, 'r') as f:
+        start = time.time()
+        nobjs = func(f)
+        elapsed = time.time() - start
+    print("%-12s %8d objects %8.3f s %10.0f objects/s" % (label, nobjs,
+          elapsed, nobjs/elapsed))
+
+
+if __name__ == '__main__':
+    print("h5py ", h5py.version.version)
+    print("HDF5 ", h5py.version.hdf5_version)
+    ngroups = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    ndsets = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    make_file(ngroups, ndsets)
+    bench("visititems", catalog_visititems)
+    bench("index", catalog_index)
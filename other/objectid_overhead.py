@@ -0,0 +1,59 @@
+# This file is part of h5py, a Python interface to the HDF5 library.
+#
+# http://www.h5py.org
+#
+# Copyright 2008-2013 Andrew Collette and contributors
+#
+# License:  Standard 3-clause BSD; see "license.txt" for full license terms
+#           and contributor agreement.
+
+"""
+    Measures the per-object cost of creating low-level identifiers, and the
+    resulting overhead of small dataset reads.
+
+    Run once against each build to compare before/after numbers.
+"""
+
+import sys
+import timeit
+
+import h5py
+
+FNAME = 'objectid_overhead.hdf5'
+NUMBER = 100000
+
+if sys.version_info[0] == 3:
+    xrange = range
+
+
+def report(label, seconds, count):
+    print("%-40s %8.3f us per call" % (label, 1e6*seconds/count))
+
+
+def bench_identifiers():
+    print("Identifier creation")
+    print("-------------------")
+    t = timeit.timeit(lambda: h5py.h5s.create_simple((10,)), number=NUMBER)
+    report("h5s.create_simple (SpaceID)", t, NUMBER)
+    t = timeit.timeit(lambda: h5py.h5p.create(h5py.h5p.DATASET_XFER), number=NUMBER)
+    report("h5p.create (PropDXID)", t, NUMBER)
+    t = timeit.timeit(lambda: h5py.h5t.py_create('f'), number=NUMBER)
+    report("h5t.py_create (TypeID)", t, NUMBER)
+
+
+def bench_reads():
+    print("Small dataset reads")
+    print("-------------------")
+    with h5py.File(FNAME, 'w') as f:
+        dset = f.create_dataset('x', data=list(xrange(100)))
+        t = timeit.timeit(lambda: dset[10], number=NUMBER//10)
+        report("dset[10]", t, NUMBER//10)
+        t = timeit.timeit(lambda: dset[10:20], number=NUMBER//10)
+        report("dset[10:20]", t, NUMBER//10)
+
+
+if __name__ == '__main__':
+    print("h5py ", h5py.version.version)
+    print("HDF5 ", h5py.version.hdf5_version)
+    bench_identifiers()
+    bench_reads()
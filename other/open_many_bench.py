@@ -0,0 +1,54 @@
+# This file is part of h5py, a Python interface to the HDF5 library.
+#
+# http://www.h5py.org
+#
+# Copyright 2008-2013 Andrew Collette and contributors
+#
+# License:  Standard 3-clause BSD; see "license.txt" for full license terms
+#           and contributor agreement.
+
+"""
+    Compares opening many datasets by path one at a time with
+    Group.open_many.
+"""
+
+import sys
+import time
+
+import h5py
+
+FNAME = 'open_many_bench.hdf5'
+NGROUPS = 100
+NDSETS = 100
+
+if sys.version_info[0] == 3:
+    xrange = range
+
+
+def make_file():
+    with h5py.File(FNAME, 'w') as f:
+        for gidx in xrange(NGROUPS):
+            grp = f.create_group('run/group%d' % gidx)
+            for didx in xrange(NDSETS):
+                grp.create_dataset('dset%d' % didx, (10,), dtype='f4',
+                                   chunks=(10,), compression='gzip')
+    return ['run/group%d/dset%d' % (g, d) for g in xrange(NGROUPS)
+                                          for d in xrange(NDSETS)]
+
+
+def bench(label, func):
+    with h5py.File(FNAME, 'r') as f:
+        start = time.time()
+        objs = func(f)
+        elapsed = time.time() - start
+    print("%-28s %6d objects %8.3f s %10.0f objects/s" % (label, len(objs),
+          elapsed, len(objs)/elapsed))
+
+
+if __name__ == '__main__':
+    print("h5py ", h5py.version.version)
+    print("HDF5 ", h5py.version.hdf5_version)
+    paths = make_file()
+    bench("[f[x] for x in paths]", lambda f: [f[x] for x in paths])
+    bench("open_many(lazy_meta=False)", lambda f: f.open_many(paths, lazy_meta=False))
+    bench("open_many()", lambda f: f.open_many(paths))
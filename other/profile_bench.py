@@ -0,0 +1,58 @@
+# This file is part of h5py, a Python interface to the HDF5 library.
+#
+# http://www.h5py.org
+#
+# Copyright 2008-2013 Andrew Collette and contributors
+#
+# License:  Standard 3-clause BSD; see "license.txt" for full license terms
+#           and contributor agreement.
+
+"""
+    Writes a large chunked dataset with each file-space profile and reports
+    write throughput and the size of the resulting file.
+
+    Pass a directory on the file system of interest (e.g. a Lustre mount)
+    as the first argument; the default is the current directory.
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import h5py
+from h5py._hl.files import profiles
+
+SHAPE = (4096, 4096)
+CHUNKS = (256, 256)
+
+if sys.version_info[0] == 3:
+    xrange = range
+
+
+def bench(dirname, label, **kwds):
+    fname = os.path.join(dirname, 'profile_bench.hdf5')
+    block = np.random.random((CHUNKS[0], SHAPE[1])).astype('f4')
+    start = time.time()
+    with h5py.File(fname, 'w', **kwds) as f:
+        dset = f.create_dataset('x', SHAPE, dtype='f4', chunks=CHUNKS)
+        for idx in xrange(0, SHAPE[0], CHUNKS[0]):
+            dset[idx:idx+CHUNKS[0]] = block
+            f.attrs['progress%d' % idx] = idx
+        f.flush()
+        freespace = f.id.get_freespace()
+    elapsed = time.time() - start
+    size = os.path.getsize(fname)
+    os.unlink(fname)
+    nbytes = np.product(SHAPE)*4
+    print("%-24s %8.1f MB/s %12d bytes %10d free" % (label,
+          nbytes/elapsed/1e6, size, freespace))
+
+
+if __name__ == '__main__':
+    print("h5py ", h5py.version.version)
+    print("HDF5 ", h5py.version.hdf5_version)
+    dirname = sys.argv[1] if len(sys.argv) > 1 else '.'
+    bench(dirname, "no profile")
+    for name in sorted(profiles):
+        bench(dirname, name, profile=name)
@@ -0,0 +1,76 @@
+# This file is part of h5py, a Python interface to the HDF5 library.
+#
+# http://www.h5py.org
+#
+# Copyright 2008-2013 Andrew Collette and contributors
+#
+# License:  Standard 3-clause BSD; see "license.txt" for full license terms
+#           and contributor agreement.
+
+"""
+    Simulates high-latency storage to measure the fileobj driver's page
+    cache and readahead.
+
+    Every read issued to the underlying file sleeps for LATENCY seconds,
+    roughly like a round trip to a network file system.  The test file has
+    many small chunks, so without coalescing each chunk and B-tree node
+    costs one round trip.
+"""
+
+import io
+import sys
+import time
+
+import numpy as np
+import h5py
+
+FNAME = 'readahead_bench.hdf5'
+LATENCY = 0.001
+
+if sys.version_info[0] == 3:
+    xrange = range
+
+
+class SlowFile(io.FileIO):
+
+    """ Unbuffered file which sleeps on every read """
+
+    def readinto(self, buf):
+        time.sleep(LATENCY)
+        return io.FileIO.readinto(self, buf)
+
+
+def make_file():
+    with h5py.File(FNAME, 'w') as f:
+        for idx in xrange(20):
+            f.create_dataset('dset%d' % idx, data=np.arange(20000, dtype='f4'),
+                             chunks=(100,))
+
+
+def read_all(f):
+    for name in f:
+        f[name][...]
+
+
+def bench(label, **kwds):
+    fobj = SlowFile(FNAME, 'rb')
+    start = time.time()
+    with h5py.File(fobj, 'r', **kwds) as f:
+        read_all(f)
+        stats = f.io_stats()
+    elapsed = time.time() - start
+    fobj.close()
+    print("%-32s %7.2f s %8d calls %10d bytes read %10d requested" % (label,
+          elapsed, stats['read_calls'], stats['bytes_read'],
+          stats['bytes_requested']))
+
+
+if __name__ == '__main__':
+    print("h5py ", h5py.version.version)
+    print("HDF5 ", h5py.version.hdf5_version)
+    print("Simulated latency: %.1f ms per read" % (LATENCY*1000))
+    make_file()
+    bench("no cache", page_size=0)
+    bench("4k pages", page_size=4096)
+    bench("64k pages", page_size=65536)
+    bench("64k pages + 1M readahead", page_size=65536, readahead=1024*1024)
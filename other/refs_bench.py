@@ -0,0 +1,60 @@
+# This file is part of h5py, a Python interface to the HDF5 library.
+#
+# http://www.h5py.org
+#
+# Copyright 2008-2013 Andrew Collette and contributors
+#
+# License:  Standard 3-clause BSD; see "license.txt" for full license terms
+#           and contributor agreement.
+
+"""
+    Compares resolving a dataset of object references one at a time, with
+    f[ref].name, against Dataset.read_refs_as_paths.
+
+    Usage: refs_bench.py [NGROUPS]
+"""
+
+import sys
+import time
+
+import h5py
+
+FNAME = 'refs_bench.hdf5'
+
+if sys.version_info[0] == 3:
+    xrange = range
+
+
+def make_file(ngroups):
+    with h5py.File(FNAME, 'w') as f:
+        events = f.create_group('events')
+        dset = f.create_dataset('refs', (ngroups,),
+                                dtype=h5py.special_dtype(ref=h5py.Reference))
+        for idx in xrange(ngroups):
+            dset[idx] = events.create_group('event%d' % idx).ref
+
+
+def resolve_each(f):
+    return [f[ref].name for ref in f['refs'][...]]
+
+
+def resolve_bulk(f):
+    return f['refs'].read_refs_as_paths()
+
+
+def bench(label, func):
+    with h5py.File(FNAME, 'r') as f:
+        start = time.time()
+        n = len(func(f))
+        elapsed = time.time() - start
+    print("%-8s %8d refs %8.3f s %10.0f refs/s" % (label, n, elapsed,
+          n/elapsed))
+
+
+if __name__ == '__main__':
+    print("h5py ", h5py.version.version)
+    print("HDF5 ", h5py.version.hdf5_version)
+    ngroups = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    make_file(ngroups)
+    bench("each", resolve_each)
+    bench("bulk", resolve_bulk)
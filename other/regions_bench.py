@@ -0,0 +1,67 @@
+# This file is part of h5py, a Python interface to the HDF5 library.
+#
+# http://www.h5py.org
+#
+# Copyright 2008-2013 Andrew Collette and contributors
+#
+# License:  Standard 3-clause BSD; see "license.txt" for full license terms
+#           and contributor agreement.
+
+"""
+    Compares reading the regions of an index of region references one at
+    a time, with dset[ref], against Dataset.read_regions.
+
+    Usage: regions_bench.py [NREFS]
+"""
+
+import sys
+import time
+
+import numpy as np
+import h5py
+
+FNAME = 'regions_bench.hdf5'
+ROWS_PER_REF = 10
+
+if sys.version_info[0] == 3:
+    xrange = range
+
+
+def make_file(nrefs):
+    with h5py.File(FNAME, 'w') as f:
+        data = f.create_dataset('data', data=np.arange(nrefs*ROWS_PER_REF,
+                                                        dtype='f8'))
+        index = f.create_dataset('index', (nrefs,),
+                    dtype=h5py.special_dtype(ref=h5py.RegionReference))
+        refs = np.empty((nrefs,), dtype=object)
+        for idx in xrange(nrefs):
+            start = idx*ROWS_PER_REF
+            refs[idx] = data.regionref[start:start+ROWS_PER_REF]
+        index[...] = refs
+
+
+def read_each(data, refs):
+    return [data[ref] for ref in refs]
+
+
+def read_bulk(data, refs):
+    return data.read_regions(refs)
+
+
+def bench(label, func):
+    with h5py.File(FNAME, 'r') as f:
+        refs = f['index'][...]
+        start = time.time()
+        n = len(func(f['data'], refs))
+        elapsed = time.time() - start
+    print("%-8s %8d regions %8.3f s %10.0f regions/s" % (label, n, elapsed,
+          n/elapsed))
+
+
+if __name__ == '__main__':
+    print("h5py ", h5py.version.version)
+    print("HDF5 ", h5py.version.hdf5_version)
+    nrefs = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    make_file(nrefs)
+    bench("each", read_each)
+    bench("bulk", read_bulk)
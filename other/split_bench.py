@@ -0,0 +1,101 @@
+# This file is part of h5py, a Python interface to the HDF5 library.
+#
+# http://www.h5py.org
+#
+# Copyright 2008-2013 Andrew Collette and contributors
+#
+# License:  Standard 3-clause BSD; see "license.txt" for full license terms
+#           and contributor agreement.
+
+"""
+    Compares a metadata-heavy tree walk on a single file and on the split
+    layout, where metadata and raw data live in separate files.
+
+    Usage: split_bench.py [META_DIR [RAW_DIR]]
+
+    With the split driver the metadata file is created in META_DIR (e.g. a
+    local SSD) and the raw data file in RAW_DIR (e.g. network storage); the
+    single file goes to RAW_DIR.  Both default to the current directory.
+    For meaningful numbers, drop the OS page cache between the write and
+    read phases (the script pauses for this if PAUSE is set).
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import h5py
+
+NGROUPS = 200
+NDSETS = 20
+
+if sys.version_info[0] == 3:
+    xrange = range
+    raw_input = input
+
+
+def make_tree(f):
+    data = np.ones((1000,), dtype='f8')
+    for gidx in xrange(NGROUPS):
+        grp = f.create_group('group%d' % gidx)
+        grp.attrs['index'] = gidx
+        for didx in xrange(NDSETS):
+            dset = grp.create_dataset('dset%d' % didx, data=data)
+            dset.attrs['units'] = b'm/s'
+
+
+def walk(f):
+    """ Visit every object, reading shapes and attributes but no data """
+    count = [0]
+    def visitor(name, obj):
+        count[0] += 1
+        dict(obj.attrs)
+        if isinstance(obj, h5py.Dataset):
+            obj.shape, obj.dtype
+    f.visititems(visitor)
+    return count[0]
+
+
+def read_data(f):
+    total = 0
+    for gidx in xrange(NGROUPS):
+        grp = f['group%d' % gidx]
+        for didx in xrange(NDSETS):
+            total += grp['dset%d' % didx][...].nbytes
+    return total
+
+
+def bench(label, name, **kwds):
+    with h5py.File(name, 'w', **kwds) as f:
+        make_tree(f)
+    if os.environ.get('PAUSE'):
+        raw_input("Drop caches, then press enter... ")
+
+    with h5py.File(name, 'r', **kwds) as f:
+        start = time.time()
+        nobjs = walk(f)
+        walked = time.time() - start
+        start = time.time()
+        nbytes = read_data(f)
+        read = time.time() - start
+    print("%-8s walk %6d objects %7.3f s   read %7.1f MB %7.3f s" % (label,
+          nobjs, walked, nbytes/1e6, read))
+
+
+if __name__ == '__main__':
+    print("h5py ", h5py.version.version)
+    print("HDF5 ", h5py.version.hdf5_version)
+    meta_dir = os.path.abspath(sys.argv[1]) if len(sys.argv) > 1 else os.getcwd()
+    raw_dir = os.path.abspath(sys.argv[2]) if len(sys.argv) > 2 else meta_dir
+
+    single = os.path.join(raw_dir, 'split_bench_single.h5')
+    bench("single", single)
+    os.unlink(single)
+
+    base = 'split_bench'
+    meta_ext = os.path.join(meta_dir, '%s.meta')
+    raw_ext = os.path.join(raw_dir, '%s.raw')
+    bench("split", base, driver='split', meta_ext=meta_ext, raw_ext=raw_ext)
+    os.unlink(meta_ext % base)
+    os.unlink(raw_ext % base)
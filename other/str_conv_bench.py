@@ -0,0 +1,66 @@
+# This file is part of h5py, a Python interface to the HDF5 library.
+#
+# http://www.h5py.org
+#
+# Copyright 2008-2013 Andrew Collette and contributors
+#
+# License:  Standard 3-clause BSD; see "license.txt" for full license terms
+#           and contributor agreement.
+
+"""
+    Times HDF5's fixed-width <-> variable-length string conversion, by
+    writing a fixed-width array to a vlen dataset with write_direct and
+    reading it back with read_direct.  Reports throughput and the growth in
+    peak resident memory for each step, which shows how much the
+    converters allocate.
+
+    Usage: str_conv_bench.py [NSTRINGS [WIDTH]]
+
+    Use e.g. 100000000 strings for a migration-sized run; the fixed-width
+    array alone then takes NSTRINGS*WIDTH bytes.
+"""
+
+import sys
+import time
+import resource
+
+import numpy as np
+import h5py
+
+FNAME = 'str_conv_bench.hdf5'
+
+
+def peak_mb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        return rss/1e6      # bytes
+    return rss/1e3          # kilobytes
+
+
+def report(label, n, elapsed, before):
+    print("%-14s %11d strings %8.2f s %12.0f strings/s  peak +%8.1f MB" % (
+          label, n, elapsed, n/elapsed, peak_mb() - before))
+
+
+if __name__ == '__main__':
+    print("h5py ", h5py.version.version)
+    print("HDF5 ", h5py.version.hdf5_version)
+    nstrings = int(sys.argv[1]) if len(sys.argv) > 1 else 10000000
+    width = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+
+    data = np.empty((nstrings,), dtype='S%d' % width)
+    data[...] = b'x'*(width//2)
+
+    with h5py.File(FNAME, 'w') as f:
+        dset = f.create_dataset('x', (nstrings,),
+                                dtype=h5py.special_dtype(vlen=bytes))
+        before = peak_mb()
+        start = time.time()
+        dset.write_direct(data)
+        report("fixed -> vlen", nstrings, time.time() - start, before)
+
+        out = np.empty_like(data)
+        before = peak_mb()
+        start = time.time()
+        dset.read_direct(out)
+        report("vlen -> fixed", nstrings, time.time() - start, before)
@@ -0,0 +1,88 @@
+# This file is part of h5py, a Python interface to the HDF5 library.
+#
+# http://www.h5py.org
+#
+# Copyright 2008-2013 Andrew Collette and contributors
+#
+# License:  Standard 3-clause BSD; see "license.txt" for full license terms
+#           and contributor agreement.
+
+"""
+    Compares reading a variable-length string dataset as an object array
+    with reading it straight into a fixed-width array via astype('S<N>'),
+    and writing one from an object array, an "S" array, and a bytes blob
+    plus offsets.
+
+    Usage: vlen_str_bench.py [NSTRINGS]
+"""
+
+import sys
+import time
+
+import numpy as np
+import h5py
+
+FNAME = 'vlen_str_bench.hdf5'
+
+if sys.version_info[0] == 3:
+    xrange = range
+
+
+def make_strings(nstrings):
+    return [('item%d' % i).encode('ascii') for i in xrange(nstrings)]
+
+
+def write_objects(dset, strings):
+    dset[...] = np.array(strings, dtype=object)
+
+
+def write_fixed(dset, strings):
+    dset[...] = np.array(strings, dtype='S16')
+
+
+def write_columnar(dset, strings):
+    offsets = np.zeros((len(strings)+1,), dtype='i8')
+    offsets[1:] = np.cumsum([len(x) for x in strings])
+    dset.write_vlen_columnar(offsets, b''.join(strings))
+
+
+def read_objects(dset):
+    return dset[...]
+
+
+def read_fixed(dset):
+    with dset.astype('S16'):
+        return dset[...]
+
+
+def bench_write(label, func, strings):
+    with h5py.File(FNAME, 'w') as f:
+        dset = f.create_dataset('x', (len(strings),),
+                                dtype=h5py.special_dtype(vlen=bytes))
+        start = time.time()
+        func(dset, strings)
+        elapsed = time.time() - start
+    print("write %-8s %10d strings %8.3f s %12.0f strings/s" % (label,
+          len(strings), elapsed, len(strings)/elapsed))
+
+
+def bench_read(label, func):
+    with h5py.File(FNAME, 'r') as f:
+        dset = f['x']
+        start = time.time()
+        out = func(dset)
+        elapsed = time.time() - start
+    print("read  %-8s %10d strings %8.3f s %12.0f strings/s" % (label,
+          len(out), elapsed, len(out)/elapsed))
+
+
+if __name__ == '__main__':
+    print("h5py ", h5py.version.version)
+    print("HDF5 ", h5py.version.hdf5_version)
+    nstrings = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    strings = make_strings(nstrings)
+    bench_write("object", write_objects, strings)
+    bench_write("columnar", write_columnar, strings)
+    bench_write("fixed", write_fixed, strings)
+    bench_read("object", read_objects)
+    bench_read("fixed", read_fixed)
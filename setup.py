@@ -134,8 +134,8 @@ setup(
   packages = ['h5py', 'h5py._hl', 'h5py.tests', 'h5py.tests.old', 'h5py.tests.hl'],
   package_data = package_data,
   ext_modules = [Extension('h5py.x',['x.c'])],  # To trick build into running build_ext
-  requires = ['numpy (>=1.6.1)', 'Cython (>=0.17)'],
-  install_requires = ['numpy>=1.6.1', 'Cython>=0.17', 'six'],
+  requires = ['numpy (>=1.6.1)', 'Cython (>=0.18)'],
+  install_requires = ['numpy>=1.6.1', 'Cython>=0.18', 'six'],
   setup_requires = ['pkgconfig', 'six'],
   cmdclass = CMDCLASS,
 )